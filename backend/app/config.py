@@ -1,11 +1,44 @@
 from pydantic_settings import BaseSettings
+from typing import Literal
 
 class Settings(BaseSettings):
     app_name: str = "KidQuest Academy"
+    debug: bool = False  # Adds X-DB-Queries / X-DB-Time headers to every response
+    storage_backend: Literal["mongo", "memory"] = "mongo"  # memory: in-process, non-persistent (tests, benchmarks)
     mongo_url: str = "mongodb://localhost:27017"
+    mongo_db_name: str = "kidquest"
     secret_key: str = "dev-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 10080  # 7 days
+    ownership_cache_ttl_seconds: int = 60  # How long a child -> parent lookup is trusted
+    ownership_cache_size: int = 10000
+    recommendation_cache_ttl_seconds: int = 300  # Per-child completion sets; routes write through
+    recommendation_cache_size: int = 10000
+    catalog_cache_ttl_seconds: int = 5  # How often workers check for catalog edits made elsewhere
+    event_retention_days: int = 30  # progress_events TTL
+    event_batch_size: int = 500
+    event_poll_seconds: float = 5
+    event_settle_seconds: float = 2  # Consumers skip events newer than this to tolerate clock skew
+    binary_uuids: bool = False  # Store ids as BSON Binary subtype 4; migrate first with app.migrate_uuids
+    trusted_reads: bool = False  # Build response models from stored documents without validation
+    compact_progress: bool = False  # Store new progress steps in the compact encoding
+    live_poll_seconds: float = 1.0  # Bridge poll for events committed by other workers
+    live_lookback_seconds: float = 5.0
+    live_heartbeat_seconds: float = 15.0
+    live_queue_size: int = 100  # Per subscriber; a full queue is replaced by a resync event
+    live_dedupe_size: int = 10000
+    live_retry_ms: int = 3000
+    bundle_dir: str = ""  # Static quest bundles; defaults to frontend/bundles next to frontend/dist
+    bundle_retention_seconds: int = 86400  # Superseded bundles are kept this long for cached manifests
+    export_batch_size: int = 200  # Cursor batch size for streaming child data exports
+    task_queue_size: int = 1000
+    task_queue_workers: int = 2
+    task_max_retries: int = 3
+    task_retry_backoff_seconds: float = 0.5
+    deletion_batch_size: int = 500
+    deletion_batch_delay_ms: int = 50  # Pause between purge batches
+    deletion_lease_seconds: int = 60  # Jobs with an expired lease are resumed by any worker
+    deletion_poll_seconds: int = 30
     
     class Config:
         env_file = ".env"
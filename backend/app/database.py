@@ -1,22 +1,264 @@
-from pymongo import MongoClient
+from pymongo import ASCENDING, DeleteMany, DeleteOne, InsertOne, MongoClient, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from bson.binary import Binary, UUID_SUBTYPE
+from bson.codec_options import CodecOptions, TypeDecoder, TypeRegistry
 from app.config import settings
+from app.utils.query_budget import query_counter
+from typing import Any, Iterable, Optional, Protocol
 import os
+import uuid
 
 # Get MongoDB URL from environment
 MONGO_URL = os.environ.get('MONGO_URL', settings.mongo_url)
 
-client = MongoClient(MONGO_URL)
-db = client.kidquest
+# Fields holding uuid4 ids. With BINARY_UUIDS they are stored as BSON Binary subtype 4
+# (16 bytes instead of a 36-character string) and converted back to strings on read.
+# Values that are not canonical UUID strings (e.g. fixed badge ids) are stored as-is.
+ID_FIELDS = {
+    "id", "child_id", "quest_id", "parent_id", "step_id", "item_id", "badge_id",
+    "event_id", "progress_id", "created_by", "prerequisites",
+}
+
+def uuid_to_binary(value: Any) -> Any:
+    if isinstance(value, str) and len(value) == 36:
+        try:
+            parsed = uuid.UUID(value)
+        except ValueError:
+            return value
+        if str(parsed) == value:
+            return Binary.from_uuid(parsed)
+    return value
+
+def to_storage(value: Any, field: Optional[str] = None) -> Any:
+    """Convert id fields anywhere in a document, filter, update or pipeline to their stored form"""
+    if isinstance(value, dict):
+        # Operators ($in, $set, $each, ...) keep the enclosing field; dotted paths use their last segment
+        return {
+            k: to_storage(v, field if k.startswith("$") else k.rsplit(".", 1)[-1])
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [to_storage(v, field) for v in value]
+    if field in ID_FIELDS:
+        return uuid_to_binary(value)
+    return value
+
+class BinaryUuidDecoder(TypeDecoder):
+    bson_type = Binary
+
+    def transform_bson(self, value):
+        if value.subtype == UUID_SUBTYPE:
+            return str(value.as_uuid())
+        return value
+
+# UNSPECIFIED representation leaves subtype 4 as Binary so the decoder above turns it into a string
+STORAGE_CODEC_OPTIONS = CodecOptions(type_registry=TypeRegistry([BinaryUuidDecoder()]), tz_aware=False)
+
+class BinaryUuidCollection:
+    """Collection wrapper applying to_storage to everything written or queried; reads decode via the codec"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def find(self, filter=None, *args, **kwargs):
+        return self._collection.find(to_storage(filter), *args, **kwargs)
+
+    def find_one(self, filter=None, *args, **kwargs):
+        return self._collection.find_one(to_storage(filter), *args, **kwargs)
+
+    def count_documents(self, filter, *args, **kwargs):
+        return self._collection.count_documents(to_storage(filter), *args, **kwargs)
+
+    def distinct(self, key, filter=None, *args, **kwargs):
+        return self._collection.distinct(key, to_storage(filter), *args, **kwargs)
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        return self._collection.aggregate(to_storage(pipeline), *args, **kwargs)
+
+    def insert_one(self, document, *args, **kwargs):
+        result = self._collection.insert_one(to_storage(document), *args, **kwargs)
+        document.setdefault("_id", result.inserted_id)
+        return result
+
+    def insert_many(self, documents, *args, **kwargs):
+        documents = list(documents)
+        result = self._collection.insert_many([to_storage(d) for d in documents], *args, **kwargs)
+        for document, inserted_id in zip(documents, result.inserted_ids):
+            document.setdefault("_id", inserted_id)
+        return result
+
+    def _write(method):
+        def write(self, filter, document, *args, **kwargs):
+            return getattr(self._collection, method)(to_storage(filter), to_storage(document), *args, **kwargs)
+        write.__name__ = method
+        return write
+
+    update_one = _write("update_one")
+    update_many = _write("update_many")
+    replace_one = _write("replace_one")
+    find_one_and_update = _write("find_one_and_update")
+    find_one_and_replace = _write("find_one_and_replace")
+    del _write
+
+    def delete_one(self, filter, *args, **kwargs):
+        return self._collection.delete_one(to_storage(filter), *args, **kwargs)
+
+    def delete_many(self, filter, *args, **kwargs):
+        return self._collection.delete_many(to_storage(filter), *args, **kwargs)
+
+    def find_one_and_delete(self, filter, *args, **kwargs):
+        return self._collection.find_one_and_delete(to_storage(filter), *args, **kwargs)
+
+    def bulk_write(self, requests, *args, **kwargs):
+        return self._collection.bulk_write([storage_request(r) for r in requests], *args, **kwargs)
+
+def storage_request(request):
+    """A new bulk write model with its filter and document in stored form; the original is left untouched"""
+    # pymongo exposes no accessors for a model's arguments, so they are read back from its slots
+    if isinstance(request, InsertOne):
+        return InsertOne(to_storage(request._doc))
+    if isinstance(request, (DeleteOne, DeleteMany)):
+        return type(request)(to_storage(request._filter), collation=request._collation, hint=request._hint)
+    if isinstance(request, ReplaceOne):
+        return ReplaceOne(
+            to_storage(request._filter), to_storage(request._doc),
+            upsert=request._upsert, collation=request._collation, hint=request._hint
+        )
+    if isinstance(request, (UpdateOne, UpdateMany)):
+        return type(request)(
+            to_storage(request._filter), to_storage(request._doc), upsert=request._upsert,
+            collation=request._collation, array_filters=to_storage(request._array_filters), hint=request._hint
+        )
+    raise TypeError(f"unsupported bulk write operation {request!r}")
+
+class Collection(Protocol):
+    """The storage interface the app codes against: the subset of pymongo's Collection both backends provide"""
+
+    def find(self, filter=None, projection=None, **kwargs) -> Iterable[dict]: ...
+    def find_one(self, filter=None, projection=None, **kwargs) -> Optional[dict]: ...
+    def count_documents(self, filter, **kwargs) -> int: ...
+    def distinct(self, key, filter=None, **kwargs) -> list: ...
+    def aggregate(self, pipeline, **kwargs) -> Iterable[dict]: ...
+    def insert_one(self, document, **kwargs): ...
+    def insert_many(self, documents, ordered=True, **kwargs): ...
+    def update_one(self, filter, update, upsert=False, **kwargs): ...
+    def update_many(self, filter, update, upsert=False, **kwargs): ...
+    def replace_one(self, filter, replacement, upsert=False, **kwargs): ...
+    def find_one_and_update(self, filter, update, projection=None, **kwargs) -> Optional[dict]: ...
+    def find_one_and_delete(self, filter, projection=None, **kwargs) -> Optional[dict]: ...
+    def delete_one(self, filter, **kwargs): ...
+    def delete_many(self, filter, **kwargs): ...
+    def bulk_write(self, requests, ordered=True, **kwargs): ...
+    def create_index(self, keys, **kwargs) -> str: ...
+
+if settings.storage_backend == "memory":
+    # Ids stay strings in memory, so BINARY_UUIDS does not apply
+    from app.memory_backend import MemoryClient
+    client = MemoryClient()
+    db = client.get_database(settings.mongo_db_name)
+else:
+    client = MongoClient(MONGO_URL, event_listeners=[query_counter])
+    db = client.get_database(
+        settings.mongo_db_name, codec_options=STORAGE_CODEC_OPTIONS if settings.binary_uuids else None
+    )
+
+def _collection(name: str) -> Collection:
+    collection = db[name]
+    if settings.binary_uuids and settings.storage_backend == "mongo":
+        return BinaryUuidCollection(collection)
+    return collection
 
 # Collections
-users_collection = db.users
-children_collection = db.child_profiles
-quests_collection = db.quests
-quest_steps_collection = db.quest_steps
-progress_collection = db.progress
-cosmetics_collection = db.cosmetics
-inventory_collection = db.inventory
-rewards_collection = db.rewards
+users_collection = _collection("users")
+children_collection = _collection("child_profiles")
+quests_collection = _collection("quests")
+quest_steps_collection = _collection("quest_steps")
+progress_collection = _collection("progress")
+cosmetics_collection = _collection("cosmetics")
+inventory_collection = _collection("inventory")
+badges_collection = _collection("badges")
+rewards_collection = _collection("rewards")
+skill_mastery_collection = _collection("skill_mastery")
+deletion_jobs_collection = _collection("deletion_jobs")
+catalog_versions_collection = _collection("catalog_versions")
+progress_events_collection = _collection("progress_events")
+event_checkpoints_collection = _collection("event_checkpoints")
+quest_stats_collection = _collection("quest_stats")
+dead_letter_tasks_collection = _collection("dead_letter_tasks")
+step_id_lists_collection = _collection("step_id_lists")
+
+# A deleted profile keeps a deleted_at tombstone until its deletion job has purged everything;
+# reads that look up a child profile add this filter so deleted children disappear at once
+LIVE_CHILD = {"deleted_at": None}
+
+# Per-child collections purged when a child profile is deleted, as (collection, child key field).
+# Register every new per-child collection here.
+CHILD_DEPENDENTS = [
+    (progress_collection, "child_id"),
+    (inventory_collection, "child_id"),
+    (skill_mastery_collection, "child_id"),
+    (progress_events_collection, "child_id"),
+]
+
+def child_is_live(child_id: str) -> bool:
+    """False once a child is tombstoned; deferred writes check it so they cannot outlive a purge"""
+    return children_collection.find_one({"id": child_id, **LIVE_CHILD}, {"_id": 1}) is not None
 
 def get_database():
-    return db
\ No newline at end of file
+    return db
+
+def dedupe_inventory(batch_size: int = 1000) -> int:
+    """Delete duplicate inventory items, keeping the earliest earned copy; returns how many were deleted"""
+    duplicates, equipped = [], []
+    kept_key, kept_id = None, None
+    items = inventory_collection.find(
+        {}, {"_id": 1, "child_id": 1, "item_type": 1, "item_id": 1, "is_equipped": 1}
+    ).sort([("child_id", ASCENDING), ("item_type", ASCENDING), ("item_id", ASCENDING), ("earned_at", ASCENDING)])
+    for item in items:
+        key = (item["child_id"], item["item_type"], item["item_id"])
+        if key != kept_key:
+            kept_key, kept_id = key, item["_id"]
+            continue
+        duplicates.append(item["_id"])
+        # An equipped duplicate leaves the kept copy equipped
+        if item.get("is_equipped"):
+            equipped.append(kept_id)
+    if equipped:
+        inventory_collection.update_many({"_id": {"$in": equipped}}, {"$set": {"is_equipped": True}})
+    for start in range(0, len(duplicates), batch_size):
+        inventory_collection.delete_many({"_id": {"$in": duplicates[start:start + batch_size]}})
+    return len(duplicates)
+
+def ensure_indexes():
+    """Create the indexes the routers rely on (idempotent)"""
+    children_collection.create_index("parent_id")
+    progress_collection.create_index([("child_id", ASCENDING), ("quest_id", ASCENDING)])
+    progress_collection.create_index("outbox.event_id", sparse=True)
+    progress_events_collection.create_index("event_id", unique=True)
+    progress_events_collection.create_index("child_id")
+    progress_events_collection.create_index("ts", expireAfterSeconds=settings.event_retention_days * 86400)
+    quest_stats_collection.create_index(
+        [("quest_id", ASCENDING), ("step_id", ASCENDING), ("granularity", ASCENDING), ("bucket", ASCENDING)],
+        unique=True
+    )
+    quest_stats_collection.create_index([("granularity", ASCENDING), ("bucket", ASCENDING)])
+    inventory_collection.create_index([("child_id", ASCENDING), ("item_type", ASCENDING)])
+    owned_once = [("child_id", ASCENDING), ("item_type", ASCENDING), ("item_id", ASCENDING)]
+    try:
+        inventory_collection.create_index(owned_once, unique=True)
+    except DuplicateKeyError:
+        # Items granted twice before the index existed
+        dedupe_inventory()
+        inventory_collection.create_index(owned_once, unique=True)
+    cosmetics_collection.create_index("id", unique=True)
+    # Natural keys of seeded catalog documents (app.services.seeding)
+    for collection in (quests_collection, quest_steps_collection, cosmetics_collection):
+        collection.create_index("seed_key", unique=True, sparse=True)
+    badges_collection.create_index("id", unique=True)
+    deletion_jobs_collection.create_index([("status", ASCENDING), ("lease_until", ASCENDING)])
+    skill_mastery_collection.create_index(
+        [("child_id", ASCENDING), ("skill_name", ASCENDING)], unique=True
+    )
@@ -1,12 +1,23 @@
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.config import settings
-from app.routers import admin, auth, children, progress, quests
+from app.database import ensure_indexes
+from app.models.user import TokenData
+from app.routers import admin, analytics, auth, children, dashboard, progress, quests, shop
+from app.services.bundles import BUNDLE_DIR, BundleFiles, ensure_published
+from app.services.catalog import badges_cache
+from app.services.deletion import deletion_worker
+from app.services.events import outbox_relay
+from app.services.live import live_bridge, live_hub
+from app.services.rollups import quest_stats_consumer
+from app.services.tasks import task_queue
+from app.utils.auth import get_current_admin
+from app.utils.query_budget import query_headers_middleware
 
 app = FastAPI(
     title=settings.app_name,
@@ -23,12 +34,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.debug:
+    app.middleware("http")(query_headers_middleware)
+
 # Include API routers
 app.include_router(auth.router)
 app.include_router(children.router)
 app.include_router(quests.router)
 app.include_router(progress.router)
 app.include_router(admin.router)
+app.include_router(analytics.router)
+app.include_router(dashboard.router)
+app.include_router(shop.router)
+
+
+@app.on_event("startup")
+async def on_startup():
+    ensure_indexes()
+    badges_cache.refresh()
+    ensure_published()
+    task_queue.start()
+    deletion_worker.start()
+    outbox_relay.start()
+    quest_stats_consumer.loop.start()
+    live_bridge.loop.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await live_bridge.loop.stop()
+    await deletion_worker.stop()
+    await outbox_relay.stop()
+    await quest_stats_consumer.loop.stop()
+    await task_queue.stop()
 
 
 @app.get("/api/health")
@@ -36,6 +74,11 @@ async def health_check():
     return {"status": "healthy", "app": settings.app_name}
 
 
+@app.get("/api/metrics")
+async def metrics(current_user: TokenData = Depends(get_current_admin)):
+    return {"task_queue": task_queue.stats(), "live": live_hub.stats()}
+
+
 @app.get("/api")
 async def root():
     return {
@@ -45,6 +88,10 @@ async def root():
     }
 
 
+# Content-hashed quest bundles (see app.services.bundles), served next to the SPA
+BUNDLE_DIR.mkdir(parents=True, exist_ok=True)
+app.mount("/bundles", BundleFiles(directory=BUNDLE_DIR), name="quest-bundles")
+
 # Serve frontend build from the same FastAPI port when available.
 FRONTEND_DIST = Path(__file__).resolve().parents[2] / "frontend" / "dist"
 if FRONTEND_DIST.exists():
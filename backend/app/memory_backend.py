@@ -0,0 +1,947 @@
+"""In-memory storage backend implementing the subset of the pymongo API the app uses.
+
+Selected with STORAGE_BACKEND=memory. Documents live in per-collection dicts keyed by
+_id, with hash indexes on the first field of every create_index() plus the fields the
+routers filter on, so equality and $in lookups do not scan. Unique indexes are enforced
+and raise the same pymongo errors. Queries, updates (including pipeline updates),
+projections, sorts and bulk writes follow MongoDB semantics closely enough for tests and
+benchmarks; TTL indexes are not expired and unsupported operators raise
+NotImplementedError rather than silently mismatching.
+
+Everything handed in or out is copied, so callers can mutate results freely, and each
+collection serializes access with a lock because routes and background tasks run on
+different threads. Each call is reported to the query counter as the command pymongo would
+send, so debug headers and query budgets work unchanged.
+"""
+
+import itertools
+import random
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+from app.utils.query_budget import query_counter
+
+DUPLICATE_KEY = 11000
+INDEX_NOT_FOUND = 27
+
+# Indexed in every collection in addition to declared indexes: the fields routers filter on
+DEFAULT_INDEXED_FIELDS = ("id", "child_id", "parent_id", "quest_id", "email", "username")
+
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy(v) for v in value]
+    return value
+
+
+# BSON comparison order across types
+def _type_rank(value: Any) -> int:
+    if value is None or value is MISSING:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, bytes):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    rank = _type_rank(value)
+    if rank == 1:
+        return (rank, 0)
+    if rank in (4, 5, 10):
+        return (rank, repr(value))
+    return (rank, value)
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Paths
+
+def _get(doc: Any, path: str) -> Any:
+    """Value at a dotted path without array traversal, or MISSING"""
+    for part in path.split("."):
+        if isinstance(doc, dict) and part in doc:
+            doc = doc[part]
+        elif isinstance(doc, list) and part.isdigit() and int(part) < len(doc):
+            doc = doc[int(part)]
+        else:
+            return MISSING
+    return doc
+
+
+def _candidates(doc: Any, parts: List[str]) -> List[Any]:
+    """Every value a query path can match, traversing arrays like MongoDB"""
+    if not parts:
+        if isinstance(doc, list):
+            return [doc] + doc
+        return [doc]
+    if isinstance(doc, dict):
+        if parts[0] not in doc:
+            return [MISSING]
+        return _candidates(doc[parts[0]], parts[1:])
+    if isinstance(doc, list):
+        if parts[0].isdigit():
+            index = int(parts[0])
+            return _candidates(doc[index], parts[1:]) if index < len(doc) else [MISSING]
+        values = []
+        for element in doc:
+            if isinstance(element, dict):
+                values.extend(v for v in _candidates(element, parts) if v is not MISSING)
+        return values or [MISSING]
+    return [MISSING]
+
+
+def _set(doc: Dict[str, Any], path: str, value: Any):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        if isinstance(doc, list) and part.isdigit():
+            doc = doc[int(part)]
+            continue
+        if not isinstance(doc.get(part), (dict, list)):
+            doc[part] = {}
+        doc = doc[part]
+    if isinstance(doc, list) and parts[-1].isdigit():
+        doc[int(parts[-1])] = value
+    else:
+        doc[parts[-1]] = value
+
+
+def _unset(doc: Dict[str, Any], path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part) if isinstance(doc, dict) else None
+        if doc is None:
+            return
+    if isinstance(doc, dict):
+        doc.pop(parts[-1], None)
+
+
+# ---------------------------------------------------------------------------
+# Query matching
+
+def _equals(candidate: Any, value: Any) -> bool:
+    if value is None:
+        return candidate is None or candidate is MISSING
+    return candidate is not MISSING and _type_rank(candidate) == _type_rank(value) and candidate == value
+
+
+def _compare(candidate: Any, value: Any, op: str) -> bool:
+    if candidate is MISSING or _type_rank(candidate) != _type_rank(value) or isinstance(candidate, (dict, list)):
+        return False
+    if op == "$gt":
+        return candidate > value
+    if op == "$gte":
+        return candidate >= value
+    if op == "$lt":
+        return candidate < value
+    return candidate <= value
+
+
+def _match_operator(candidates: List[Any], op: str, arg: Any) -> bool:
+    if op == "$eq":
+        return any(_equals(c, arg) for c in candidates)
+    if op == "$ne":
+        return not any(_equals(c, arg) for c in candidates)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        return any(_compare(c, arg, op) for c in candidates)
+    if op == "$in":
+        return any(_equals(c, v) for c in candidates for v in arg)
+    if op == "$nin":
+        return not any(_equals(c, v) for c in candidates for v in arg)
+    if op == "$exists":
+        return any(c is not MISSING for c in candidates) == bool(arg)
+    if op == "$elemMatch":
+        return any(
+            isinstance(c, list) and any(_match_element(e, arg) for e in c)
+            for c in candidates
+        )
+    if op == "$not":
+        return not _match_condition(candidates, arg)
+    if op == "$size":
+        return any(isinstance(c, list) and len(c) == arg for c in candidates)
+    raise NotImplementedError(f"memory backend does not support query operator {op}")
+
+
+def _is_operator_dict(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value) and all(k.startswith("$") for k in value)
+
+
+def _match_condition(candidates: List[Any], condition: Any) -> bool:
+    if _is_operator_dict(condition):
+        return all(_match_operator(candidates, op, arg) for op, arg in condition.items())
+    return any(_equals(c, condition) for c in candidates)
+
+
+def _match_element(element: Any, condition: Any) -> bool:
+    """Array element against a $pull / $elemMatch condition"""
+    if _is_operator_dict(condition):
+        return _match_condition([element], condition)
+    if isinstance(condition, dict) and isinstance(element, dict):
+        return matches(element, condition)
+    return _equals(element, condition)
+
+
+def matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    if not query:
+        return True
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, q) for q in condition):
+                return False
+        elif key.startswith("$"):
+            raise NotImplementedError(f"memory backend does not support query operator {key}")
+        elif not _match_condition(_candidates(doc, key.split(".")), condition):
+            return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Aggregation expressions (pipeline updates)
+
+def _eval(expr: Any, doc: Dict[str, Any]) -> Any:
+    if isinstance(expr, str) and expr.startswith("$") and not expr.startswith("$$"):
+        value = _get(doc, expr[1:])
+        return None if value is MISSING else value
+    if isinstance(expr, list):
+        return [_eval(e, doc) for e in expr]
+    if not isinstance(expr, dict):
+        return expr
+    if len(expr) == 1 and next(iter(expr)).startswith("$"):
+        op, arg = next(iter(expr.items()))
+        return _eval_operator(op, arg, doc)
+    return {k: _eval(v, doc) for k, v in expr.items()}
+
+
+def _eval_operator(op: str, arg: Any, doc: Dict[str, Any]) -> Any:
+    if op == "$literal":
+        return arg
+    if op == "$switch":
+        for branch in arg["branches"]:
+            if _eval(branch["case"], doc):
+                return _eval(branch["then"], doc)
+        return _eval(arg.get("default"), doc)
+    if op == "$cond":
+        if isinstance(arg, dict):
+            arg = [arg["if"], arg["then"], arg["else"]]
+        return _eval(arg[1], doc) if _eval(arg[0], doc) else _eval(arg[2], doc)
+
+    values = _eval(arg, doc)
+    if op == "$ifNull":
+        return next((v for v in values if v is not None), None)
+    if op in ("$add", "$multiply", "$subtract", "$max", "$min") and any(v is None for v in values):
+        present = [v for v in values if v is not None]
+        if op in ("$max", "$min") and present:
+            return max(present) if op == "$max" else min(present)
+        return None
+    if op == "$add":
+        return sum(values)
+    if op == "$subtract":
+        return values[0] - values[1]
+    if op == "$multiply":
+        result = 1
+        for v in values:
+            result *= v
+        return result
+    if op == "$max":
+        return max(values)
+    if op == "$min":
+        return min(values)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        return _compare(values[0], values[1], op)
+    if op == "$eq":
+        return _equals(values[0], values[1])
+    if op == "$ne":
+        return not _equals(values[0], values[1])
+    if op == "$and":
+        return all(values)
+    if op == "$or":
+        return any(values)
+    if op == "$not":
+        return not values[0]
+    raise NotImplementedError(f"memory backend does not support expression operator {op}")
+
+
+# ---------------------------------------------------------------------------
+# Updates
+
+def _is_pipeline(update: Any) -> bool:
+    return isinstance(update, list)
+
+
+def _apply_update(doc: Dict[str, Any], update: Any, inserting: bool):
+    """Apply an update document or pipeline to doc in place"""
+    if _is_pipeline(update):
+        for stage in update:
+            (op, spec), = stage.items()
+            if op in ("$set", "$addFields"):
+                values = {field: _eval(expr, doc) for field, expr in spec.items()}
+                for field, value in values.items():
+                    _set(doc, field, value)
+            elif op in ("$unset", "$project") and not isinstance(spec, dict):
+                for field in [spec] if isinstance(spec, str) else spec:
+                    _unset(doc, field)
+            else:
+                raise NotImplementedError(f"memory backend does not support pipeline stage {op}")
+        return
+
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for path, arg in fields.items():
+            if path == "_id" and op != "$setOnInsert":
+                continue
+            current = _get(doc, path)
+            if op in ("$set", "$setOnInsert"):
+                _set(doc, path, _copy(arg))
+            elif op == "$unset":
+                _unset(doc, path)
+            elif op == "$inc":
+                _set(doc, path, (0 if current is MISSING or current is None else current) + arg)
+            elif op == "$mul":
+                _set(doc, path, (0 if current is MISSING or current is None else current) * arg)
+            elif op == "$max":
+                if current is MISSING or _sort_key(arg) > _sort_key(current):
+                    _set(doc, path, _copy(arg))
+            elif op == "$min":
+                if current is MISSING or _sort_key(arg) < _sort_key(current):
+                    _set(doc, path, _copy(arg))
+            elif op in ("$push", "$addToSet"):
+                items = arg["$each"] if isinstance(arg, dict) and "$each" in arg else [arg]
+                array = [] if current is MISSING or current is None else current
+                for item in items:
+                    if op == "$push" or not any(_equals(e, item) for e in array):
+                        array.append(_copy(item))
+                _set(doc, path, array)
+            elif op == "$pull":
+                if isinstance(current, list):
+                    _set(doc, path, [e for e in current if not _match_element(e, arg)])
+            else:
+                raise NotImplementedError(f"memory backend does not support update operator {op}")
+
+
+def _upsert_seed(query: Dict[str, Any]) -> Dict[str, Any]:
+    """Equality fields of a filter, which an upserted document starts from"""
+    doc: Dict[str, Any] = {}
+    for key, condition in (query or {}).items():
+        if key.startswith("$"):
+            continue
+        if _is_operator_dict(condition):
+            if "$eq" in condition:
+                _set(doc, key, _copy(condition["$eq"]))
+        else:
+            _set(doc, key, _copy(condition))
+    return doc
+
+
+def _include(target: Dict[str, Any], source: Dict[str, Any], parts: List[str]):
+    """Copy one inclusion path into target, projecting through arrays of subdocuments"""
+    head = parts[0]
+    if head not in source:
+        return
+    value = source[head]
+    if len(parts) == 1:
+        target[head] = _copy(value)
+    elif isinstance(value, dict):
+        _include(target.setdefault(head, {}), value, parts[1:])
+    elif isinstance(value, list):
+        existing = target.setdefault(head, [{} for e in value if isinstance(e, dict)])
+        for element, projected in zip([e for e in value if isinstance(e, dict)], existing):
+            _include(projected, element, parts[1:])
+
+
+def _project(doc: Dict[str, Any], projection: Any) -> Dict[str, Any]:
+    if not projection:
+        return _copy(doc)
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = bool(projection.get("_id", 1))
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and all(fields.values()):
+        result = {"_id": doc["_id"]} if include_id and "_id" in doc else {}
+        for path in fields:
+            _include(result, doc, path.split("."))
+        return result
+    result = _copy(doc)
+    for path, include in fields.items():
+        if not include:
+            _unset(result, path)
+    if not include_id:
+        result.pop("_id", None)
+    return result
+
+
+def _sort_spec(key_or_list: Any, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    return [(k, d) for k, d in key_or_list]
+
+
+def _sorted(docs: List[Dict[str, Any]], spec: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    # Stable sorts applied from the least significant key
+    for field, direction in reversed(spec):
+        docs.sort(key=lambda d: _sort_key(_get(d, field)), reverse=direction < 0)
+    return docs
+
+
+# ---------------------------------------------------------------------------
+# Indexes
+
+class _Index:
+    def __init__(self, fields: List[str], unique: bool, sparse: bool, name: str):
+        self.fields = fields
+        self.unique = unique
+        self.sparse = sparse
+        self.name = name
+        # First field's value -> _ids, for equality and $in lookups
+        self.entries: Dict[Any, Set[Any]] = {}
+        # Documents whose first field holds an unhashable value, always scanned
+        self.unhashable: Set[Any] = set()
+        # Full key -> _id, for unique enforcement
+        self.keys: Dict[Tuple, Any] = {}
+
+    def _first_values(self, doc: Dict[str, Any]) -> List[Any]:
+        values = _candidates(doc, self.fields[0].split("."))
+        return [None if v is MISSING else v for v in values]
+
+    def _key(self, doc: Dict[str, Any]) -> Optional[Tuple]:
+        values = tuple(_get(doc, f) for f in self.fields)
+        if self.sparse and all(v is MISSING for v in values):
+            return None
+        key = tuple(None if v is MISSING else v for v in values)
+        return key if _hashable(key) else None
+
+    def conflict(self, doc: Dict[str, Any]) -> bool:
+        if not self.unique:
+            return False
+        key = self._key(doc)
+        return key is not None and self.keys.get(key, doc["_id"]) != doc["_id"]
+
+    def add(self, doc: Dict[str, Any]):
+        for value in self._first_values(doc):
+            if _hashable(value):
+                self.entries.setdefault(value, set()).add(doc["_id"])
+            else:
+                self.unhashable.add(doc["_id"])
+        if self.unique:
+            key = self._key(doc)
+            if key is not None:
+                self.keys[key] = doc["_id"]
+
+    def remove(self, doc: Dict[str, Any]):
+        for value in self._first_values(doc):
+            if _hashable(value):
+                ids = self.entries.get(value)
+                if ids is not None:
+                    ids.discard(doc["_id"])
+                    if not ids:
+                        del self.entries[value]
+        self.unhashable.discard(doc["_id"])
+        if self.unique:
+            key = self._key(doc)
+            if key is not None and self.keys.get(key) == doc["_id"]:
+                del self.keys[key]
+
+    def lookup(self, values: Iterable[Any]) -> Set[Any]:
+        ids = set(self.unhashable)
+        for value in values:
+            if _hashable(value):
+                ids |= self.entries.get(value, set())
+        return ids
+
+
+def _bulk_command(request) -> str:
+    if isinstance(request, InsertOne):
+        return "insert"
+    if isinstance(request, (DeleteOne, DeleteMany)):
+        return "delete"
+    return "update"
+
+
+class MemoryCursor:
+    def __init__(self, collection: "MemoryCollection", query: Optional[Dict[str, Any]], projection: Any):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort: Optional[List[Tuple[str, int]]] = None
+        self._limit = 0
+        self._skip = 0
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    def skip(self, skip: int):
+        self._skip = skip
+        return self
+
+    def batch_size(self, batch_size: int):
+        return self
+
+    def close(self):
+        self._results = iter(())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._results is None:
+            query_counter.record("find", self._collection.name)
+            self._results = iter(self._collection._select(
+                self._query, self._projection, self._sort, self._skip, self._limit
+            ))
+        return next(self._results)
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self._lock = threading.RLock()
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self._order: Dict[Any, int] = {}
+        self._sequence = itertools.count()
+        self._indexes: Dict[str, _Index] = {}
+        for field in DEFAULT_INDEXED_FIELDS:
+            self._indexes[f"{field}_hash"] = _Index([field], unique=False, sparse=False, name=f"{field}_hash")
+
+    # -- indexes -------------------------------------------------------------
+
+    def create_index(self, keys, unique: bool = False, sparse: bool = False, name: Optional[str] = None, **kwargs) -> str:
+        fields = [keys] if isinstance(keys, str) else [k for k, _ in keys]
+        name = name or "_".join(f"{f}_1" for f in fields)
+        with self._lock:
+            if name in self._indexes:
+                return name
+            index = _Index(fields, unique, sparse, name)
+            for doc in self._docs.values():
+                if index.conflict(doc):
+                    raise DuplicateKeyError(f"E11000 duplicate key error building index {name}", DUPLICATE_KEY)
+                index.add(doc)
+            self._indexes[name] = index
+        return name
+
+    def drop_index(self, name: str):
+        with self._lock:
+            if name not in self._indexes or name.endswith("_hash"):
+                raise OperationFailure(f"index not found with name [{name}]", INDEX_NOT_FOUND)
+            del self._indexes[name]
+
+    def drop_indexes(self):
+        with self._lock:
+            for name in [n for n in self._indexes if not n.endswith("_hash")]:
+                del self._indexes[name]
+
+    def index_information(self) -> Dict[str, Any]:
+        # The built-in hash indexes are an implementation detail, like the _id index they stand beside
+        info = {"_id_": {"key": [("_id", 1)]}}
+        for name, index in self._indexes.items():
+            if not name.endswith("_hash"):
+                info[name] = {"key": [(f, 1) for f in index.fields], "unique": index.unique}
+        return info
+
+    # -- internals -------------------------------------------------------------
+
+    def _plan(self, query: Optional[Dict[str, Any]]) -> Iterable[Any]:
+        """Candidate _ids from an index on an equality or $in condition, else every document"""
+        if query:
+            if "_id" in query:
+                condition = query["_id"]
+                if not _is_operator_dict(condition):
+                    return [condition] if _hashable(condition) and condition in self._docs else []
+                if "$in" in condition:
+                    ids = {i for i in condition["$in"] if _hashable(i) and i in self._docs}
+                    return sorted(ids, key=self._order.__getitem__)
+            for key, condition in query.items():
+                if key.startswith("$"):
+                    continue
+                if _is_operator_dict(condition):
+                    if "$eq" in condition:
+                        values = [condition["$eq"]]
+                    elif "$in" in condition:
+                        values = condition["$in"]
+                    else:
+                        continue
+                elif isinstance(condition, (dict, list)):
+                    continue
+                else:
+                    values = [condition]
+                for index in self._indexes.values():
+                    if index.fields[0] == key:
+                        ids = index.lookup(values)
+                        return sorted(ids, key=self._order.__getitem__)
+        return list(self._docs)
+
+    def _find_ids(self, query, sort=None, limit: int = 0) -> List[Any]:
+        ids = [i for i in self._plan(query) if matches(self._docs[i], query)]
+        if sort:
+            docs = _sorted([self._docs[i] for i in ids], sort)
+            ids = [d["_id"] for d in docs]
+        return ids[:limit] if limit else ids
+
+    def _select(self, query, projection, sort, skip: int, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            ids = self._find_ids(query, sort)
+            ids = ids[skip:skip + limit] if limit else ids[skip:]
+            return [_project(self._docs[i], projection) for i in ids]
+
+    def _check_unique(self, doc: Dict[str, Any]):
+        for index in self._indexes.values():
+            if index.conflict(doc):
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.full_name} index: {index.name}", DUPLICATE_KEY
+                )
+
+    def _insert(self, doc: Dict[str, Any]) -> Any:
+        doc = _copy(doc)
+        doc.setdefault("_id", ObjectId())
+        if doc["_id"] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} index: _id_", DUPLICATE_KEY)
+        self._check_unique(doc)
+        self._docs[doc["_id"]] = doc
+        self._order[doc["_id"]] = next(self._sequence)
+        for index in self._indexes.values():
+            index.add(doc)
+        return doc["_id"]
+
+    def _replace(self, old: Dict[str, Any], new: Dict[str, Any]):
+        new["_id"] = old["_id"]
+        self._check_unique(new)
+        for index in self._indexes.values():
+            index.remove(old)
+        self._docs[old["_id"]] = new
+        for index in self._indexes.values():
+            index.add(new)
+
+    def _delete(self, _id: Any):
+        doc = self._docs.pop(_id)
+        self._order.pop(_id)
+        for index in self._indexes.values():
+            index.remove(doc)
+
+    def _update(self, query, update, upsert: bool, multi: bool, sort=None, replace: bool = False) -> Dict[str, Any]:
+        """Apply an update; returns raw counts plus the before/after documents of the first match"""
+        ids = self._find_ids(query, sort, limit=0 if multi else 1)
+        if not ids:
+            if not upsert:
+                return {"n": 0, "nModified": 0, "before": None, "after": None}
+            doc = _upsert_seed(query)
+            if replace:
+                doc = {**_copy(update), **({"_id": doc["_id"]} if "_id" in doc else {})}
+            else:
+                _apply_update(doc, update, inserting=True)
+            _id = self._insert(doc)
+            return {"n": 1, "nModified": 0, "upserted": _id, "before": None, "after": self._docs[_id]}
+
+        modified = 0
+        first_before = first_after = None
+        for _id in ids:
+            old = self._docs[_id]
+            new = _copy(update) if replace else _copy(old)
+            if not replace:
+                _apply_update(new, update, inserting=False)
+            new["_id"] = _id
+            if new != old:
+                self._replace(old, new)
+                modified += 1
+            if first_before is None:
+                first_before, first_after = old, self._docs[_id]
+        return {"n": len(ids), "nModified": modified, "before": first_before, "after": first_after}
+
+    @staticmethod
+    def _update_result(raw: Dict[str, Any]) -> UpdateResult:
+        return UpdateResult({k: v for k, v in raw.items() if k not in ("before", "after")}, True)
+
+    # -- reads -----------------------------------------------------------------
+
+    def find(self, filter=None, projection=None, sort=None, limit: int = 0, skip: int = 0, **kwargs) -> MemoryCursor:
+        cursor = MemoryCursor(self, filter, projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor.limit(limit).skip(skip)
+
+    def find_one(self, filter=None, projection=None, sort=None, **kwargs) -> Optional[Dict[str, Any]]:
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        return next(iter(self.find(filter, projection, sort=sort, limit=1)), None)
+
+    def count_documents(self, filter, **kwargs) -> int:
+        query_counter.record("aggregate", self.name)
+        with self._lock:
+            return len(self._find_ids(filter))
+
+    def estimated_document_count(self, **kwargs) -> int:
+        return len(self._docs)
+
+    def distinct(self, key: str, filter=None, **kwargs) -> List[Any]:
+        query_counter.record("distinct", self.name)
+        values: List[Any] = []
+        with self._lock:
+            docs = [self._docs[i] for i in self._find_ids(filter)]
+        for doc in docs:
+            for value in _candidates(doc, key.split(".")):
+                if value is not MISSING and not isinstance(value, list) and value not in values:
+                    values.append(value)
+        return values
+
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs):
+        """$match, $sort, $skip, $limit, $project and $sample only"""
+        query_counter.record("aggregate", self.name)
+        with self._lock:
+            docs = [_copy(d) for d in self._docs.values()]
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if matches(d, spec)]
+            elif op == "$sort":
+                docs = _sorted(docs, list(spec.items()))
+            elif op == "$skip":
+                docs = docs[spec:]
+            elif op == "$limit":
+                docs = docs[:spec]
+            elif op == "$project":
+                docs = [_project(d, spec) for d in docs]
+            elif op == "$sample":
+                docs = random.sample(docs, min(spec["size"], len(docs)))
+            else:
+                raise NotImplementedError(f"memory backend does not support aggregation stage {op}")
+        return iter(docs)
+
+    # -- writes ----------------------------------------------------------------
+
+    def insert_one(self, document: Dict[str, Any], **kwargs) -> InsertOneResult:
+        query_counter.record("insert", self.name)
+        with self._lock:
+            _id = self._insert(document)
+        document.setdefault("_id", _id)
+        return InsertOneResult(_id, True)
+
+    def insert_many(self, documents: Iterable[Dict[str, Any]], ordered: bool = True, **kwargs) -> InsertManyResult:
+        documents = list(documents)
+        query_counter.record("insert", self.name)
+        inserted, errors = [], []
+        with self._lock:
+            for index, document in enumerate(documents):
+                try:
+                    _id = self._insert(document)
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": DUPLICATE_KEY, "errmsg": str(e), "op": document})
+                    if ordered:
+                        break
+                    continue
+                document.setdefault("_id", _id)
+                inserted.append(_id)
+        if errors:
+            raise BulkWriteError({
+                "writeErrors": errors, "writeConcernErrors": [], "nInserted": len(inserted),
+                "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": [],
+            })
+        return InsertManyResult(inserted, True)
+
+    def update_one(self, filter, update, upsert: bool = False, **kwargs) -> UpdateResult:
+        query_counter.record("update", self.name)
+        with self._lock:
+            return self._update_result(self._update(filter, update, upsert, multi=False))
+
+    def update_many(self, filter, update, upsert: bool = False, **kwargs) -> UpdateResult:
+        query_counter.record("update", self.name)
+        with self._lock:
+            return self._update_result(self._update(filter, update, upsert, multi=True))
+
+    def replace_one(self, filter, replacement, upsert: bool = False, **kwargs) -> UpdateResult:
+        query_counter.record("update", self.name)
+        with self._lock:
+            return self._update_result(self._update(filter, replacement, upsert, multi=False, replace=True))
+
+    def find_one_and_update(self, filter, update, projection=None, sort=None, upsert: bool = False,
+                            return_document: bool = False, **kwargs) -> Optional[Dict[str, Any]]:
+        query_counter.record("findAndModify", self.name)
+        with self._lock:
+            raw = self._update(filter, update, upsert, multi=False, sort=_sort_spec(sort) if sort else None)
+            doc = raw["after"] if return_document else raw["before"]
+            return _project(doc, projection) if doc is not None else None
+
+    def find_one_and_replace(self, filter, replacement, projection=None, sort=None, upsert: bool = False,
+                             return_document: bool = False, **kwargs) -> Optional[Dict[str, Any]]:
+        query_counter.record("findAndModify", self.name)
+        with self._lock:
+            raw = self._update(filter, replacement, upsert, multi=False, sort=_sort_spec(sort) if sort else None, replace=True)
+            doc = raw["after"] if return_document else raw["before"]
+            return _project(doc, projection) if doc is not None else None
+
+    def find_one_and_delete(self, filter, projection=None, sort=None, **kwargs) -> Optional[Dict[str, Any]]:
+        query_counter.record("findAndModify", self.name)
+        with self._lock:
+            ids = self._find_ids(filter, _sort_spec(sort) if sort else None, limit=1)
+            if not ids:
+                return None
+            doc = self._docs[ids[0]]
+            self._delete(ids[0])
+            return _project(doc, projection)
+
+    def delete_one(self, filter, **kwargs) -> DeleteResult:
+        query_counter.record("delete", self.name)
+        with self._lock:
+            ids = self._find_ids(filter, limit=1)
+            for _id in ids:
+                self._delete(_id)
+        return DeleteResult({"n": len(ids)}, True)
+
+    def delete_many(self, filter, **kwargs) -> DeleteResult:
+        query_counter.record("delete", self.name)
+        with self._lock:
+            ids = self._find_ids(filter)
+            for _id in ids:
+                self._delete(_id)
+        return DeleteResult({"n": len(ids)}, True)
+
+    def bulk_write(self, requests, ordered: bool = True, **kwargs) -> BulkWriteResult:
+        result = {
+            "writeErrors": [], "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0,
+            "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": [],
+        }
+        requests = list(requests)
+        # pymongo sends one command per run of same-kind operations
+        for command, _ in itertools.groupby(_bulk_command(r) for r in requests):
+            query_counter.record(command, self.name)
+        with self._lock:
+            for index, request in enumerate(requests):
+                try:
+                    # Write models keep their arguments in these attributes across pymongo 4.x
+                    if isinstance(request, InsertOne):
+                        self._insert(request._doc)
+                        result["nInserted"] += 1
+                    elif isinstance(request, (UpdateOne, UpdateMany, ReplaceOne)):
+                        raw = self._update(
+                            request._filter, request._doc, request._upsert,
+                            multi=isinstance(request, UpdateMany), replace=isinstance(request, ReplaceOne)
+                        )
+                        if "upserted" in raw:
+                            result["nUpserted"] += 1
+                            result["upserted"].append({"index": index, "_id": raw["upserted"]})
+                        else:
+                            result["nMatched"] += raw["n"]
+                            result["nModified"] += raw["nModified"]
+                    elif isinstance(request, (DeleteOne, DeleteMany)):
+                        ids = self._find_ids(request._filter, limit=0 if isinstance(request, DeleteMany) else 1)
+                        for _id in ids:
+                            self._delete(_id)
+                        result["nRemoved"] += len(ids)
+                    else:
+                        raise NotImplementedError(f"memory backend does not support {type(request).__name__}")
+                except DuplicateKeyError as e:
+                    result["writeErrors"].append({"index": index, "code": DUPLICATE_KEY, "errmsg": str(e)})
+                    if ordered:
+                        break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    def drop(self):
+        self.database.drop_collection(self.name)
+
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(self, name)
+            return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str, **kwargs) -> MemoryCollection:
+        return self[name]
+
+    def list_collection_names(self) -> List[str]:
+        return [name for name, collection in self._collections.items() if collection._docs]
+
+    def drop_collection(self, name: str):
+        # Cleared in place: modules hold references to collections from import time
+        collection = self._collections.get(name)
+        if collection is not None:
+            with collection._lock:
+                for _id in list(collection._docs):
+                    collection._delete(_id)
+                collection.drop_indexes()
+
+    def command(self, command, *args, **kwargs):
+        raise NotImplementedError(f"memory backend does not run database commands ({command})")
+
+
+class MemoryClient:
+    def __init__(self):
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(self, name)
+        return self._databases[name]
+
+    def get_database(self, name: str, **kwargs) -> MemoryDatabase:
+        return self[name]
+
+    def drop_database(self, name: str):
+        database = self._databases.get(name)
+        if database is not None:
+            for collection_name in list(database._collections):
+                database.drop_collection(collection_name)
+
+    def close(self):
+        pass
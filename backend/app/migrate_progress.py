@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Convert stored progress documents between the full and compact encodings.
+
+Runs in _id-ordered batches, so it can be stopped and re-run safely:
+
+    python -m app.migrate_progress --report            # size comparison only
+    python -m app.migrate_progress                     # compact everything
+    python -m app.migrate_progress --expand            # back to the full form
+"""
+
+import argparse
+import time
+
+import bson
+from pymongo import UpdateOne
+
+from app.database import db, progress_collection
+from app.models.progress import COMPACT_STEPS_FIELD, compact_progress_document
+from app.services import progress_store
+
+
+def migrate(expand: bool, batch_size: int, delay_ms: int):
+    """Rewrite documents not yet in the target form, one bulk_write per batch"""
+    source_field = COMPACT_STEPS_FIELD if expand else "steps_progress"
+    ids_by_quest = {}
+    last_id = None
+    converted = skipped = 0
+    
+    while True:
+        query = {source_field: {"$exists": True}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = list(progress_collection.find(query).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+        
+        ops = []
+        for doc in batch:
+            if expand:
+                target = progress_store.expand(doc)
+            else:
+                if doc["quest_id"] not in ids_by_quest:
+                    ids_by_quest[doc["quest_id"]] = progress_store.step_ids(doc["quest_id"])
+                target = progress_store.compact(doc, ids_by_quest[doc["quest_id"]])
+            if target is None:
+                # References steps the quest no longer has, or too many for the bitmask; left in the full form
+                skipped += 1
+                continue
+            # Fields the target form omits (the source field and zero counters) are removed
+            unset = {k: "" for k in doc if k not in target}
+            # Guard on the source field so a concurrent API write is not overwritten with stale state
+            ops.append(UpdateOne(
+                {"_id": doc["_id"], source_field: doc[source_field]},
+                {"$set": {k: v for k, v in target.items() if k != "_id"}, "$unset": unset}
+            ))
+        if ops:
+            converted += progress_collection.bulk_write(ops, ordered=False).modified_count
+        print(f"  {converted} converted, {skipped} skipped")
+        time.sleep(delay_ms / 1000)
+    
+    return converted, skipped
+
+
+def report(sample_size: int):
+    """Average BSON size of sampled documents in each encoding, plus collection totals"""
+    full_bytes = compact_bytes = count = 0
+    ids_by_quest = {}
+    for doc in progress_collection.aggregate([{"$sample": {"size": sample_size}}]):
+        if doc["quest_id"] not in ids_by_quest:
+            ids_by_quest[doc["quest_id"]] = progress_store.step_ids(doc["quest_id"])
+        full = progress_store.expand(doc)
+        compact = compact_progress_document(full, ids_by_quest[doc["quest_id"]]) or full
+        full_bytes += len(bson.encode(full))
+        compact_bytes += len(bson.encode(compact))
+        count += 1
+    
+    stats = db.command("collStats", progress_collection.name)
+    print(f"Documents: {stats.get('count', 0)}")
+    print(f"Stored data size: {stats.get('size', 0)} bytes (avg {stats.get('avgObjSize', 0)} bytes/doc)")
+    print(f"Storage size on disk: {stats.get('storageSize', 0)} bytes")
+    compact_count = progress_collection.count_documents({COMPACT_STEPS_FIELD: {"$exists": True}})
+    print(f"Compact documents: {compact_count}")
+    if count:
+        print(f"Sample of {count}: full avg {full_bytes / count:.0f} bytes, compact avg {compact_bytes / count:.0f} bytes "
+              f"({100 * (1 - compact_bytes / full_bytes):.1f}% smaller)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expand", action="store_true", help="convert compact documents back to the full form")
+    parser.add_argument("--report", action="store_true", help="print the size comparison without migrating")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--delay-ms", type=int, default=50, help="pause between batches")
+    parser.add_argument("--sample", type=int, default=1000, help="documents sampled for the size report")
+    args = parser.parse_args()
+    
+    if not args.report:
+        print("Expanding progress documents..." if args.expand else "Compacting progress documents...")
+        converted, skipped = migrate(args.expand, args.batch_size, args.delay_ms)
+        print(f"Done: {converted} converted, {skipped} skipped")
+    report(args.sample)
+
+
+if __name__ == "__main__":
+    main()
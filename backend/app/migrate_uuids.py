@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Convert stored ids between UUID strings and BSON Binary subtype 4, then rebuild indexes.
+
+Run with the API stopped: queries only match the form selected by BINARY_UUIDS.
+
+    python -m app.migrate_uuids --report               # index sizes only
+    python -m app.migrate_uuids                        # strings -> binary, then set BINARY_UUIDS=true
+    python -m app.migrate_uuids --revert               # binary -> strings, then unset BINARY_UUIDS
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List
+
+from bson.binary import Binary, UUID_SUBTYPE
+from pymongo import ReplaceOne
+
+from app.config import settings
+from app.database import ID_FIELDS, client, ensure_indexes, to_storage
+
+# Raw handle without the read codec, so stored Binary values are visible as such
+raw_db = client[settings.mongo_db_name]
+
+
+def to_strings(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: to_strings(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_strings(v) for v in value]
+    if isinstance(value, Binary) and value.subtype == UUID_SUBTYPE:
+        return str(value.as_uuid())
+    return value
+
+
+def collection_names():
+    return sorted(name for name in raw_db.list_collection_names() if not name.startswith("system."))
+
+
+def migrate_collection(name: str, revert: bool, batch_size: int, delay_ms: int) -> int:
+    """Rewrite documents whose id fields change, one bulk_write per _id-ordered batch"""
+    collection = raw_db[name]
+    convert = to_strings if revert else to_storage
+    last_id = None
+    converted = 0
+    
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = list(collection.find(query).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+        
+        ops = []
+        for doc in batch:
+            target = convert(doc)
+            if target != doc:
+                ops.append(ReplaceOne({"_id": doc["_id"]}, target))
+        if ops:
+            converted += collection.bulk_write(ops, ordered=False).modified_count
+        time.sleep(delay_ms / 1000)
+    return converted
+
+
+def index_sizes() -> Dict[str, int]:
+    return {
+        name: raw_db.command("collStats", name).get("totalIndexSize", 0)
+        for name in collection_names()
+    }
+
+
+def id_indexes(name: str) -> List[str]:
+    """Secondary indexes of a collection with at least one id field in their key"""
+    return [
+        index_name for index_name, info in raw_db[name].index_information().items()
+        if index_name != "_id_" and any(field.rsplit(".", 1)[-1] in ID_FIELDS for field, _ in info["key"])
+    ]
+
+
+def rebuild_indexes():
+    """Drop and recreate the indexes over id fields so they are rebuilt compactly from the converted values"""
+    for name in collection_names():
+        for index_name in id_indexes(name):
+            raw_db[name].drop_index(index_name)
+    ensure_indexes()
+
+
+def print_sizes(before: Dict[str, int], after: Dict[str, int]):
+    for name in sorted(set(before) | set(after)):
+        print(f"  {name:24} {before.get(name, 0):>12} -> {after.get(name, 0):>12} bytes")
+    total_before, total_after = sum(before.values()), sum(after.values())
+    if total_before:
+        print(f"  {'total':24} {total_before:>12} -> {total_after:>12} bytes "
+              f"({100 * (1 - total_after / total_before):.1f}% smaller)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--revert", action="store_true", help="convert Binary ids back to strings")
+    parser.add_argument("--report", action="store_true", help="print index sizes without migrating")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--delay-ms", type=int, default=0, help="pause between batches")
+    args = parser.parse_args()
+    
+    before = index_sizes()
+    if args.report:
+        print_sizes(before, before)
+        return
+    
+    print(f"Converting id fields ({', '.join(sorted(ID_FIELDS))})...")
+    for name in collection_names():
+        converted = migrate_collection(name, args.revert, args.batch_size, args.delay_ms)
+        print(f"  {name}: {converted} documents")
+    print("Rebuilding indexes...")
+    rebuild_indexes()
+    print("Index sizes:")
+    print_sizes(before, index_sizes())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Optional, List, Literal
+from datetime import datetime
+
+Granularity = Literal["hour", "day"]
+
+class StepAnalytics(BaseModel):
+    step_id: str
+    step_order: Optional[int] = None
+    attempts: int = 0
+    completed: int = 0
+    hints: int = 0
+    dropped: int = 0  # Players who reached this step but never completed it
+
+class QuestAnalytics(BaseModel):
+    quest_id: str
+    started: int = 0
+    completed: int = 0
+    completion_rate: float = 0.0
+    median_attempts: Optional[float] = None
+    hints: int = 0
+    hint_rate: float = 0.0  # Share of completions that used at least one hint
+    drop_off_step: Optional[StepAnalytics] = None
+
+class QuestStatsPoint(BaseModel):
+    bucket: datetime
+    started: int = 0
+    completed: int = 0
+    hints: int = 0
+
+class QuestAnalyticsDetail(QuestAnalytics):
+    steps: List[StepAnalytics] = []
+    series: List[QuestStatsPoint] = []
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, List
+from datetime import datetime
+from app.models.child import ChildProfile
+from app.models.progress import SkillMastery
+
+class ChildStats(BaseModel):
+    child_id: str
+    total_xp: int
+    level: int
+    coins: int
+    quests_completed: int
+    quests_in_progress: int
+    stats_by_subject: Dict[str, int]
+
+class QuestActivity(BaseModel):
+    progress_id: str
+    quest_id: str
+    quest_title: Optional[str] = None
+    subject: Optional[str] = None
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    current_step_index: int = 0
+
+class ChildDashboard(BaseModel):
+    child: ChildProfile
+    stats: ChildStats
+    recent_activity: List[QuestActivity] = []
+    mastery: List[SkillMastery] = []
+
+class ParentDashboard(BaseModel):
+    children: List[ChildDashboard] = []
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Sequence, Union
 from datetime import datetime
+import hashlib
 import uuid
 
 class StepProgress(BaseModel):
@@ -10,6 +11,90 @@ class StepProgress(BaseModel):
     completed_at: Optional[datetime] = None
     score: Optional[int] = None
 
+# Compact storage form of steps_progress. Steps are referenced by their ordinal in the
+# quest's step_order, so decoding needs the quest's step ids in order, and "v" names that list:
+#   {"v": step ids version, "m": completion bitmask, "a": {ordinal: attempts},
+#    "t": {ordinal: completed_at}, "s": {ordinal: score}}
+# Default values are omitted; ordinals are string keys because BSON keys must be strings.
+COMPACT_STEPS_FIELD = "sp"
+
+# The completion bitmask is stored as a signed 64-bit BSON integer
+MAX_COMPACT_STEPS = 63
+
+# Top-level counters left out of compact documents while they are still zero
+COMPACT_DEFAULTS = {"current_step_index": 0, "total_attempts": 0, "hints_used": 0}
+
+def step_ids_version(step_ids: Sequence[str]) -> str:
+    """Short digest of an ordered step id list; changes whenever the quest's steps are replaced"""
+    return hashlib.sha1("\n".join(step_ids).encode()).hexdigest()[:16]
+
+def encode_steps_progress(steps_progress: List[Dict[str, Any]], step_ids: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """Compact form of steps_progress, or None if it references a step the quest no longer has
+    or the quest has too many steps for the bitmask"""
+    if len(step_ids) > MAX_COMPACT_STEPS:
+        return None
+    ordinals = {step_id: i for i, step_id in enumerate(step_ids)}
+    mask = 0
+    attempts, completed_at, scores = {}, {}, {}
+    for sp in steps_progress:
+        if sp["step_id"] not in ordinals:
+            return None
+        key = str(ordinals[sp["step_id"]])
+        if sp.get("completed"):
+            mask |= 1 << ordinals[sp["step_id"]]
+        if sp.get("attempts"):
+            attempts[key] = sp["attempts"]
+        if sp.get("completed_at") is not None:
+            completed_at[key] = sp["completed_at"]
+        if sp.get("score") is not None:
+            scores[key] = sp["score"]
+    
+    compact = {"v": step_ids_version(step_ids), "m": mask}
+    if attempts:
+        compact["a"] = attempts
+    if completed_at:
+        compact["t"] = completed_at
+    if scores:
+        compact["s"] = scores
+    return compact
+
+def decode_steps_progress(compact: Dict[str, Any], step_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """Expand the compact form back to one StepProgress dict per quest step"""
+    mask = compact.get("m", 0)
+    attempts = compact.get("a", {})
+    completed_at = compact.get("t", {})
+    scores = compact.get("s", {})
+    return [
+        {
+            "step_id": step_id,
+            "completed": bool(mask >> i & 1),
+            "attempts": attempts.get(str(i), 0),
+            "completed_at": completed_at.get(str(i)),
+            "score": scores.get(str(i)),
+        }
+        for i, step_id in enumerate(step_ids)
+    ]
+
+def compact_progress_document(doc: Dict[str, Any], step_ids: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """Storage form of a full progress document, or None if it cannot be compacted"""
+    compact = encode_steps_progress(doc.get("steps_progress", []), step_ids)
+    if compact is None:
+        return None
+    result = {
+        k: v for k, v in doc.items()
+        if k != "steps_progress" and not (k in COMPACT_DEFAULTS and v == COMPACT_DEFAULTS[k])
+    }
+    result[COMPACT_STEPS_FIELD] = compact
+    return result
+
+def expand_progress_document(doc: Dict[str, Any], step_ids: Sequence[str]) -> Dict[str, Any]:
+    """Full form of a stored progress document; full documents pass through unchanged"""
+    if COMPACT_STEPS_FIELD not in doc:
+        return doc
+    result = {k: v for k, v in doc.items() if k != COMPACT_STEPS_FIELD}
+    result["steps_progress"] = decode_steps_progress(doc[COMPACT_STEPS_FIELD], step_ids)
+    return result
+
 class QuestProgressBase(BaseModel):
     child_id: str
     quest_id: str
@@ -19,6 +104,7 @@ class QuestProgressBase(BaseModel):
     steps_progress: List[StepProgress] = []
     total_attempts: int = 0
     hints_used: int = 0
+    hints_revealed: Dict[str, int] = {}  # step_id -> hints revealed on that step
 
 class QuestProgressCreate(BaseModel):
     child_id: str
@@ -31,11 +117,26 @@ class QuestProgress(QuestProgressBase):
     id: str
 
 class QuestProgressUpdate(BaseModel):
+    # completed_at is set only by complete-quest, which also grants the rewards;
+    # answer results and attempts only by submit-answer
     current_step_index: Optional[int] = None
-    completed_at: Optional[datetime] = None
     steps_progress: Optional[List[StepProgress]] = None
-    total_attempts: Optional[int] = None
-    hints_used: Optional[int] = None
+
+class AnswerSubmission(BaseModel):
+    # A number or fraction string for math puzzles, the block sequence for code puzzles
+    answer: Union[int, float, str, List[str]]
+
+class AnswerResult(BaseModel):
+    correct: bool
+    explanation: Optional[str] = None  # Shown once the step is answered correctly
+    attempts: int  # Attempts on this step, including this one
+    progress: QuestProgress
+
+class HintResult(BaseModel):
+    hint: str
+    hint_number: int  # 1-based position of this hint among the step's hints
+    hints_remaining: int
+    hints_used: int  # Hints revealed across the whole quest
 
 class SkillMastery(BaseModel):
     skill_name: str
@@ -43,4 +144,4 @@ class SkillMastery(BaseModel):
     total_xp: int = 0
     quests_completed: int = 0
     mastery_level: int = 1  # 1-5
-    last_practiced: Optional[datetime] = None
\ No newline at end of file
+    last_practiced: Optional[datetime] = None
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Literal, List, Dict, Any
 from datetime import datetime
 import uuid
 
+from app.models.step_configs import normalize_step_config
+
 QuestStepType = Literal["math_puzzle", "code_puzzle", "science_sim", "dialogue", "collect"]
 
 class QuestStepBase(BaseModel):
@@ -11,19 +13,30 @@ class QuestStepBase(BaseModel):
     title: str
     description: str
     config: Dict[str, Any]  # Flexible config for each step type
-    hints: List[str] = []
     xp_reward: int = 10
 
+class QuestStepInput(QuestStepBase):
+    """Step as written by admins: config validated against its step_type and stored normalized"""
+    hints: List[str] = []
+
+    @model_validator(mode="after")
+    def normalize_config(self):
+        self.config = normalize_step_config(self.step_type, self.config)
+        return self
+
 class QuestStepCreate(QuestStepBase):
     quest_id: str
+    hints: List[str] = []
 
 class QuestStepInDB(QuestStepBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     quest_id: str
+    hints: List[str] = []
 
 class QuestStep(QuestStepBase):
     id: str
     quest_id: str
+    hint_count: int = 0  # Hints are revealed one at a time via the progress API
 
 class QuestBase(BaseModel):
     title: str
@@ -39,7 +52,7 @@ class QuestBase(BaseModel):
     prerequisites: List[str] = []  # Quest IDs
     
 class QuestCreate(QuestBase):
-    steps: List[QuestStepBase] = []
+    steps: List[QuestStepInput] = []
 
 class QuestInDB(QuestBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -57,4 +70,26 @@ class Quest(QuestBase):
 class QuestWithProgress(Quest):
     progress: Optional[Dict[str, Any]] = None
     is_completed: bool = False
-    is_locked: bool = False
\ No newline at end of file
+    is_locked: bool = False
+
+class QuestRecommendation(BaseModel):
+    quest_id: str
+    title: str
+    description: str
+    world: str
+    subject: str
+    difficulty: str
+    estimated_minutes: int
+    xp_reward: int
+    score: float
+    reasons: List[str] = []
+
+class QuestSearchResult(BaseModel):
+    quest_id: str
+    title: str
+    description: str
+    world: str
+    subject: str
+    difficulty: str
+    score: float
+    matched_step_ids: List[str] = []
@@ -1,14 +1,34 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Literal, List
 from datetime import datetime
 import uuid
 
+class UnlockRule(BaseModel):
+    """Machine-checkable unlock condition; quests_completed counts all quests, or one subject or world"""
+    type: Literal["quests_completed", "level_reached", "badge_owned"]
+    count: int = Field(1, ge=1)  # quests_completed threshold
+    subject: Optional[Literal["math", "coding", "science"]] = None
+    world: Optional[Literal["math_jungle", "code_city", "science_spaceport"]] = None
+    level: Optional[int] = Field(None, ge=2)  # level_reached threshold
+    badge_id: Optional[str] = None  # badge_owned
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.type == "quests_completed" and self.subject and self.world:
+            raise ValueError("quests_completed counts by subject or by world, not both")
+        if self.type == "level_reached" and self.level is None:
+            raise ValueError("level_reached requires level")
+        if self.type == "badge_owned" and not self.badge_id:
+            raise ValueError("badge_owned requires badge_id")
+        return self
+
 class CosmeticBase(BaseModel):
     name: str
     category: Literal["hair_style", "hair_color", "outfit", "accessory", "skin_tone"]
     value: str  # The actual value (e.g., "spiky", "red", "superhero_cape")
     description: str
     unlock_requirement: str  # Description like "Complete 5 Math quests"
+    unlock_rule: Optional[UnlockRule] = None  # Granted automatically once met
     coin_cost: int = 0  # 0 means earned, not bought
     image_url: Optional[str] = None
 
@@ -57,4 +77,16 @@ class RewardCeremony(BaseModel):
     cosmetics: List[Cosmetic] = []
     new_level: Optional[int] = None
     total_xp: int
-    total_coins: int
\ No newline at end of file
+    total_coins: int
+
+class PurchaseRequest(BaseModel):
+    cosmetic_id: str
+
+class CartPurchaseRequest(BaseModel):
+    cosmetic_ids: List[str] = Field(min_length=1)
+
+class PurchaseResult(BaseModel):
+    purchased: List[InventoryItem] = []
+    already_owned: List[str] = []  # Cosmetic IDs refunded because the child owned them
+    coins_spent: int
+    coins_remaining: int
\ No newline at end of file
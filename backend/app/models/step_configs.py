@@ -0,0 +1,187 @@
+"""Typed config schemas per step_type, applied when steps are written.
+
+Admin writes and the seed loader pass every step config through `normalize_step_config`,
+which rejects malformed or inconsistent configs and stores the canonical form: unknown
+keys refused, numbers coerced, unset optional fields dropped. Read paths keep
+`QuestStep.config` as a plain dict and trust what was stored.
+"""
+
+from fractions import Fraction
+from typing import Any, Dict, List, Literal, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator, model_validator
+from typing_extensions import Annotated
+
+from app.utils.model_reads import adapter
+
+# Offered for science questions written before options were listed explicitly
+SCIENCE_OPTIONS = ("rock", "feather", "yes", "no")
+
+CodeBlock = Literal["move_forward", "turn_left", "turn_right"]
+
+
+class StepConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+class DialogueConfig(StepConfig):
+    character: str
+    dialogue: str = Field(min_length=1)
+    choices: List[str] = []
+
+
+class CollectConfig(StepConfig):
+    item: str
+    quantity: int = Field(1, ge=1)
+    message: str
+
+
+class CountingPuzzle(StepConfig):
+    puzzle_type: Literal["counting"]
+    question: str
+    correct_answer: int
+    visual_items: List[str] = []
+    min_value: Optional[int] = None
+    max_value: Optional[int] = None
+    explanation: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_answer(self):
+        if self.min_value is not None and self.max_value is not None and self.min_value > self.max_value:
+            raise ValueError("min_value is greater than max_value")
+        if self.visual_items and len(self.visual_items) != self.correct_answer:
+            raise ValueError("correct_answer does not match the number of visual_items")
+        return self
+
+
+class AdditionPuzzle(StepConfig):
+    puzzle_type: Literal["addition"]
+    question: str
+    operand1: int
+    operand2: int
+    correct_answer: int
+    visual_mode: bool = False
+    explanation: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_answer(self):
+        if self.correct_answer != self.operand1 + self.operand2:
+            raise ValueError("correct_answer is not operand1 + operand2")
+        return self
+
+
+class FractionsPuzzle(StepConfig):
+    puzzle_type: Literal["fractions"]
+    question: str
+    numerator: int = Field(ge=0)
+    denominator: int = Field(gt=0)
+    correct_answer: str
+    visual_type: Optional[str] = None
+    explanation: Optional[str] = None
+
+    @field_validator("correct_answer", mode="before")
+    @classmethod
+    def canonical_fraction(cls, value: Any) -> str:
+        try:
+            fraction = Fraction(str(value).replace(" ", ""))
+        except (ValueError, ZeroDivisionError):
+            raise ValueError("correct_answer must be a fraction such as 1/2")
+        return f"{fraction.numerator}/{fraction.denominator}"
+
+    @model_validator(mode="after")
+    def check_answer(self):
+        if Fraction(self.correct_answer) != Fraction(self.numerator, self.denominator):
+            raise ValueError("correct_answer is not numerator/denominator")
+        return self
+
+
+class GridPosition(StepConfig):
+    x: int = Field(ge=0)
+    y: int = Field(ge=0)
+
+
+class GridSize(StepConfig):
+    width: int = Field(ge=1)
+    height: int = Field(ge=1)
+
+
+class SequencePuzzle(StepConfig):
+    puzzle_type: Literal["sequence"] = "sequence"
+    grid_size: GridSize
+    start_position: GridPosition
+    goal_position: GridPosition
+    obstacles: List[GridPosition] = []
+    available_blocks: List[CodeBlock] = Field(min_length=1)
+    solution: List[CodeBlock] = Field(min_length=1)
+    explanation: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_grid(self):
+        for name, position in (("start_position", self.start_position), ("goal_position", self.goal_position)):
+            if position.x >= self.grid_size.width or position.y >= self.grid_size.height:
+                raise ValueError(f"{name} is outside the grid")
+        if any(position == self.goal_position for position in self.obstacles):
+            raise ValueError("goal_position is blocked by an obstacle")
+        unavailable = set(self.solution) - set(self.available_blocks)
+        if unavailable:
+            raise ValueError(f"solution uses blocks that are not available: {', '.join(sorted(unavailable))}")
+        return self
+
+
+class GravityDropSim(StepConfig):
+    sim_type: Literal["gravity_drop"]
+    question: str
+    objects: List[str] = Field(min_length=1)
+    environment: Literal["earth", "space"]
+    options: List[str] = Field(min_length=2)
+    correct_answer: str
+    explanation: Optional[str] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def default_options(cls, data: Any) -> Any:
+        if isinstance(data, dict) and "options" not in data and "correct_answer" in data:
+            data = {**data, "options": science_options(data.get("question", ""), data["correct_answer"])}
+        return data
+
+    @model_validator(mode="after")
+    def check_answer(self):
+        self.options = [option.strip().lower() for option in self.options]
+        self.correct_answer = self.correct_answer.strip().lower()
+        if self.correct_answer not in self.options:
+            raise ValueError("correct_answer is not one of the options")
+        return self
+
+
+def science_options(question: str, correct_answer: Any) -> List[str]:
+    """Options for a science question that lists none: known answers it mentions, plus the answer"""
+    question = str(question).lower()
+    answer = str(correct_answer).strip().lower()
+    return [option for option in SCIENCE_OPTIONS if option in question or option == answer]
+
+
+MathPuzzleConfig = Annotated[
+    Union[CountingPuzzle, AdditionPuzzle, FractionsPuzzle], Field(discriminator="puzzle_type")
+]
+
+STEP_CONFIG_TYPES: Dict[str, Any] = {
+    "math_puzzle": MathPuzzleConfig,
+    "code_puzzle": SequencePuzzle,
+    "science_sim": GravityDropSim,
+    "dialogue": DialogueConfig,
+    "collect": CollectConfig,
+}
+
+
+def normalize_step_config(step_type: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Validated canonical form of a step config; raises ValueError describing what is wrong"""
+    try:
+        model = adapter(STEP_CONFIG_TYPES[step_type]).validate_python(config)
+    except ValidationError as e:
+        problems = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'config'}: "
+            f"{error['msg'].removeprefix('Value error, ')}"
+            for error in e.errors()
+        )
+        raise ValueError(f"invalid {step_type} config ({problems})") from None
+    return model.model_dump(exclude_none=True)
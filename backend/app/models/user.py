@@ -44,4 +44,5 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     email: Optional[str] = None
     role: Optional[str] = None
-    user_id: Optional[str] = None
\ No newline at end of file
+    user_id: Optional[str] = None
+    child_id: Optional[str] = None  # Set on child-session tokens
\ No newline at end of file
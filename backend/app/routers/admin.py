@@ -1,10 +1,14 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List, Optional
+from typing import List, Optional, Literal
 from pydantic import BaseModel
 from app.models.quest import QuestCreate, Quest, QuestStep, QuestStepCreate
-from app.models.reward import Cosmetic, Badge
+from app.models.reward import Cosmetic, Badge, UnlockRule
 from app.models.user import TokenData
-from app.database import quests_collection, quest_steps_collection, cosmetics_collection
+from app.database import quests_collection, quest_steps_collection, cosmetics_collection, badges_collection
+from app.services.bundles import publish_bundles
+from app.services.catalog import cosmetics_cache, badges_cache, quest_catalog
+from app.services.tasks import task_queue
+from app.services.unlocks import unlock_rules
 from app.utils.auth import get_current_admin
 from datetime import datetime
 import uuid
@@ -17,6 +21,7 @@ class CosmeticCreate(BaseModel):
     value: str
     description: str
     unlock_requirement: str
+    unlock_rule: Optional[UnlockRule] = None
     coin_cost: int = 0
     image_url: Optional[str] = None
 
@@ -24,8 +29,8 @@ class BadgeCreate(BaseModel):
     name: str
     description: str
     icon: str
-    category: str
-    rarity: str = "common"
+    category: Literal["math", "coding", "science", "special"]
+    rarity: Literal["common", "rare", "epic", "legendary"] = "common"
 
 @router.post("/quests", response_model=Quest, status_code=status.HTTP_201_CREATED)
 async def create_quest(quest_data: QuestCreate, current_user: TokenData = Depends(get_current_admin)):
@@ -39,14 +44,16 @@ async def create_quest(quest_data: QuestCreate, current_user: TokenData = Depend
     quests_collection.insert_one(quest_dict)
     
     # Create steps
-    steps = []
-    for step_data in quest_data.steps:
-        step_dict = step_data.model_dump()
-        step_dict["id"] = str(uuid.uuid4())
-        step_dict["quest_id"] = quest_dict["id"]
-        quest_steps_collection.insert_one(step_dict)
-        steps.append(QuestStep(**step_dict))
+    step_dicts = [
+        {**step_data.model_dump(), "id": str(uuid.uuid4()), "quest_id": quest_dict["id"]}
+        for step_data in quest_data.steps
+    ]
+    if step_dicts:
+        quest_steps_collection.insert_many(step_dicts)
+    steps = [QuestStep(**step_dict, hint_count=len(step_dict["hints"])) for step_dict in step_dicts]
     
+    quest_catalog.invalidate()
+    task_queue.enqueue(publish_bundles)
     quest_dict["steps"] = steps
     return Quest(**quest_dict)
 
@@ -67,14 +74,16 @@ async def update_quest(quest_id: str, quest_data: QuestCreate, current_user: Tok
     quest_steps_collection.delete_many({"quest_id": quest_id})
     
     # Create new steps
-    steps = []
-    for step_data in quest_data.steps:
-        step_dict = step_data.model_dump()
-        step_dict["id"] = str(uuid.uuid4())
-        step_dict["quest_id"] = quest_id
-        quest_steps_collection.insert_one(step_dict)
-        steps.append(QuestStep(**step_dict))
+    step_dicts = [
+        {**step_data.model_dump(), "id": str(uuid.uuid4()), "quest_id": quest_id}
+        for step_data in quest_data.steps
+    ]
+    if step_dicts:
+        quest_steps_collection.insert_many(step_dicts)
+    steps = [QuestStep(**step_dict, hint_count=len(step_dict["hints"])) for step_dict in step_dicts]
     
+    quest_catalog.invalidate()
+    task_queue.enqueue(publish_bundles)
     updated_quest = quests_collection.find_one({"id": quest_id})
     updated_quest["steps"] = steps
     return Quest(**updated_quest)
@@ -89,6 +98,8 @@ async def delete_quest(quest_id: str, current_user: TokenData = Depends(get_curr
         )
     
     quests_collection.update_one({"id": quest_id}, {"$set": {"is_active": False}})
+    quest_catalog.invalidate()
+    task_queue.enqueue(publish_bundles)
     return None
 
 @router.post("/cosmetics", response_model=Cosmetic, status_code=status.HTTP_201_CREATED)
@@ -98,9 +109,50 @@ async def create_cosmetic(cosmetic_data: CosmeticCreate, current_user: TokenData
     cosmetic_dict["created_at"] = datetime.utcnow()
     
     cosmetics_collection.insert_one(cosmetic_dict)
+    cosmetics_cache.invalidate()
+    unlock_rules.invalidate()
     return Cosmetic(**cosmetic_dict)
 
 @router.get("/cosmetics", response_model=List[Cosmetic])
 async def get_cosmetics(current_user: TokenData = Depends(get_current_admin)):
     cosmetics = list(cosmetics_collection.find())
-    return [Cosmetic(**c) for c in cosmetics]
\ No newline at end of file
+    return [Cosmetic(**c) for c in cosmetics]
+
+@router.post("/badges", response_model=Badge, status_code=status.HTTP_201_CREATED)
+async def create_badge(badge_data: BadgeCreate, current_user: TokenData = Depends(get_current_admin)):
+    badge_dict = badge_data.model_dump()
+    badge_dict["id"] = str(uuid.uuid4())
+    badge_dict["created_at"] = datetime.utcnow()
+    
+    badges_collection.insert_one(badge_dict)
+    badges_cache.invalidate()
+    return Badge(**badge_dict)
+
+@router.get("/badges", response_model=List[Badge])
+async def get_badges(current_user: TokenData = Depends(get_current_admin)):
+    badges = list(badges_collection.find())
+    return [Badge(**b) for b in badges]
+
+@router.put("/badges/{badge_id}", response_model=Badge)
+async def update_badge(badge_id: str, badge_data: BadgeCreate, current_user: TokenData = Depends(get_current_admin)):
+    result = badges_collection.update_one({"id": badge_id}, {"$set": badge_data.model_dump()})
+    if result.matched_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Badge not found"
+        )
+    
+    badges_cache.invalidate()
+    return Badge(**badges_collection.find_one({"id": badge_id}))
+
+@router.delete("/badges/{badge_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_badge(badge_id: str, current_user: TokenData = Depends(get_current_admin)):
+    result = badges_collection.delete_one({"id": badge_id})
+    if result.deleted_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Badge not found"
+        )
+    
+    badges_cache.invalidate()
+    return None
\ No newline at end of file
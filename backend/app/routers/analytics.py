@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from typing import List, Optional
+from app.models.analytics import QuestAnalytics, QuestAnalyticsDetail, Granularity
+from app.models.user import TokenData
+from app.services import rollups
+from app.utils.auth import get_current_admin
+from datetime import datetime, timedelta
+
+router = APIRouter(prefix="/api/admin/analytics", tags=["admin"])
+
+DEFAULT_WINDOW_DAYS = 30
+
+def window_start(since: Optional[datetime]) -> datetime:
+    return since or datetime.utcnow() - timedelta(days=DEFAULT_WINDOW_DAYS)
+
+@router.get("/quests", response_model=List[QuestAnalytics])
+async def get_quest_analytics(
+    granularity: Granularity = "day",
+    since: Optional[datetime] = None,
+    current_user: TokenData = Depends(get_current_admin)
+):
+    # Reads only the precomputed rollups, never the progress collection
+    return rollups.quest_summaries(granularity, window_start(since))
+
+@router.get("/quests/{quest_id}", response_model=QuestAnalyticsDetail)
+async def get_quest_analytics_detail(
+    quest_id: str,
+    granularity: Granularity = "hour",
+    since: Optional[datetime] = None,
+    current_user: TokenData = Depends(get_current_admin)
+):
+    return rollups.quest_detail(quest_id, granularity, window_start(since))
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from app.models.user import UserCreate, UserLogin, User, Token, UserInDB
 from app.models.child import ChildSession
-from app.database import users_collection, children_collection
+from app.database import LIVE_CHILD, users_collection, children_collection
 from app.utils.auth import get_password_hash, verify_password, create_access_token, get_current_user
 from app.models.user import TokenData
 from datetime import datetime, timedelta
@@ -70,7 +70,7 @@ async def login(credentials: UserLogin):
 @router.post("/child-session/{child_id}", response_model=ChildSession)
 async def create_child_session(child_id: str, current_user: TokenData = Depends(get_current_user)):
     # Verify child belongs to parent
-    child = children_collection.find_one({"id": child_id})
+    child = children_collection.find_one({"id": child_id, **LIVE_CHILD})
     if not child:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,8 +1,14 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Literal
 from app.models.child import ChildProfileCreate, ChildProfile, AvatarCustomization
-from app.database import children_collection, progress_collection, inventory_collection
-from app.utils.auth import get_current_parent
+from app.models.reward import InventoryItem
+from app.database import LIVE_CHILD, children_collection, inventory_collection
+from app.services.catalog import hydrate_inventory
+from app.services.deletion import schedule_child_deletion, deletion_worker
+from app.services.export import ndjson_stream, zip_stream
+from app.utils.auth import get_current_parent, get_child_access
+from app.utils.model_reads import load_many, model_response
 from app.models.user import TokenData
 from datetime import datetime
 import uuid
@@ -41,12 +47,12 @@ async def create_child_profile(child_data: ChildProfileCreate, current_user: Tok
 
 @router.get("", response_model=List[ChildProfile])
 async def get_children(current_user: TokenData = Depends(get_current_parent)):
-    children = list(children_collection.find({"parent_id": current_user.user_id}))
-    return [ChildProfile(**child) for child in children]
+    children = list(children_collection.find({"parent_id": current_user.user_id, **LIVE_CHILD}))
+    return model_response(List[ChildProfile], load_many(ChildProfile, children))
 
 @router.get("/{child_id}", response_model=ChildProfile)
 async def get_child(child_id: str, current_user: TokenData = Depends(get_current_parent)):
-    child = children_collection.find_one({"id": child_id, "parent_id": current_user.user_id})
+    child = children_collection.find_one({"id": child_id, "parent_id": current_user.user_id, **LIVE_CHILD})
     if not child:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,9 +60,47 @@ async def get_child(child_id: str, current_user: TokenData = Depends(get_current
         )
     return ChildProfile(**child)
 
+@router.get("/{child_id}/inventory", response_model=List[InventoryItem])
+async def get_inventory(
+    child_id: str,
+    item_type: Optional[Literal["cosmetic", "badge"]] = None,
+    current_user: TokenData = Depends(get_child_access)
+):
+    query = {"child_id": child_id}
+    if item_type:
+        query["item_type"] = item_type
+    items = list(inventory_collection.find(query).sort("earned_at", 1))
+    hydrate_inventory(items)
+    
+    return model_response(List[InventoryItem], load_many(InventoryItem, items))
+
+@router.get("/{child_id}/export")
+async def export_child_data(
+    child_id: str,
+    format: Literal["ndjson", "zip"] = "ndjson",
+    current_user: TokenData = Depends(get_current_parent)
+):
+    child = children_collection.find_one({"id": child_id, "parent_id": current_user.user_id, **LIVE_CHILD})
+    if not child:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found"
+        )
+    
+    if format == "zip":
+        stream, media_type = zip_stream(child), "application/zip"
+    else:
+        stream, media_type = ndjson_stream(child), "application/x-ndjson"
+    filename = f"kidquest-{child['username']}-export.{format}"
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.patch("/{child_id}/avatar", response_model=ChildProfile)
 async def update_avatar(child_id: str, avatar: AvatarCustomization, current_user: TokenData = Depends(get_current_parent)):
-    child = children_collection.find_one({"id": child_id, "parent_id": current_user.user_id})
+    child = children_collection.find_one({"id": child_id, "parent_id": current_user.user_id, **LIVE_CHILD})
     if not child:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -73,7 +117,7 @@ async def update_avatar(child_id: str, avatar: AvatarCustomization, current_user
 
 @router.patch("/{child_id}/hint-buddy", response_model=ChildProfile)
 async def toggle_hint_buddy(child_id: str, enabled: bool, current_user: TokenData = Depends(get_current_parent)):
-    child = children_collection.find_one({"id": child_id, "parent_id": current_user.user_id})
+    child = children_collection.find_one({"id": child_id, "parent_id": current_user.user_id, **LIVE_CHILD})
     if not child:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,16 +134,15 @@ async def toggle_hint_buddy(child_id: str, enabled: bool, current_user: TokenDat
 
 @router.delete("/{child_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_child_profile(child_id: str, current_user: TokenData = Depends(get_current_parent)):
-    child = children_collection.find_one({"id": child_id, "parent_id": current_user.user_id})
+    child = children_collection.find_one({"id": child_id, "parent_id": current_user.user_id, **LIVE_CHILD})
     if not child:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Child profile not found"
         )
     
-    # Delete child data
-    children_collection.delete_one({"id": child_id})
-    progress_collection.delete_many({"child_id": child_id})
-    inventory_collection.delete_many({"child_id": child_id})
+    # Tombstone the profile now; dependent data and then the profile are purged in the background
+    schedule_child_deletion(child)
+    deletion_worker.wake()
     
     return None
\ No newline at end of file
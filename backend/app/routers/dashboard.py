@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Any
+from app.models.dashboard import ParentDashboard, ChildDashboard
+from app.models.child import ChildProfile
+from app.models.progress import SkillMastery
+from app.models.user import TokenData
+from app.database import LIVE_CHILD, children_collection, progress_collection, quests_collection, skill_mastery_collection
+from app.services import progress_store, stats
+from app.services.live import event_stream
+from app.utils.auth import get_current_parent
+import asyncio
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+RECENT_ACTIVITY_LIMIT = 5
+
+def group_by_child(docs: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for doc in docs:
+        grouped.setdefault(doc["child_id"], []).append(doc)
+    return grouped
+
+@router.get("", response_model=ParentDashboard)
+async def get_dashboard(current_user: TokenData = Depends(get_current_parent)):
+    children = await run_in_threadpool(
+        lambda: list(children_collection.find({"parent_id": current_user.user_id, **LIVE_CHILD}))
+    )
+    if not children:
+        return ParentDashboard()
+    child_ids = [child["id"] for child in children]
+    
+    # One batched query per collection, fetched concurrently
+    progress_docs, mastery_docs = await asyncio.gather(
+        run_in_threadpool(lambda: list(progress_collection.find(
+            {"child_id": {"$in": child_ids}}, progress_store.WITHOUT_STEPS
+        ))),
+        run_in_threadpool(lambda: list(skill_mastery_collection.find(
+            {"child_id": {"$in": child_ids}}
+        ).sort("skill_name", 1))),
+    )
+    quest_ids = list({p["quest_id"] for p in progress_docs})
+    quests_by_id = {
+        q["id"]: q for q in await run_in_threadpool(lambda: list(quests_collection.find(
+            {"id": {"$in": quest_ids}}, {"id": 1, "title": 1, "subject": 1}
+        )))
+    }
+    
+    progress_by_child = group_by_child(progress_docs)
+    mastery_by_child = group_by_child(mastery_docs)
+    
+    return ParentDashboard(children=[
+        ChildDashboard(
+            child=ChildProfile(**child),
+            stats=stats.child_stats(child, progress_by_child.get(child["id"], []), quests_by_id),
+            recent_activity=stats.recent_activity(
+                progress_by_child.get(child["id"], []), quests_by_id, RECENT_ACTIVITY_LIMIT
+            ),
+            mastery=[SkillMastery(**m) for m in mastery_by_child.get(child["id"], [])],
+        )
+        for child in children
+    ])
+
+@router.get("/live")
+async def live_progress(current_user: TokenData = Depends(get_current_parent)):
+    """Server-sent events with progress deltas for all of the parent's children"""
+    children = await run_in_threadpool(
+        lambda: list(children_collection.find({"parent_id": current_user.user_id, **LIVE_CHILD}, {"id": 1}))
+    )
+    return StreamingResponse(
+        event_stream(child["id"] for child in children),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,13 +1,24 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List, Dict, Any
-from app.models.progress import QuestProgress, QuestProgressCreate, QuestProgressUpdate, StepProgress, SkillMastery
+from typing import List, Dict, Any, Optional, Tuple
+from app.models.progress import (
+    QuestProgress, QuestProgressCreate, QuestProgressUpdate, StepProgress, SkillMastery,
+    AnswerSubmission, AnswerResult, HintResult
+)
 from app.models.reward import RewardCeremony, Badge, Cosmetic
 from app.models.user import TokenData
 from app.database import (
-    progress_collection, children_collection, quests_collection, 
-    quest_steps_collection, inventory_collection, cosmetics_collection
+    LIVE_CHILD, progress_collection, children_collection, quests_collection, 
+    quest_steps_collection, cosmetics_collection
 )
-from app.utils.auth import get_current_user
+from app.services import events, mastery, progress_store, rewards, stats, unlocks
+from app.services.catalog import badges_cache, cosmetics_cache, quest_catalog
+from app.services.live import live_hub
+from app.services.recommendations import child_activity_cache
+from app.services.tasks import task_queue
+from app.services.validators import ANSWERLESS_STEP_TYPES, CompiledValidator, compile_step
+from app.utils.auth import get_current_user, get_child_access, authorize_child_access
+from app.utils.model_reads import load_many, model_response
+from pymongo import ReturnDocument
 from datetime import datetime
 import uuid
 import math
@@ -18,24 +29,138 @@ def calculate_level(xp: int) -> int:
     """Calculate level from XP (100 XP per level)"""
     return max(1, math.floor(xp / 100) + 1)
 
+def step_activity(old: Dict[str, Any], new: Dict[str, Any], steps: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], bool]]:
+    """(step, newly_completed) pairs for every step whose server-kept result changed between two progress states"""
+    old_steps = {sp["step_id"]: sp for sp in old.get("steps_progress", [])}
+    new_steps = {sp["step_id"]: sp for sp in new.get("steps_progress", [])}
+    
+    activity = []
+    for step in steps:
+        before = old_steps.get(step["id"], {})
+        after = new_steps.get(step["id"], {})
+        if after.get("completed", False) and not before.get("completed", False):
+            activity.append((step, True))
+        elif after.get("attempts", 0) > before.get("attempts", 0):
+            activity.append((step, False))
+    return activity
+
+def activity_events(progress: Dict[str, Any], activity: List[Tuple[Dict[str, Any], bool]]) -> List[Dict[str, Any]]:
+    """Outbox events describing a progress update"""
+    # hint_used events are recorded by reveal_hint, which owns the hint counters
+    return [
+        events.make_event(
+            "step_completed" if completed else "step_attempted", progress, step["id"],
+            step_order=step["step_order"]
+        )
+        for step, completed in activity
+    ]
+
+def quest_steps(quest_id: str) -> List[Dict[str, Any]]:
+    """A quest's ordered steps; progress outlives deactivation, so inactive quests are read from the database"""
+    quest = quest_catalog.snapshot().quests.get(quest_id)
+    if quest:
+        return quest["steps"]
+    return list(quest_steps_collection.find({"quest_id": quest_id}, {"_id": 0}).sort("step_order", 1))
+
+def find_step(quest_id: str, step_id: str) -> Optional[Tuple[Dict[str, Any], Optional[CompiledValidator], List[str]]]:
+    """(step, validator, hints) from the catalog snapshot, or compiled on demand for an inactive quest"""
+    catalog = quest_catalog.snapshot()
+    quest = catalog.quests.get(quest_id)
+    if quest:
+        step = next((step for step in quest["steps"] if step["id"] == step_id), None)
+        return (step, catalog.validators.get(step_id), catalog.hints.get(step_id, [])) if step else None
+    step = quest_steps_collection.find_one({"id": step_id, "quest_id": quest_id}, {"_id": 0})
+    return (step, compile_step(step), step.get("hints") or []) if step else None
+
+def first_unanswered_step(progress: Dict[str, Any], steps: List[Dict[str, Any]]) -> Optional[int]:
+    """Index of the first answer step that submit_answer has not marked complete"""
+    completed = {sp["step_id"] for sp in progress.get("steps_progress", []) if sp.get("completed")}
+    return next((
+        index for index, step in enumerate(steps)
+        if step["step_type"] not in ANSWERLESS_STEP_TYPES and step["id"] not in completed
+    ), None)
+
+def keep_checked_results(progress: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Client-reported update with the stored results, counters and position kept for answer steps"""
+    steps = quest_steps(progress["quest_id"])
+    answerless = {step["id"] for step in steps if step["step_type"] in ANSWERLESS_STEP_TYPES}
+    stored = {sp["step_id"]: sp for sp in progress.get("steps_progress", [])}
+    
+    # Attempts are counted by submit_answer as answers are checked
+    update = {k: v for k, v in update.items() if k != "total_attempts"}
+    if "steps_progress" in update:
+        result = []
+        for sp in update["steps_progress"]:
+            # Unknown steps are treated as answer steps, so nothing is completed without a check
+            if sp["step_id"] not in answerless:
+                before = stored.get(sp["step_id"], {})
+                sp = {
+                    **sp,
+                    "completed": before.get("completed", False),
+                    "completed_at": before.get("completed_at"),
+                    "attempts": before.get("attempts", 0),
+                    "score": before.get("score"),
+                }
+            result.append(sp)
+        update["steps_progress"] = result
+    if "current_step_index" in update:
+        # Clients cannot move past an answer step that has not been answered correctly
+        blocking = first_unanswered_step(progress, steps)
+        limit = len(steps) if blocking is None else blocking
+        update["current_step_index"] = min(update["current_step_index"], limit)
+    return update
+
+def apply_progress_update(progress: Dict[str, Any], update_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Write a progress update with its outbox events and mastery side effects; returns the new state"""
+    progress_id = progress["id"]
+    
+    # Work out what changed before writing, so the events commit with the update
+    quest = quests_collection.find_one({"id": progress["quest_id"]})
+    steps = list(quest_steps_collection.find({"quest_id": progress["quest_id"]}).sort("step_order", 1))
+    new_state = {**progress, **update_dict}
+    activity = step_activity(progress, new_state, steps)
+    outbox = activity_events(progress, activity)
+    
+    update = events.outbox_push(outbox) if outbox else {}
+    if "steps_progress" in update_dict:
+        steps_update = progress_store.steps_update(progress["quest_id"], update_dict.pop("steps_progress"))
+        update["$unset"] = steps_update["$unset"]
+        update_dict.update(steps_update["$set"])
+    if update_dict:
+        update["$set"] = update_dict
+    if update:
+        progress_collection.update_one({"id": progress_id}, update)
+        task_queue.enqueue(events.flush_outbox, progress_id=progress_id, events=outbox)
+        live_hub.publish(outbox)
+    updated_progress = progress_store.expand(progress_collection.find_one({"id": progress_id}))
+    
+    # Keep skill mastery current as steps are attempted and completed
+    if quest and activity:
+        task_queue.enqueue(
+            mastery.record_step_activity, child_id=progress["child_id"], quest=quest, activity=activity
+        )
+    return updated_progress
+
 @router.post("/start-quest", response_model=QuestProgress, status_code=status.HTTP_201_CREATED)
 async def start_quest(data: QuestProgressCreate, current_user: TokenData = Depends(get_current_user)):
     # Verify child access
-    child = children_collection.find_one({"id": data.child_id})
-    if not child or (child["parent_id"] != current_user.user_id and current_user.role != "admin"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
-        )
+    authorize_child_access(current_user, data.child_id)
     
     # Check if already started
     existing = progress_collection.find_one({"child_id": data.child_id, "quest_id": data.quest_id})
     if existing:
-        return QuestProgress(**existing)
+        return QuestProgress(**progress_store.expand(existing))
+    
+    # Child sessions skip the ownership lookup, so a deleted profile is caught here
+    if not children_collection.find_one({"id": data.child_id, **LIVE_CHILD}, {"_id": 1}):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found"
+        )
     
     # Get quest steps to initialize progress
-    steps = list(quest_steps_collection.find({"quest_id": data.quest_id}).sort("step_order", 1))
-    steps_progress = [StepProgress(step_id=step["id"]) for step in steps]
+    step_ids = progress_store.step_ids(data.quest_id)
+    steps_progress = [StepProgress(step_id=step_id) for step_id in step_ids]
     
     progress_dict = {
         "id": str(uuid.uuid4()),
@@ -47,8 +172,12 @@ async def start_quest(data: QuestProgressCreate, current_user: TokenData = Depen
         "total_attempts": 0,
         "hints_used": 0
     }
+    progress_dict["outbox"] = [events.make_event("quest_started", progress_dict)]
     
-    progress_collection.insert_one(progress_dict)
+    progress_collection.insert_one(progress_store.storage_form(progress_dict, step_ids))
+    child_activity_cache.record_start(data.child_id, data.quest_id)
+    task_queue.enqueue(events.flush_outbox, progress_id=progress_dict["id"], events=progress_dict["outbox"])
+    live_hub.publish(progress_dict["outbox"])
     return QuestProgress(**progress_dict)
 
 @router.patch("/{progress_id}", response_model=QuestProgress)
@@ -57,7 +186,7 @@ async def update_quest_progress(
     update_data: QuestProgressUpdate,
     current_user: TokenData = Depends(get_current_user)
 ):
-    progress = progress_collection.find_one({"id": progress_id})
+    progress = progress_store.expand(progress_collection.find_one({"id": progress_id}))
     if not progress:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -65,21 +194,115 @@ async def update_quest_progress(
         )
     
     # Verify access
-    child = children_collection.find_one({"id": progress["child_id"]})
-    if not child or (child["parent_id"] != current_user.user_id and current_user.role != "admin"):
+    authorize_child_access(current_user, progress["child_id"])
+    
+    # Completion of answer-checked steps is only recorded by submit_answer
+    update_dict = keep_checked_results(progress, update_data.model_dump(exclude_none=True))
+    
+    return QuestProgress(**apply_progress_update(progress, update_dict))
+
+@router.post("/{progress_id}/steps/{step_id}/answer", response_model=AnswerResult)
+async def submit_answer(
+    progress_id: str,
+    step_id: str,
+    submission: AnswerSubmission,
+    current_user: TokenData = Depends(get_current_user)
+):
+    progress = progress_store.expand(progress_collection.find_one({"id": progress_id}))
+    if not progress:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Progress not found"
         )
     
-    update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
-    if update_data.steps_progress:
-        update_dict["steps_progress"] = [sp.model_dump() for sp in update_data.steps_progress]
+    # Verify access
+    authorize_child_access(current_user, progress["child_id"])
+    
+    found = find_step(progress["quest_id"], step_id)
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Step not found"
+        )
+    step, validator, _ = found
+    if validator is None and step["step_type"] not in ANSWERLESS_STEP_TYPES:
+        # Fail closed: an answer step whose config could not be compiled accepts nothing
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="This step's answer cannot be checked"
+        )
+    correct = validator is None or validator.check(submission.answer)
     
-    progress_collection.update_one({"id": progress_id}, {"$set": update_dict})
-    updated_progress = progress_collection.find_one({"id": progress_id})
+    steps_progress = [dict(sp) for sp in progress.get("steps_progress", [])]
+    entry = next((sp for sp in steps_progress if sp["step_id"] == step_id), None)
+    if entry is None:
+        entry = StepProgress(step_id=step_id).model_dump()
+        steps_progress.append(entry)
+    entry["attempts"] += 1
+    if correct and not entry["completed"]:
+        entry["completed"] = True
+        entry["completed_at"] = datetime.utcnow()
     
-    return QuestProgress(**updated_progress)
+    updated_progress = apply_progress_update(progress, {
+        "steps_progress": steps_progress,
+        "total_attempts": progress.get("total_attempts", 0) + 1,
+    })
+    return AnswerResult(
+        correct=correct,
+        explanation=validator.explanation if correct and validator else None,
+        attempts=entry["attempts"],
+        progress=QuestProgress(**updated_progress)
+    )
+
+@router.post("/{progress_id}/steps/{step_id}/hint", response_model=HintResult)
+async def reveal_hint(progress_id: str, step_id: str, current_user: TokenData = Depends(get_current_user)):
+    progress = progress_collection.find_one({"id": progress_id}, {"_id": 0, "child_id": 1, "quest_id": 1})
+    if not progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Progress not found"
+        )
+    
+    # Verify access
+    authorize_child_access(current_user, progress["child_id"])
+    
+    found = find_step(progress["quest_id"], step_id)
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Step not found"
+        )
+    step, _, hints = found
+    if not hints:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="This step has no hints"
+        )
+    
+    # Claim the next hint and count it in one update; the filter stops at the last hint
+    revealed_field = f"hints_revealed.{step_id}"
+    hint_event = events.make_event("hint_used", progress, step_id, step_order=step["step_order"], count=1)
+    updated = progress_collection.find_one_and_update(
+        {"id": progress_id, "$or": [{revealed_field: {"$exists": False}}, {revealed_field: {"$lt": len(hints)}}]},
+        {"$inc": {"hints_used": 1, revealed_field: 1}, **events.outbox_push([hint_event])},
+        projection={"_id": 0, "hints_used": 1, "hints_revealed": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="No hints left for this step"
+        )
+    task_queue.enqueue(events.flush_outbox, progress_id=progress_id, events=[hint_event])
+    live_hub.publish([hint_event])
+    
+    number = updated["hints_revealed"][step_id]
+    return HintResult(
+        hint=hints[number - 1],
+        hint_number=number,
+        hints_remaining=len(hints) - number,
+        hints_used=updated["hints_used"]
+    )
 
 @router.post("/complete-quest/{progress_id}", response_model=RewardCeremony)
 async def complete_quest(progress_id: str, current_user: TokenData = Depends(get_current_user)):
@@ -91,12 +314,7 @@ async def complete_quest(progress_id: str, current_user: TokenData = Depends(get
         )
     
     # Verify access
-    child = children_collection.find_one({"id": progress["child_id"]})
-    if not child or (child["parent_id"] != current_user.user_id and current_user.role != "admin"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
-        )
+    authorize_child_access(current_user, progress["child_id"])
     
     # Get quest details
     quest = quests_collection.find_one({"id": progress["quest_id"]})
@@ -106,103 +324,110 @@ async def complete_quest(progress_id: str, current_user: TokenData = Depends(get
             detail="Quest not found"
         )
     
-    # Mark quest as completed
-    progress_collection.update_one(
-        {"id": progress_id},
-        {"$set": {"completed_at": datetime.utcnow()}}
+    # Rewards are only paid once every answer step has passed its check
+    steps = list(quest_steps_collection.find({"quest_id": quest["id"]}, {"_id": 0, "id": 1, "step_type": 1}))
+    if first_unanswered_step(progress_store.expand(progress), steps) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Answer every step before completing the quest"
+        )
+    
+    # Mark quest as completed (only once, so rewards cannot be claimed twice)
+    completed_event = events.make_event(
+        "quest_completed", progress,
+        attempts=progress.get("total_attempts", 0), hints=progress.get("hints_used", 0)
+    )
+    result = progress_collection.update_one(
+        {"id": progress_id, "completed_at": None},
+        {"$set": {"completed_at": datetime.utcnow()}, **events.outbox_push([completed_event])}
     )
+    if result.modified_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Quest already completed"
+        )
+    task_queue.enqueue(events.flush_outbox, progress_id=progress_id, events=[completed_event])
+    live_hub.publish([completed_event])
     
-    # Award XP and coins
-    old_xp = child["total_xp"]
-    old_level = child["level"]
-    new_xp = old_xp + quest["xp_reward"]
-    new_level = calculate_level(new_xp)
-    new_coins = child["coins"] + quest["coin_reward"]
-    
-    children_collection.update_one(
-        {"id": child["id"]},
-        {"$set": {
-            "total_xp": new_xp,
-            "level": new_level,
-            "coins": new_coins
-        }}
+    # Award XP and coins atomically; the returned totals drive the ceremony
+    # The same update moves the child's unlock counters
+    child = children_collection.find_one_and_update(
+        {"id": progress["child_id"], **LIVE_CHILD},
+        {"$inc": {
+            "total_xp": quest["xp_reward"], "coins": quest["coin_reward"], **unlocks.counter_increments(quest)
+        }},
+        projection={"_id": 0, "id": 1, "total_xp": 1, "coins": 1, unlocks.COUNTERS_FIELD: 1},
+        return_document=ReturnDocument.AFTER
     )
+    if not child:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found"
+        )
+    new_xp = child["total_xp"]
+    new_coins = child["coins"]
+    old_level = calculate_level(new_xp - quest["xp_reward"])
+    new_level = calculate_level(new_xp)
+    child_activity_cache.record_completion(child["id"], quest["id"], quest["subject"], new_level)
+    
+    # Everything below the XP/coin grant is deferred; the ceremony returns right away
+    if new_level > old_level:
+        task_queue.enqueue(rewards.sync_level, child_id=child["id"], level=new_level)
     
-    # Award badge if applicable
     badges = []
     if quest.get("badge_id"):
-        # Add badge to inventory
-        inventory_item = {
-            "id": str(uuid.uuid4()),
-            "child_id": child["id"],
-            "item_type": "badge",
-            "item_id": quest["badge_id"],
-            "earned_at": datetime.utcnow(),
-            "is_equipped": False
-        }
-        inventory_collection.insert_one(inventory_item)
+        task_queue.enqueue(rewards.grant_badge, child_id=child["id"], badge_id=quest["badge_id"])
         
-        # Mock badge data (will be replaced with actual badge system)
-        badges.append(Badge(
-            id=quest["badge_id"],
-            name=f"{quest['title']} Master",
-            description=f"Completed {quest['title']}",
-            icon="🏆",
-            category=quest["subject"],
-            rarity="common",
-            created_at=datetime.utcnow()
-        ))
+        # Resolved from the in-memory badge catalog, no database round trip
+        badge = badges_cache.get(quest["badge_id"])
+        if badge:
+            badges.append(Badge(**badge))
+    
+    # Only rules this completion can trigger are checked; granted now so the ceremony can show them
+    unlocked = unlocks.unlock_rules.index().on_quest_completed(
+        child[unlocks.COUNTERS_FIELD], quest, old_level, new_level
+    )
+    granted = cosmetics_cache.get_many(unlocks.grant_cosmetics(child["id"], unlocked))
+    cosmetics = [Cosmetic(**cosmetic) for cosmetic in granted.values()]
+    
+    # Update skill mastery for every skill the quest practiced
+    task_queue.enqueue(mastery.record_quest_completion, child_id=child["id"], quest=quest)
     
     return RewardCeremony(
         quest_title=quest["title"],
         xp_earned=quest["xp_reward"],
         coins_earned=quest["coin_reward"],
         badges=badges,
-        cosmetics=[],
+        cosmetics=cosmetics,
         new_level=new_level if new_level > old_level else None,
         total_xp=new_xp,
         total_coins=new_coins
     )
 
 @router.get("/child/{child_id}", response_model=List[QuestProgress])
-async def get_child_progress(child_id: str, current_user: TokenData = Depends(get_current_user)):
-    # Verify access
-    child = children_collection.find_one({"id": child_id})
-    if not child or (child["parent_id"] != current_user.user_id and current_user.role != "admin"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
-        )
-    
+async def get_child_progress(child_id: str, current_user: TokenData = Depends(get_child_access)):
     progress_list = list(progress_collection.find({"child_id": child_id}))
-    return [QuestProgress(**p) for p in progress_list]
+    return model_response(
+        List[QuestProgress], load_many(QuestProgress, [progress_store.expand(p) for p in progress_list])
+    )
 
 @router.get("/child/{child_id}/stats")
-async def get_child_stats(child_id: str, current_user: TokenData = Depends(get_current_user)):
-    # Verify access
-    child = children_collection.find_one({"id": child_id})
-    if not child or (child["parent_id"] != current_user.user_id and current_user.role != "admin"):
+async def get_child_stats(child_id: str, current_user: TokenData = Depends(get_child_access)):
+    child = children_collection.find_one({"id": child_id, **LIVE_CHILD})
+    if not child:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found"
         )
     
-    progress_list = list(progress_collection.find({"child_id": child_id}))
-    completed_quests = [p for p in progress_list if p.get("completed_at")]
-    
-    # Calculate stats by subject
-    stats_by_subject = {"math": 0, "coding": 0, "science": 0}
-    for progress in completed_quests:
-        quest = quests_collection.find_one({"id": progress["quest_id"]})
-        if quest and quest["subject"] in stats_by_subject:
-            stats_by_subject[quest["subject"]] += 1
-    
-    return {
-        "child_id": child_id,
-        "total_xp": child["total_xp"],
-        "level": child["level"],
-        "coins": child["coins"],
-        "quests_completed": len(completed_quests),
-        "quests_in_progress": len(progress_list) - len(completed_quests),
-        "stats_by_subject": stats_by_subject
-    }
\ No newline at end of file
+    progress_list = list(progress_collection.find({"child_id": child_id}, progress_store.WITHOUT_STEPS))
+    quest_ids = list({p["quest_id"] for p in progress_list if p.get("completed_at")})
+    quests_by_id = {
+        q["id"]: q for q in quests_collection.find({"id": {"$in": quest_ids}}, {"id": 1, "subject": 1})
+    }
+    
+    return stats.child_stats(child, progress_list, quests_by_id)
+
+@router.get("/child/{child_id}/mastery", response_model=List[SkillMastery])
+async def get_child_mastery(child_id: str, current_user: TokenData = Depends(get_child_access)):
+    return [SkillMastery(**m) for m in mastery.get_mastery_grid(child_id)]
\ No newline at end of file
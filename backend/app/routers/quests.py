@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import List, Optional
-from app.models.quest import Quest, QuestWithProgress, QuestStep
+from app.models.quest import Quest, QuestWithProgress, QuestStep, QuestRecommendation, QuestSearchResult
 from app.models.user import TokenData
-from app.database import quests_collection, quest_steps_collection, progress_collection, children_collection
-from app.utils.auth import get_current_user
+from app.database import quests_collection, quest_steps_collection, progress_collection
+from app.services import progress_store
+from app.services.catalog import quest_catalog
+from app.services.recommendations import child_activity_cache, rank_quests
+from app.services.search import search_quests
+from app.services.validators import public_step
+from app.utils.auth import get_current_user, get_child_access
+from app.utils.model_reads import load, load_many, model_response
 
 router = APIRouter(prefix="/api/quests", tags=["quests"])
 
@@ -14,64 +20,58 @@ async def get_quests(
     difficulty: Optional[str] = None,
     current_user: TokenData = Depends(get_current_user)
 ):
-    query = {"is_active": True}
-    if world:
-        query["world"] = world
-    if subject:
-        query["subject"] = subject
-    if difficulty:
-        query["difficulty"] = difficulty
+    # Active quests with their steps come from the in-process catalog, not one query per quest
+    filters = {"world": world, "subject": subject, "difficulty": difficulty}
+    quests = [
+        quest for quest in quest_catalog.snapshot().quests.values()
+        if all(value is None or quest.get(field) == value for field, value in filters.items())
+    ]
     
-    quests = list(quests_collection.find(query))
-    
-    # Populate steps for each quest
-    result = []
-    for quest in quests:
-        steps = list(quest_steps_collection.find({"quest_id": quest["id"]}).sort("step_order", 1))
-        quest["steps"] = [QuestStep(**step) for step in steps]
-        result.append(Quest(**quest))
-    
-    return result
+    return model_response(List[Quest], load_many(Quest, quests))
+
+@router.get("/search", response_model=List[QuestSearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    current_user: TokenData = Depends(get_current_user)
+):
+    return [
+        QuestSearchResult(
+            quest_id=r["quest"]["id"],
+            title=r["quest"]["title"],
+            description=r["quest"]["description"],
+            world=r["quest"]["world"],
+            subject=r["quest"]["subject"],
+            difficulty=r["quest"]["difficulty"],
+            score=round(r["score"], 4),
+            matched_step_ids=r["matched_step_ids"]
+        )
+        for r in search_quests(q, limit)
+    ]
 
 @router.get("/child/{child_id}", response_model=List[QuestWithProgress])
 async def get_quests_for_child(
     child_id: str,
     world: Optional[str] = None,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_child_access)
 ):
-    # Verify access to child
-    child = children_collection.find_one({"id": child_id})
-    if not child:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Child profile not found"
-        )
+    # Get quests, with steps, from the in-process catalog
+    quests = [
+        quest for quest in quest_catalog.snapshot().quests.values()
+        if world is None or quest["world"] == world
+    ]
     
-    if child["parent_id"] != current_user.user_id and current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this child's data"
-        )
-    
-    # Get quests
-    query = {"is_active": True}
-    if world:
-        query["world"] = world
-    
-    quests = list(quests_collection.find(query))
-    
-    # Get child's progress
-    child_progress = {p["quest_id"]: p for p in progress_collection.find({"child_id": child_id})}
+    # Get child's progress (without Mongo internals, which cannot be serialized)
+    child_progress = {
+        p["quest_id"]: p for p in progress_collection.find({"child_id": child_id}, {"_id": 0, "outbox": 0})
+    }
     
     # Get completed quest IDs
-    completed_quest_ids = [qid for qid, p in child_progress.items() if p.get("completed_at")]
+    completed_quest_ids = {qid for qid, p in child_progress.items() if p.get("completed_at")}
     
     result = []
     for quest in quests:
-        steps = list(quest_steps_collection.find({"quest_id": quest["id"]}).sort("step_order", 1))
-        quest["steps"] = [QuestStep(**step) for step in steps]
-        
-        progress = child_progress.get(quest["id"])
+        progress = progress_store.expand(child_progress.get(quest["id"]))
         is_completed = quest["id"] in completed_quest_ids
         
         # Check if locked (prerequisites not met)
@@ -79,15 +79,44 @@ async def get_quests_for_child(
         if quest.get("prerequisites"):
             is_locked = not all(prereq in completed_quest_ids for prereq in quest["prerequisites"])
         
-        quest_with_progress = QuestWithProgress(
+        result.append({
             **quest,
-            progress=progress,
-            is_completed=is_completed,
-            is_locked=is_locked
+            "progress": progress,
+            "is_completed": is_completed,
+            "is_locked": is_locked
+        })
+    
+    return model_response(List[QuestWithProgress], load_many(QuestWithProgress, result))
+
+@router.get("/child/{child_id}/recommended", response_model=List[QuestRecommendation])
+async def get_recommended_quests(
+    child_id: str,
+    limit: int = Query(3, ge=1, le=20),
+    current_user: TokenData = Depends(get_child_access)
+):
+    catalog = quest_catalog.snapshot()
+    activity = child_activity_cache.get(child_id, catalog)
+    if activity is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found"
         )
-        result.append(quest_with_progress)
     
-    return result
+    return [
+        QuestRecommendation(
+            quest_id=r["quest"]["id"],
+            title=r["quest"]["title"],
+            description=r["quest"]["description"],
+            world=r["quest"]["world"],
+            subject=r["quest"]["subject"],
+            difficulty=r["quest"]["difficulty"],
+            estimated_minutes=r["quest"]["estimated_minutes"],
+            xp_reward=r["quest"]["xp_reward"],
+            score=r["score"],
+            reasons=r["reasons"]
+        )
+        for r in rank_quests(catalog, activity, limit)
+    ]
 
 @router.get("/{quest_id}", response_model=Quest)
 async def get_quest(quest_id: str, current_user: TokenData = Depends(get_current_user)):
@@ -98,12 +127,12 @@ async def get_quest(quest_id: str, current_user: TokenData = Depends(get_current
             detail="Quest not found"
         )
     
-    steps = list(quest_steps_collection.find({"quest_id": quest_id}).sort("step_order", 1))
-    quest["steps"] = [QuestStep(**step) for step in steps]
+    steps = quest_steps_collection.find({"quest_id": quest_id}).sort("step_order", 1)
+    quest["steps"] = [public_step(step) for step in steps]
     
-    return Quest(**quest)
+    return model_response(Quest, load(Quest, quest))
 
 @router.get("/{quest_id}/steps", response_model=List[QuestStep])
 async def get_quest_steps(quest_id: str, current_user: TokenData = Depends(get_current_user)):
-    steps = list(quest_steps_collection.find({"quest_id": quest_id}).sort("step_order", 1))
-    return [QuestStep(**step) for step in steps]
\ No newline at end of file
+    steps = quest_steps_collection.find({"quest_id": quest_id}).sort("step_order", 1)
+    return model_response(List[QuestStep], load_many(QuestStep, [public_step(step) for step in steps]))
\ No newline at end of file
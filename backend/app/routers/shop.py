@@ -0,0 +1,146 @@
+from fastapi import APIRouter, HTTPException, status, Depends
+from typing import List, Dict, Any
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.models.reward import PurchaseRequest, CartPurchaseRequest, PurchaseResult, InventoryItem
+from app.models.user import TokenData
+from app.database import LIVE_CHILD, children_collection, inventory_collection
+from app.services.catalog import cosmetics_cache
+from app.utils.auth import get_current_user
+from datetime import datetime
+import uuid
+
+router = APIRouter(prefix="/api/shop", tags=["shop"])
+
+DUPLICATE_KEY = 11000
+
+def resolve_cosmetics(cosmetic_ids: List[str]) -> List[Dict[str, Any]]:
+    cosmetics = cosmetics_cache.get_many(cosmetic_ids)
+    missing = [cid for cid in cosmetic_ids if cid not in cosmetics]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Cosmetic not found: {', '.join(missing)}"
+        )
+    
+    not_for_sale = [cid for cid in cosmetic_ids if cosmetics[cid]["coin_cost"] <= 0]
+    if not_for_sale:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cosmetic is earned, not bought: {', '.join(not_for_sale)}"
+        )
+    return [cosmetics[cid] for cid in cosmetic_ids]
+
+def spend_coins(child_id: str, parent_id: str, amount: int) -> Dict[str, Any]:
+    """Deduct coins in one conditional update, so concurrent purchases can never overspend"""
+    child = children_collection.find_one_and_update(
+        {"id": child_id, "parent_id": parent_id, "coins": {"$gte": amount}, **LIVE_CHILD},
+        {"$inc": {"coins": -amount}},
+        projection={"_id": 0, "coins": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if child:
+        return child
+    
+    # Slow path only: explain why the conditional update matched nothing
+    if not children_collection.find_one({"id": child_id, "parent_id": parent_id, **LIVE_CHILD}, {"_id": 1}):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Not enough coins"
+    )
+
+def refund_coins(child_id: str, amount: int):
+    if amount:
+        children_collection.update_one({"id": child_id}, {"$inc": {"coins": amount}})
+
+def new_inventory_item(child_id: str, cosmetic: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()),
+        "child_id": child_id,
+        "item_type": "cosmetic",
+        "item_id": cosmetic["id"],
+        "earned_at": datetime.utcnow(),
+        "is_equipped": False
+    }
+
+def grant_key(item: Dict[str, Any]) -> Dict[str, Any]:
+    # Matches the unique (child_id, item_type, item_id) index, so retries never duplicate items
+    return {"child_id": item["child_id"], "item_type": item["item_type"], "item_id": item["item_id"]}
+
+@router.post("/{child_id}/purchase", response_model=PurchaseResult)
+async def purchase_cosmetic(child_id: str, purchase: PurchaseRequest, current_user: TokenData = Depends(get_current_user)):
+    cosmetic = resolve_cosmetics([purchase.cosmetic_id])[0]
+    cost = cosmetic["coin_cost"]
+    
+    child = spend_coins(child_id, current_user.user_id, cost)
+    
+    item = new_inventory_item(child_id, cosmetic)
+    try:
+        result = inventory_collection.update_one(grant_key(item), {"$setOnInsert": item}, upsert=True)
+        created = result.upserted_id is not None
+    except DuplicateKeyError:
+        created = False
+    except Exception:
+        # Compensate so a failed grant never costs the child coins
+        refund_coins(child_id, cost)
+        raise
+    
+    if not created:
+        refund_coins(child_id, cost)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Cosmetic already owned"
+        )
+    
+    return PurchaseResult(
+        purchased=[InventoryItem(**item)],
+        coins_spent=cost,
+        coins_remaining=child["coins"]
+    )
+
+@router.post("/{child_id}/cart", response_model=PurchaseResult)
+async def purchase_cart(child_id: str, cart: CartPurchaseRequest, current_user: TokenData = Depends(get_current_user)):
+    cosmetic_ids = list(dict.fromkeys(cart.cosmetic_ids))
+    cosmetics = resolve_cosmetics(cosmetic_ids)
+    total_cost = sum(c["coin_cost"] for c in cosmetics)
+    
+    # One deduction for the whole cart, then one bulk write for every grant
+    child = spend_coins(child_id, current_user.user_id, total_cost)
+    
+    items = [new_inventory_item(child_id, c) for c in cosmetics]
+    failed = False
+    try:
+        result = inventory_collection.bulk_write(
+            [UpdateOne(grant_key(item), {"$setOnInsert": item}, upsert=True) for item in items],
+            ordered=False
+        )
+        upserted = set(result.upserted_ids)
+    except BulkWriteError as e:
+        upserted = {u["index"] for u in e.details.get("upserted", [])}
+        failed = any(err["code"] != DUPLICATE_KEY for err in e.details.get("writeErrors", []))
+    except Exception:
+        refund_coins(child_id, total_cost)
+        raise
+    
+    # Refund everything that was not newly granted
+    purchased = [item for index, item in enumerate(items) if index in upserted]
+    already_owned = [item["item_id"] for index, item in enumerate(items) if index not in upserted]
+    refund = sum(c["coin_cost"] for index, c in enumerate(cosmetics) if index not in upserted)
+    refund_coins(child_id, refund)
+    
+    if failed:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Some items could not be granted and were refunded"
+        )
+    
+    return PurchaseResult(
+        purchased=[InventoryItem(**item) for item in purchased],
+        already_owned=already_owned,
+        coins_spent=total_cost - refund,
+        coins_remaining=child["coins"] + refund
+    )
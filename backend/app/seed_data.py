@@ -1,52 +1,26 @@
 #!/usr/bin/env python3
-"""Seed database with initial quests, worlds, and cosmetics"""
+"""Seed database with initial quests, worlds, and cosmetics.
+
+The catalog is declared below with stable keys; `app.services.seeding` syncs it by key and
+content hash, so rerunning the seed keeps every id and only writes what changed.
+"""
 
 from app.database import (
     quests_collection, quest_steps_collection, 
-    cosmetics_collection, users_collection
+    cosmetics_collection, badges_collection, users_collection
 )
+from app.services import seeding
+from app.services.bundles import publish_bundles
+from app.services.catalog import badges_cache, cosmetics_cache, quest_catalog
 from app.utils.auth import get_password_hash
 from datetime import datetime
 import uuid
 
-def clear_collections():
-    """Clear existing data (use with caution!)"""
-    print("Clearing existing data...")
-    quests_collection.delete_many({})
-    quest_steps_collection.delete_many({})
-    cosmetics_collection.delete_many({})
-
-def seed_admin_user():
-    """Create default admin user"""
-    print("Creating admin user...")
-    
-    # Check if admin exists
-    existing = users_collection.find_one({"email": "admin@kidquest.com"})
-    if existing:
-        print("Admin user already exists")
-        return existing["id"]
-    
-    admin_id = str(uuid.uuid4())
-    admin = {
-        "id": admin_id,
-        "email": "admin@kidquest.com",
-        "hashed_password": get_password_hash("admin123"),
-        "role": "admin",
-        "created_at": datetime.utcnow(),
-        "consent_timestamp": datetime.utcnow()
-    }
-    users_collection.insert_one(admin)
-    print(f"Admin user created: admin@kidquest.com / admin123")
-    return admin_id
-
-def seed_math_quests(admin_id: str):
-    """Seed Math Jungle quests"""
-    print("Seeding Math Jungle quests...")
-    
-    # Quest 1: Number Adventure
-    quest1_id = str(uuid.uuid4())
-    quest1 = {
-        "id": quest1_id,
+# Quests keep their keys for good: ids, and so progress, follow the key. Prerequisites
+# name quest keys, and steps are ordered as listed.
+MATH_QUESTS = [
+    {
+        "key": "number-adventure",
         "title": "Number Adventure in the Jungle",
         "description": "Help the jungle animals count their treasures! Learn counting and basic addition.",
         "world": "math_jungle",
@@ -58,95 +32,77 @@ def seed_math_quests(admin_id: str):
         "coin_reward": 50,
         "badge_id": "badge_math_counting",
         "prerequisites": [],
-        "created_at": datetime.utcnow(),
-        "created_by": admin_id,
-        "is_active": True
-    }
-    quests_collection.insert_one(quest1)
-    
-    # Quest 1 Steps
-    steps1 = [
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest1_id,
-            "step_order": 1,
-            "step_type": "dialogue",
-            "title": "Meet Miko the Monkey",
-            "description": "Miko needs help counting bananas!",
-            "config": {
-                "character": "miko_monkey",
-                "dialogue": "Hi there! I'm Miko! I found so many bananas but I can't count them all. Can you help me?",
-                "choices": ["Sure, I'll help!", "Let's do this!"]
+        "steps": [
+            {
+                "key": "meet-miko-the-monkey",
+                "step_type": "dialogue",
+                "title": "Meet Miko the Monkey",
+                "description": "Miko needs help counting bananas!",
+                "config": {
+                    "character": "miko_monkey",
+                    "dialogue": "Hi there! I'm Miko! I found so many bananas but I can't count them all. Can you help me?",
+                    "choices": ["Sure, I'll help!", "Let's do this!"]
+                },
+                "hints": [],
+                "xp_reward": 10
             },
-            "hints": [],
-            "xp_reward": 10
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest1_id,
-            "step_order": 2,
-            "step_type": "math_puzzle",
-            "title": "Count the Bananas",
-            "description": "Count how many bananas Miko has collected",
-            "config": {
-                "puzzle_type": "counting",
-                "question": "How many bananas do you see?",
-                "correct_answer": 8,
-                "visual_items": ["banana"] * 8,
-                "min_value": 1,
-                "max_value": 10
+            {
+                "key": "count-the-bananas",
+                "step_type": "math_puzzle",
+                "title": "Count the Bananas",
+                "description": "Count how many bananas Miko has collected",
+                "config": {
+                    "puzzle_type": "counting",
+                    "question": "How many bananas do you see?",
+                    "correct_answer": 8,
+                    "visual_items": ["banana"] * 8,
+                    "min_value": 1,
+                    "max_value": 10
+                },
+                "hints": [
+                    "Try counting each banana one by one",
+                    "Start from the left and count to the right",
+                    "The answer is 8"
+                ],
+                "xp_reward": 25
             },
-            "hints": [
-                "Try counting each banana one by one",
-                "Start from the left and count to the right",
-                "The answer is 8"
-            ],
-            "xp_reward": 25
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest1_id,
-            "step_order": 3,
-            "step_type": "math_puzzle",
-            "title": "Addition Fun",
-            "description": "Miko found more bananas! How many does he have now?",
-            "config": {
-                "puzzle_type": "addition",
-                "question": "Miko had 8 bananas. He found 3 more. How many does he have now?",
-                "operand1": 8,
-                "operand2": 3,
-                "correct_answer": 11,
-                "visual_mode": True
+            {
+                "key": "addition-fun",
+                "step_type": "math_puzzle",
+                "title": "Addition Fun",
+                "description": "Miko found more bananas! How many does he have now?",
+                "config": {
+                    "puzzle_type": "addition",
+                    "question": "Miko had 8 bananas. He found 3 more. How many does he have now?",
+                    "operand1": 8,
+                    "operand2": 3,
+                    "correct_answer": 11,
+                    "visual_mode": True
+                },
+                "hints": [
+                    "Try adding the numbers together",
+                    "8 + 3 = ?",
+                    "The answer is 11"
+                ],
+                "xp_reward": 30
             },
-            "hints": [
-                "Try adding the numbers together",
-                "8 + 3 = ?",
-                "The answer is 11"
-            ],
-            "xp_reward": 30
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest1_id,
-            "step_order": 4,
-            "step_type": "collect",
-            "title": "Collect Your Reward",
-            "description": "Great job! Collect your treasure!",
-            "config": {
-                "item": "golden_banana",
-                "quantity": 1,
-                "message": "You earned a Golden Banana trophy!"
-            },
-            "hints": [],
-            "xp_reward": 35
-        }
-    ]
-    quest_steps_collection.insert_many(steps1)
-    
-    # Quest 2: Fraction Forest
-    quest2_id = str(uuid.uuid4())
-    quest2 = {
-        "id": quest2_id,
+            {
+                "key": "collect-your-reward",
+                "step_type": "collect",
+                "title": "Collect Your Reward",
+                "description": "Great job! Collect your treasure!",
+                "config": {
+                    "item": "golden_banana",
+                    "quantity": 1,
+                    "message": "You earned a Golden Banana trophy!"
+                },
+                "hints": [],
+                "xp_reward": 35
+            }
+        ]
+    },
+    {
+        "key": "fraction-forest",
         "title": "Fraction Forest Adventure",
         "description": "Learn about fractions by helping animals share their food fairly!",
         "world": "math_jungle",
@@ -157,100 +113,81 @@ def seed_math_quests(admin_id: str):
         "xp_reward": 150,
         "coin_reward": 75,
         "badge_id": "badge_math_fractions",
-        "prerequisites": [quest1_id],
-        "created_at": datetime.utcnow(),
-        "created_by": admin_id,
-        "is_active": True
-    }
-    quests_collection.insert_one(quest2)
-    
-    steps2 = [
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest2_id,
-            "step_order": 1,
-            "step_type": "dialogue",
-            "title": "Meet Ella the Elephant",
-            "description": "Ella needs help dividing pizza!",
-            "config": {
-                "character": "ella_elephant",
-                "dialogue": "Hello friend! I have pizzas to share with my friends, but I need help dividing them fairly. Can you help?",
-                "choices": ["Of course!", "Let's learn fractions!"]
+        "prerequisites": ["number-adventure"],
+        "steps": [
+            {
+                "key": "meet-ella-the-elephant",
+                "step_type": "dialogue",
+                "title": "Meet Ella the Elephant",
+                "description": "Ella needs help dividing pizza!",
+                "config": {
+                    "character": "ella_elephant",
+                    "dialogue": "Hello friend! I have pizzas to share with my friends, but I need help dividing them fairly. Can you help?",
+                    "choices": ["Of course!", "Let's learn fractions!"]
+                },
+                "hints": [],
+                "xp_reward": 15
             },
-            "hints": [],
-            "xp_reward": 15
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest2_id,
-            "step_order": 2,
-            "step_type": "math_puzzle",
-            "title": "Half of a Pizza",
-            "description": "Divide the pizza in half",
-            "config": {
-                "puzzle_type": "fractions",
-                "question": "If Ella divides 1 pizza equally between 2 friends, what fraction does each get?",
-                "numerator": 1,
-                "denominator": 2,
-                "visual_type": "pizza",
-                "correct_answer": "1/2"
+            {
+                "key": "half-of-a-pizza",
+                "step_type": "math_puzzle",
+                "title": "Half of a Pizza",
+                "description": "Divide the pizza in half",
+                "config": {
+                    "puzzle_type": "fractions",
+                    "question": "If Ella divides 1 pizza equally between 2 friends, what fraction does each get?",
+                    "numerator": 1,
+                    "denominator": 2,
+                    "visual_type": "pizza",
+                    "correct_answer": "1/2"
+                },
+                "hints": [
+                    "When you divide something into 2 equal parts, each part is 1/2",
+                    "Half is the same as 1 divided by 2",
+                    "The answer is 1/2"
+                ],
+                "xp_reward": 50
             },
-            "hints": [
-                "When you divide something into 2 equal parts, each part is 1/2",
-                "Half is the same as 1 divided by 2",
-                "The answer is 1/2"
-            ],
-            "xp_reward": 50
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest2_id,
-            "step_order": 3,
-            "step_type": "math_puzzle",
-            "title": "Quarters Challenge",
-            "description": "Now divide the pizza into quarters",
-            "config": {
-                "puzzle_type": "fractions",
-                "question": "If 1 pizza is divided equally among 4 friends, what fraction does each get?",
-                "numerator": 1,
-                "denominator": 4,
-                "visual_type": "pizza",
-                "correct_answer": "1/4"
+            {
+                "key": "quarters-challenge",
+                "step_type": "math_puzzle",
+                "title": "Quarters Challenge",
+                "description": "Now divide the pizza into quarters",
+                "config": {
+                    "puzzle_type": "fractions",
+                    "question": "If 1 pizza is divided equally among 4 friends, what fraction does each get?",
+                    "numerator": 1,
+                    "denominator": 4,
+                    "visual_type": "pizza",
+                    "correct_answer": "1/4"
+                },
+                "hints": [
+                    "Divide the pizza into 4 equal slices",
+                    "Each friend gets 1 out of 4 slices",
+                    "The answer is 1/4"
+                ],
+                "xp_reward": 50
             },
-            "hints": [
-                "Divide the pizza into 4 equal slices",
-                "Each friend gets 1 out of 4 slices",
-                "The answer is 1/4"
-            ],
-            "xp_reward": 50
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest2_id,
-            "step_order": 4,
-            "step_type": "collect",
-            "title": "Fraction Master Badge",
-            "description": "You've mastered fractions!",
-            "config": {
-                "item": "fraction_trophy",
-                "quantity": 1,
-                "message": "You're now a Fraction Master!"
-            },
-            "hints": [],
-            "xp_reward": 35
-        }
-    ]
-    quest_steps_collection.insert_many(steps2)
-    
-    print(f"Created {2} Math quests")
+            {
+                "key": "fraction-master-badge",
+                "step_type": "collect",
+                "title": "Fraction Master Badge",
+                "description": "You've mastered fractions!",
+                "config": {
+                    "item": "fraction_trophy",
+                    "quantity": 1,
+                    "message": "You're now a Fraction Master!"
+                },
+                "hints": [],
+                "xp_reward": 35
+            }
+        ]
+    }
+]
 
-def seed_coding_quests(admin_id: str):
-    """Seed Code City quests"""
-    print("Seeding Code City quests...")
-    
-    quest_id = str(uuid.uuid4())
-    quest = {
-        "id": quest_id,
+CODING_QUESTS = [
+    {
+        "key": "robot-rescue",
         "title": "Robot Rescue Mission",
         "description": "Program a robot to navigate through Code City and rescue the lost kitten!",
         "world": "code_city",
@@ -262,101 +199,82 @@ def seed_coding_quests(admin_id: str):
         "coin_reward": 60,
         "badge_id": "badge_coding_basics",
         "prerequisites": [],
-        "created_at": datetime.utcnow(),
-        "created_by": admin_id,
-        "is_active": True
-    }
-    quests_collection.insert_one(quest)
-    
-    steps = [
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest_id,
-            "step_order": 1,
-            "step_type": "dialogue",
-            "title": "Meet Robo",
-            "description": "Your robot friend needs programming!",
-            "config": {
-                "character": "robo_robot",
-                "dialogue": "Beep boop! I'm Robo! A kitten is stuck on the other side of the street. Help me program my moves to rescue it!",
-                "choices": ["Let's code!", "I'll help!"]
+        "steps": [
+            {
+                "key": "meet-robo",
+                "step_type": "dialogue",
+                "title": "Meet Robo",
+                "description": "Your robot friend needs programming!",
+                "config": {
+                    "character": "robo_robot",
+                    "dialogue": "Beep boop! I'm Robo! A kitten is stuck on the other side of the street. Help me program my moves to rescue it!",
+                    "choices": ["Let's code!", "I'll help!"]
+                },
+                "hints": [],
+                "xp_reward": 10
             },
-            "hints": [],
-            "xp_reward": 10
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest_id,
-            "step_order": 2,
-            "step_type": "code_puzzle",
-            "title": "Move Forward",
-            "description": "Drag blocks to make Robo move forward 3 steps",
-            "config": {
-                "puzzle_type": "sequence",
-                "grid_size": {"width": 5, "height": 3},
-                "start_position": {"x": 0, "y": 1},
-                "goal_position": {"x": 3, "y": 1},
-                "obstacles": [],
-                "available_blocks": ["move_forward", "turn_left", "turn_right"],
-                "solution": ["move_forward", "move_forward", "move_forward"]
+            {
+                "key": "move-forward",
+                "step_type": "code_puzzle",
+                "title": "Move Forward",
+                "description": "Drag blocks to make Robo move forward 3 steps",
+                "config": {
+                    "puzzle_type": "sequence",
+                    "grid_size": {"width": 5, "height": 3},
+                    "start_position": {"x": 0, "y": 1},
+                    "goal_position": {"x": 3, "y": 1},
+                    "obstacles": [],
+                    "available_blocks": ["move_forward", "turn_left", "turn_right"],
+                    "solution": ["move_forward", "move_forward", "move_forward"]
+                },
+                "hints": [
+                    "Use the 'move forward' block",
+                    "You need 3 'move forward' blocks",
+                    "Drag 3 move forward blocks in sequence"
+                ],
+                "xp_reward": 40
             },
-            "hints": [
-                "Use the 'move forward' block",
-                "You need 3 'move forward' blocks",
-                "Drag 3 move forward blocks in sequence"
-            ],
-            "xp_reward": 40
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest_id,
-            "step_order": 3,
-            "step_type": "code_puzzle",
-            "title": "Turn and Move",
-            "description": "Make Robo turn and navigate around the corner",
-            "config": {
-                "puzzle_type": "sequence",
-                "grid_size": {"width": 5, "height": 5},
-                "start_position": {"x": 0, "y": 2},
-                "goal_position": {"x": 2, "y": 0},
-                "obstacles": [{"x": 1, "y": 1}],
-                "available_blocks": ["move_forward", "turn_left", "turn_right"],
-                "solution": ["move_forward", "move_forward", "turn_right", "move_forward", "move_forward"]
+            {
+                "key": "turn-and-move",
+                "step_type": "code_puzzle",
+                "title": "Turn and Move",
+                "description": "Make Robo turn and navigate around the corner",
+                "config": {
+                    "puzzle_type": "sequence",
+                    "grid_size": {"width": 5, "height": 5},
+                    "start_position": {"x": 0, "y": 2},
+                    "goal_position": {"x": 2, "y": 0},
+                    "obstacles": [{"x": 1, "y": 1}],
+                    "available_blocks": ["move_forward", "turn_left", "turn_right"],
+                    "solution": ["move_forward", "move_forward", "turn_right", "move_forward", "move_forward"]
+                },
+                "hints": [
+                    "Move forward twice, then turn",
+                    "After turning, move forward twice more",
+                    "Solution: Forward, Forward, Turn Right, Forward, Forward"
+                ],
+                "xp_reward": 50
             },
-            "hints": [
-                "Move forward twice, then turn",
-                "After turning, move forward twice more",
-                "Solution: Forward, Forward, Turn Right, Forward, Forward"
-            ],
-            "xp_reward": 50
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest_id,
-            "step_order": 4,
-            "step_type": "collect",
-            "title": "Mission Complete!",
-            "description": "You saved the kitten!",
-            "config": {
-                "item": "coding_badge",
-                "quantity": 1,
-                "message": "You're a coding hero! The kitten is safe!"
-            },
-            "hints": [],
-            "xp_reward": 20
-        }
-    ]
-    quest_steps_collection.insert_many(steps)
-    
-    print(f"Created 1 Coding quest")
+            {
+                "key": "mission-complete",
+                "step_type": "collect",
+                "title": "Mission Complete!",
+                "description": "You saved the kitten!",
+                "config": {
+                    "item": "coding_badge",
+                    "quantity": 1,
+                    "message": "You're a coding hero! The kitten is safe!"
+                },
+                "hints": [],
+                "xp_reward": 20
+            }
+        ]
+    }
+]
 
-def seed_science_quests(admin_id: str):
-    """Seed Science Spaceport quests"""
-    print("Seeding Science Spaceport quests...")
-    
-    quest_id = str(uuid.uuid4())
-    quest = {
-        "id": quest_id,
+SCIENCE_QUESTS = [
+    {
+        "key": "gravity-experiment",
         "title": "Gravity Experiment",
         "description": "Learn about gravity by experimenting with objects in space!",
         "world": "science_spaceport",
@@ -368,154 +286,191 @@ def seed_science_quests(admin_id: str):
         "coin_reward": 50,
         "badge_id": "badge_science_gravity",
         "prerequisites": [],
-        "created_at": datetime.utcnow(),
-        "created_by": admin_id,
-        "is_active": True
-    }
-    quests_collection.insert_one(quest)
-    
-    steps = [
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest_id,
-            "step_order": 1,
-            "step_type": "dialogue",
-            "title": "Meet Captain Cosmo",
-            "description": "The space captain needs your help!",
-            "config": {
-                "character": "captain_cosmo",
-                "dialogue": "Greetings, space cadet! We're studying gravity today. Let's run some experiments!",
-                "choices": ["Ready for science!", "Let's explore!"]
+        "steps": [
+            {
+                "key": "meet-captain-cosmo",
+                "step_type": "dialogue",
+                "title": "Meet Captain Cosmo",
+                "description": "The space captain needs your help!",
+                "config": {
+                    "character": "captain_cosmo",
+                    "dialogue": "Greetings, space cadet! We're studying gravity today. Let's run some experiments!",
+                    "choices": ["Ready for science!", "Let's explore!"]
+                },
+                "hints": [],
+                "xp_reward": 10
             },
-            "hints": [],
-            "xp_reward": 10
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest_id,
-            "step_order": 2,
-            "step_type": "science_sim",
-            "title": "Dropping Objects",
-            "description": "What happens when we drop different objects?",
-            "config": {
-                "sim_type": "gravity_drop",
-                "question": "Drop a feather and a rock. Which hits the ground first on Earth?",
-                "objects": ["feather", "rock"],
-                "environment": "earth",
-                "correct_answer": "rock",
-                "explanation": "On Earth, the rock falls faster because air resistance slows the feather down. In space (no air), they'd fall at the same speed!"
+            {
+                "key": "dropping-objects",
+                "step_type": "science_sim",
+                "title": "Dropping Objects",
+                "description": "What happens when we drop different objects?",
+                "config": {
+                    "sim_type": "gravity_drop",
+                    "question": "Drop a feather and a rock. Which hits the ground first on Earth?",
+                    "objects": ["feather", "rock"],
+                    "environment": "earth",
+                    "options": ["rock", "feather"],
+                    "correct_answer": "rock",
+                    "explanation": "On Earth, the rock falls faster because air resistance slows the feather down. In space (no air), they'd fall at the same speed!"
+                },
+                "hints": [
+                    "Think about which object is heavier",
+                    "Air slows down light objects",
+                    "The rock falls faster on Earth"
+                ],
+                "xp_reward": 40
             },
-            "hints": [
-                "Think about which object is heavier",
-                "Air slows down light objects",
-                "The rock falls faster on Earth"
-            ],
-            "xp_reward": 40
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest_id,
-            "step_order": 3,
-            "step_type": "science_sim",
-            "title": "Space vs Earth",
-            "description": "Now try the same experiment in space!",
-            "config": {
-                "sim_type": "gravity_drop",
-                "question": "In space (no air), would the feather and rock fall at the same speed?",
-                "objects": ["feather", "rock"],
-                "environment": "space",
-                "correct_answer": "yes",
-                "explanation": "Without air resistance, all objects fall at the same speed due to gravity!"
+            {
+                "key": "space-vs-earth",
+                "step_type": "science_sim",
+                "title": "Space vs Earth",
+                "description": "Now try the same experiment in space!",
+                "config": {
+                    "sim_type": "gravity_drop",
+                    "question": "In space (no air), would the feather and rock fall at the same speed?",
+                    "objects": ["feather", "rock"],
+                    "environment": "space",
+                    "options": ["yes", "no"],
+                    "correct_answer": "yes",
+                    "explanation": "Without air resistance, all objects fall at the same speed due to gravity!"
+                },
+                "hints": [
+                    "There's no air in space",
+                    "Without air resistance, what happens?",
+                    "They fall at the same speed!"
+                ],
+                "xp_reward": 40
             },
-            "hints": [
-                "There's no air in space",
-                "Without air resistance, what happens?",
-                "They fall at the same speed!"
-            ],
-            "xp_reward": 40
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "quest_id": quest_id,
-            "step_order": 4,
-            "step_type": "collect",
-            "title": "Science Star",
-            "description": "You're a gravity expert!",
-            "config": {
-                "item": "gravity_badge",
-                "quantity": 1,
-                "message": "Amazing! You understand gravity!"
-            },
-            "hints": [],
-            "xp_reward": 10
-        }
-    ]
-    quest_steps_collection.insert_many(steps)
-    
-    print(f"Created 1 Science quest")
+            {
+                "key": "science-star",
+                "step_type": "collect",
+                "title": "Science Star",
+                "description": "You're a gravity expert!",
+                "config": {
+                    "item": "gravity_badge",
+                    "quantity": 1,
+                    "message": "Amazing! You understand gravity!"
+                },
+                "hints": [],
+                "xp_reward": 10
+            }
+        ]
+    }
+]
+
+COSMETICS = [
+    # Hair styles
+    {
+        "key": "short",
+        "name": "Short Hair",
+        "category": "hair_style",
+        "value": "short",
+        "description": "Classic short hairstyle",
+        "unlock_requirement": "Default",
+        "coin_cost": 0
+    },
+    {
+        "key": "spiky",
+        "name": "Spiky Hair",
+        "category": "hair_style",
+        "value": "spiky",
+        "description": "Cool spiky hairstyle",
+        "unlock_requirement": "Complete 3 quests",
+        "unlock_rule": {"type": "quests_completed", "count": 3},
+        "coin_cost": 100
+    },
+    # Outfits
+    {
+        "key": "casual_blue",
+        "name": "Casual Blue",
+        "category": "outfit",
+        "value": "casual_blue",
+        "description": "Comfortable blue outfit",
+        "unlock_requirement": "Default",
+        "coin_cost": 0
+    },
+    {
+        "key": "superhero_cape",
+        "name": "Superhero Cape",
+        "category": "outfit",
+        "value": "superhero_cape",
+        "description": "Become a learning superhero!",
+        "unlock_requirement": "Reach level 5",
+        "unlock_rule": {"type": "level_reached", "level": 5},
+        "coin_cost": 200
+    },
+    # Accessories
+    {
+        "key": "glasses",
+        "name": "Cool Glasses",
+        "category": "accessory",
+        "value": "glasses",
+        "description": "Smart-looking glasses",
+        "unlock_requirement": "Complete Math Jungle",
+        "unlock_rule": {"type": "quests_completed", "world": "math_jungle", "count": 2},
+        "coin_cost": 150
+    }
+]
 
-def seed_cosmetics():
-    """Seed initial cosmetics"""
-    print("Seeding cosmetics...")
+# Badge ids are fixed because quests reference them
+BADGES = [
+    {
+        "id": "badge_math_counting",
+        "name": "Counting Champion",
+        "description": "Helped Miko count every banana in the jungle",
+        "icon": "🍌",
+        "category": "math",
+        "rarity": "common"
+    },
+    {
+        "id": "badge_math_fractions",
+        "name": "Fraction Master",
+        "description": "Shared pizza fairly with halves and quarters",
+        "icon": "🍕",
+        "category": "math",
+        "rarity": "rare"
+    },
+    {
+        "id": "badge_coding_basics",
+        "name": "Robot Rescuer",
+        "description": "Programmed Robo to rescue the lost kitten",
+        "icon": "🤖",
+        "category": "coding",
+        "rarity": "common"
+    },
+    {
+        "id": "badge_science_gravity",
+        "name": "Gravity Expert",
+        "description": "Discovered how objects fall on Earth and in space",
+        "icon": "🪐",
+        "category": "science",
+        "rarity": "common"
+    }
+]
+
+def seed_admin_user():
+    """Create default admin user"""
+    print("Creating admin user...")
     
-    cosmetics = [
-        # Hair styles
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Short Hair",
-            "category": "hair_style",
-            "value": "short",
-            "description": "Classic short hairstyle",
-            "unlock_requirement": "Default",
-            "coin_cost": 0,
-            "created_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Spiky Hair",
-            "category": "hair_style",
-            "value": "spiky",
-            "description": "Cool spiky hairstyle",
-            "unlock_requirement": "Complete 3 quests",
-            "coin_cost": 100,
-            "created_at": datetime.utcnow()
-        },
-        # Outfits
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Casual Blue",
-            "category": "outfit",
-            "value": "casual_blue",
-            "description": "Comfortable blue outfit",
-            "unlock_requirement": "Default",
-            "coin_cost": 0,
-            "created_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Superhero Cape",
-            "category": "outfit",
-            "value": "superhero_cape",
-            "description": "Become a learning superhero!",
-            "unlock_requirement": "Reach level 5",
-            "coin_cost": 200,
-            "created_at": datetime.utcnow()
-        },
-        # Accessories
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Cool Glasses",
-            "category": "accessory",
-            "value": "glasses",
-            "description": "Smart-looking glasses",
-            "unlock_requirement": "Complete Math Jungle",
-            "coin_cost": 150,
-            "created_at": datetime.utcnow()
-        }
-    ]
+    # Check if admin exists
+    existing = users_collection.find_one({"email": "admin@kidquest.com"})
+    if existing:
+        print("Admin user already exists")
+        return existing["id"]
     
-    cosmetics_collection.insert_many(cosmetics)
-    print(f"Created {len(cosmetics)} cosmetics")
+    admin_id = str(uuid.uuid4())
+    admin = {
+        "id": admin_id,
+        "email": "admin@kidquest.com",
+        "hashed_password": get_password_hash("admin123"),
+        "role": "admin",
+        "created_at": datetime.utcnow(),
+        "consent_timestamp": datetime.utcnow()
+    }
+    users_collection.insert_one(admin)
+    print(f"Admin user created: admin@kidquest.com / admin123")
+    return admin_id
 
 def main():
     print("\n" + "="*50)
@@ -525,13 +480,22 @@ def main():
     # Create admin user
     admin_id = seed_admin_user()
     
-    # Seed quests
-    seed_math_quests(admin_id)
-    seed_coding_quests(admin_id)
-    seed_science_quests(admin_id)
+    # Sync the declared catalog; unchanged documents are read, not written
+    quest_results = seeding.seed_quests(MATH_QUESTS + CODING_QUESTS + SCIENCE_QUESTS, admin_id)
+    cosmetics_result = seeding.seed_cosmetics(COSMETICS)
+    badges_result = seeding.seed_badges(BADGES)
+    for result in quest_results + [cosmetics_result, badges_result]:
+        print(result)
     
-    # Seed cosmetics
-    seed_cosmetics()
+    # Tell running API workers to reload what changed, and republish static bundles
+    if cosmetics_result.changed:
+        cosmetics_cache.invalidate()
+    if badges_result.changed:
+        badges_cache.invalidate()
+    if any(result.changed for result in quest_results):
+        quest_catalog.invalidate()
+        manifest = publish_bundles()
+        print(f"Published {len(manifest['bundles'])} quest bundles")
     
     print("\n" + "="*50)
     print("Seeding complete!")
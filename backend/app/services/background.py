@@ -0,0 +1,56 @@
+"""Minimal asyncio loop for blocking background steps"""
+
+import asyncio
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundLoop:
+    """Runs a blocking step in a worker thread until stopped.
+
+    The step returns a truthy value when it did work and should run again right away;
+    otherwise the loop sleeps for `interval` seconds or until woken.
+    """
+
+    def __init__(self, name: str, step: Callable[[], object], interval: float):
+        self.name = name
+        self.step = step
+        self.interval = interval
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                if await asyncio.to_thread(self.step):
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Background loop %s failed", self.name)
+            
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
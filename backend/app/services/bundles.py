@@ -0,0 +1,149 @@
+"""Static quest catalog bundles, rendered on publish and served as immutable files.
+
+Each world's active quests (with their steps) are written as `quests-<world>.<hash>.json`
+plus precompressed variants. `manifest.json` is replaced atomically and points at the
+current file for every world, so clients cache bundles forever and only revalidate the
+manifest.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+try:
+    import brotli
+except ImportError:  # optional; gzip variants are always written
+    brotli = None
+
+from starlette.staticfiles import StaticFiles
+
+from app.config import settings
+from app.database import quest_steps_collection, quests_collection
+from app.models.quest import Quest
+from app.services.tasks import task
+from app.services.validators import public_step
+from app.utils.model_reads import adapter, load_many
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_DIR = Path(settings.bundle_dir) if settings.bundle_dir else Path(__file__).resolve().parents[3] / "frontend" / "bundles"
+MANIFEST = "manifest.json"
+
+
+def _write_atomic(path: Path, data: bytes):
+    # A unique temp file per writer, so concurrent publishes never write into each other's file
+    tmp = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+        os.chmod(tmp.name, 0o644)  # temp files are created private; bundles are served as static files
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+def _write_bundle(world: str, body: bytes) -> Dict[str, Any]:
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    name = f"quests-{world}.{digest}.json"
+    path = BUNDLE_DIR / name
+    # Same content, same name: an unchanged world is not rewritten, only marked as current
+    if path.exists():
+        for variant in BUNDLE_DIR.glob(name + "*"):
+            os.utime(variant)
+    else:
+        _write_atomic(path.with_name(name + ".gz"), gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write_atomic(path.with_name(name + ".br"), brotli.compress(body, quality=11))
+        _write_atomic(path, body)
+    return {"file": name, "hash": digest, "bytes": len(body)}
+
+
+def render_bundles() -> Dict[str, bytes]:
+    """Serialized bundle per world, deterministic for identical catalog content"""
+    quests = list(quests_collection.find({"is_active": True}, {"_id": 0}).sort("id", 1))
+    steps_by_quest: Dict[str, List[Dict[str, Any]]] = {}
+    for step in quest_steps_collection.find(
+        {"quest_id": {"$in": [q["id"] for q in quests]}}, {"_id": 0}
+    ).sort([("quest_id", 1), ("step_order", 1)]):
+        steps_by_quest.setdefault(step["quest_id"], []).append(public_step(step))
+    
+    by_world: Dict[str, List[Dict[str, Any]]] = {}
+    for quest in quests:
+        quest["steps"] = steps_by_quest.get(quest["id"], [])
+        by_world.setdefault(quest["world"], []).append(quest)
+    
+    quest_list = adapter(List[Quest])
+    return {
+        world: json.dumps(
+            {"world": world, "quests": quest_list.dump_python(load_many(Quest, world_quests), mode="json")},
+            separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+        for world, world_quests in sorted(by_world.items())
+    }
+
+
+def _prune(keep: set):
+    cutoff = time.time() - settings.bundle_retention_seconds
+    for path in BUNDLE_DIR.glob("quests-*.json*"):
+        base = path.name[:-3] if path.suffix in (".gz", ".br") else path.name
+        # Clients holding an older manifest may still fetch recent superseded bundles
+        if base not in keep and path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+
+
+@task("bundles.publish")
+def publish_bundles() -> Dict[str, Any]:
+    """Render every world's bundle, then point the manifest at them"""
+    BUNDLE_DIR.mkdir(parents=True, exist_ok=True)
+    bundles = {world: _write_bundle(world, body) for world, body in render_bundles().items()}
+    manifest = {"generated_at": datetime.utcnow().isoformat(), "bundles": bundles}
+    _write_atomic(BUNDLE_DIR / MANIFEST, json.dumps(manifest, indent=2).encode("utf-8"))
+    _prune({b["file"] for b in bundles.values()})
+    logger.info("Published quest bundles: %s", ", ".join(b["file"] for b in bundles.values()))
+    return manifest
+
+
+def ensure_published():
+    """Publish once if this deployment has no manifest yet"""
+    if not (BUNDLE_DIR / MANIFEST).exists():
+        publish_bundles()
+
+
+class BundleFiles(StaticFiles):
+    """Serves precompressed variants when accepted; hashed bundles are immutable, the manifest is not"""
+
+    ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+    async def get_response(self, path: str, scope):
+        accepted = ""
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accepted = value.decode("latin-1")
+        
+        response = None
+        if path.endswith(".json") and path != MANIFEST:
+            for encoding, suffix in self.ENCODINGS:
+                if encoding in accepted:
+                    full_path, stat_result = self.lookup_path(path + suffix)
+                    if stat_result is not None:
+                        response = self.file_response(full_path, stat_result, scope)
+                        response.headers["content-encoding"] = encoding
+                        response.headers["content-type"] = "application/json"
+                        break
+        if response is None:
+            response = await super().get_response(path, scope)
+        
+        response.headers["vary"] = "Accept-Encoding"
+        if path == MANIFEST:
+            response.headers["cache-control"] = "no-cache"
+        elif response.status_code == 200:
+            response.headers["cache-control"] = "public, max-age=31536000, immutable"
+        return response
@@ -0,0 +1,165 @@
+"""Process-local caches for the small, rarely edited catalog collections"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.database import (
+    badges_collection, catalog_versions_collection, cosmetics_collection,
+    quest_steps_collection, quests_collection
+)
+from app.services.validators import CompiledValidator, compile_step, public_step
+
+
+class CatalogCache:
+    """id -> document cache that fills misses with one $in query.
+
+    Admin writes call invalidate(), which also bumps a shared version document so other
+    workers drop their copy within catalog_cache_ttl_seconds.
+    """
+
+    def __init__(self, name: str, collection, preload: bool = False):
+        self.name = name
+        self.collection = collection
+        self.preload = preload
+        self._docs: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def _current_version(self) -> int:
+        doc = catalog_versions_collection.find_one({"_id": self.name})
+        return doc["version"] if doc else 0
+
+    def _sync_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < settings.catalog_cache_ttl_seconds:
+            return
+        self._checked_at = now
+        version = self._current_version()
+        if version != self._version:
+            if self.preload:
+                self.refresh()
+            else:
+                self._docs = {}
+            self._version = version
+
+    def refresh(self):
+        """Load the whole collection so lookups never reach the database"""
+        self._version = self._current_version()
+        self._checked_at = time.monotonic()
+        self._docs = {doc["id"]: doc for doc in self.collection.find({}, {"_id": 0})}
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        self._sync_version()
+        ids = list(ids)
+        missing = list({i for i in ids if i not in self._docs})
+        if missing:
+            found = {doc["id"]: doc for doc in self.collection.find({"id": {"$in": missing}}, {"_id": 0})}
+            for item_id in missing:
+                # Unknown ids are cached too, so repeated lookups stay off the database
+                self._docs[item_id] = found.get(item_id)
+        return {i: self._docs[i] for i in ids if self._docs.get(i) is not None}
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([item_id]).get(item_id)
+
+    def invalidate(self):
+        catalog_versions_collection.update_one({"_id": self.name}, {"$inc": {"version": 1}}, upsert=True)
+        if self.preload:
+            self.refresh()
+        else:
+            self._docs = {}
+            self._version = None
+            self._checked_at = 0.0
+
+
+cosmetics_cache = CatalogCache("cosmetics", cosmetics_collection)
+badges_cache = CatalogCache("badges", badges_collection, preload=True)
+
+CATALOG_CACHES = {
+    "cosmetic": cosmetics_cache,
+    "badge": badges_cache,
+}
+
+
+def hydrate_inventory(items: Iterable[Dict[str, Any]]) -> None:
+    """Fill item_details in place with one catalog lookup per item type"""
+    items = list(items)
+    ids_by_type: Dict[str, list] = {}
+    for item in items:
+        ids_by_type.setdefault(item["item_type"], []).append(item["item_id"])
+    
+    details = {
+        item_type: CATALOG_CACHES[item_type].get_many(ids)
+        for item_type, ids in ids_by_type.items()
+        if item_type in CATALOG_CACHES
+    }
+    for item in items:
+        item["item_details"] = details.get(item["item_type"], {}).get(item["item_id"])
+
+
+DIFFICULTY_RANKS = {"easy": 0, "medium": 1, "hard": 2}
+
+
+class QuestCatalogSnapshot:
+    """Active quests with their ordered public steps, plus per-quest features, per-step
+    answer validators and per-step hints derived once per version"""
+
+    def __init__(self, version: int, quests: List[Dict[str, Any]], steps: List[Dict[str, Any]]):
+        self.version = version
+        steps_by_quest: Dict[str, List[Dict[str, Any]]] = {}
+        self.validators: Dict[str, Optional[CompiledValidator]] = {}
+        self.hints: Dict[str, List[str]] = {}
+        for step in sorted(steps, key=lambda s: s["step_order"]):
+            self.validators[step["id"]] = compile_step(step)
+            self.hints[step["id"]] = step.get("hints") or []
+            steps_by_quest.setdefault(step["quest_id"], []).append(public_step(step))
+        
+        self.quests: Dict[str, Dict[str, Any]] = {}
+        self.features: Dict[str, Dict[str, Any]] = {}
+        for quest in quests:
+            quest["steps"] = steps_by_quest.get(quest["id"], [])
+            self.quests[quest["id"]] = quest
+            self.features[quest["id"]] = {
+                "subject": quest["subject"],
+                "world": quest["world"],
+                "difficulty_rank": DIFFICULTY_RANKS.get(quest.get("difficulty"), 0),
+                "prerequisites": frozenset(quest.get("prerequisites", [])),
+                "age_range": frozenset(quest.get("age_range", [])),
+            }
+
+
+class QuestCatalog:
+    """Process-local snapshot of the active quest catalog, rebuilt when the "quests" version moves"""
+
+    name = "quests"
+
+    def __init__(self):
+        self._snapshot: Optional[QuestCatalogSnapshot] = None
+        self._checked_at = 0.0
+
+    def _current_version(self) -> int:
+        doc = catalog_versions_collection.find_one({"_id": self.name})
+        return doc["version"] if doc else 0
+
+    def snapshot(self) -> QuestCatalogSnapshot:
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < settings.catalog_cache_ttl_seconds:
+            return self._snapshot
+        self._checked_at = now
+        version = self._current_version()
+        if self._snapshot is None or self._snapshot.version != version:
+            quests = list(quests_collection.find({"is_active": True}, {"_id": 0}))
+            steps = list(quest_steps_collection.find(
+                {"quest_id": {"$in": [q["id"] for q in quests]}}, {"_id": 0}
+            ))
+            self._snapshot = QuestCatalogSnapshot(version, quests, steps)
+        return self._snapshot
+
+    def invalidate(self):
+        catalog_versions_collection.update_one({"_id": self.name}, {"$inc": {"version": 1}}, upsert=True)
+        self._snapshot = None
+        self._checked_at = 0.0
+
+
+quest_catalog = QuestCatalog()
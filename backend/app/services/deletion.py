@@ -0,0 +1,115 @@
+"""Durable background deletion of child profiles and their dependent data"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import uuid
+
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.database import CHILD_DEPENDENTS, children_collection, deletion_jobs_collection
+from app.services.background import BackgroundLoop
+from app.services.recommendations import child_activity_cache
+from app.utils.auth import ownership_cache
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """Another worker claimed the job after this worker's lease expired"""
+
+
+def schedule_child_deletion(child: Dict[str, Any]) -> Dict[str, Any]:
+    """Record a deletion job, then tombstone the profile so it disappears from every read path"""
+    job = {
+        "id": str(uuid.uuid4()),
+        "child_id": child["id"],
+        "parent_id": child["parent_id"],
+        "status": "pending",
+        "created_at": datetime.utcnow(),
+        "lease_until": None,
+        "lease_owner": None,
+        "purged": {},
+    }
+    # The job is written first so a crash never leaves orphaned data without a job to purge it
+    deletion_jobs_collection.insert_one(job)
+    children_collection.update_one({"id": child["id"]}, {"$set": {"deleted_at": datetime.utcnow()}})
+    ownership_cache.invalidate(child["id"])
+    child_activity_cache.invalidate(child["id"])
+    return job
+
+
+def claim_job() -> Optional[Dict[str, Any]]:
+    """Lease the oldest pending job, or a running one whose worker stopped renewing its lease"""
+    now = datetime.utcnow()
+    return deletion_jobs_collection.find_one_and_update(
+        {
+            "status": {"$in": ["pending", "running"]},
+            "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}],
+        },
+        {"$set": {
+            "status": "running",
+            "lease_until": now + timedelta(seconds=settings.deletion_lease_seconds),
+            "lease_owner": str(uuid.uuid4()),
+        }},
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def purge_batch(job: Dict[str, Any], collection, field: str) -> int:
+    """Delete up to one batch of a child's documents and renew the job lease; raises LeaseLost
+    once another worker holds the job"""
+    ids = [
+        doc["_id"] for doc in
+        collection.find({field: job["child_id"]}, {"_id": 1}).limit(settings.deletion_batch_size)
+    ]
+    if ids:
+        collection.delete_many({"_id": {"$in": ids}})
+    renewed = deletion_jobs_collection.update_one(
+        {"id": job["id"], "lease_owner": job["lease_owner"]},
+        {
+            "$inc": {f"purged.{collection.name}": len(ids)},
+            "$set": {"lease_until": datetime.utcnow() + timedelta(seconds=settings.deletion_lease_seconds)},
+        },
+    )
+    if renewed.matched_count == 0:
+        raise LeaseLost(job["id"])
+    return len(ids)
+
+
+def finish_job(job: Dict[str, Any]):
+    """Remove the tombstoned profile and mark the job done, if this worker still holds the lease"""
+    if not deletion_jobs_collection.find_one({"id": job["id"], "lease_owner": job["lease_owner"]}, {"_id": 1}):
+        raise LeaseLost(job["id"])
+    children_collection.delete_one({"id": job["child_id"], "deleted_at": {"$ne": None}})
+    finished = deletion_jobs_collection.update_one(
+        {"id": job["id"], "lease_owner": job["lease_owner"]},
+        {"$set": {"status": "done", "completed_at": datetime.utcnow(), "lease_until": None, "lease_owner": None}},
+    )
+    if finished.matched_count == 0:
+        raise LeaseLost(job["id"])
+
+
+def run_next_job() -> bool:
+    """Purge one job's dependents in bounded, throttled batches; purging is idempotent, so jobs resume safely"""
+    job = claim_job()
+    if not job:
+        return False
+    delay = settings.deletion_batch_delay_ms / 1000
+    try:
+        for collection, field in CHILD_DEPENDENTS:
+            while purge_batch(job, collection, field) == settings.deletion_batch_size:
+                time.sleep(delay)
+        finish_job(job)
+    except LeaseLost as e:
+        logger.warning("Lost the lease on deletion job %s; its new holder finishes it", e)
+        return True
+    logger.info("Deleted data for child %s", job["child_id"])
+    return True
+
+
+# A failed job is logged by the loop and retried once its lease expires
+deletion_worker = BackgroundLoop("child-deletion", run_next_job, settings.deletion_poll_seconds)
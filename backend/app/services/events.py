@@ -0,0 +1,120 @@
+"""Append-only progress event log, fed through a per-document outbox.
+
+State changes push compact events onto the progress document's `outbox` array in the
+same single-document write, so an event exists if and only if its change committed.
+The relay copies outbox entries into `progress_events` (idempotently, keyed by
+event_id) and pulls them back off the document. Consumers tail `progress_events` in
+_id order and checkpoint their position, so analytics never read OLTP collections.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import uuid
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.database import (
+    child_is_live, event_checkpoints_collection, progress_collection, progress_events_collection
+)
+from app.services.background import BackgroundLoop
+from app.services.tasks import task
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+def make_event(kind: str, progress: Dict[str, Any], step_id: Optional[str] = None, **data) -> Dict[str, Any]:
+    """A compact event: child, quest, step, kind, timestamp and optional counters"""
+    event = {
+        "event_id": str(uuid.uuid4()),
+        "child_id": progress["child_id"],
+        "quest_id": progress["quest_id"],
+        "step_id": step_id,
+        "kind": kind,
+        "ts": datetime.utcnow(),
+    }
+    event.update(data)
+    return event
+
+
+def outbox_push(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Update fragment that appends events to a progress document's outbox"""
+    return {"$push": {"outbox": {"$each": events}}}
+
+
+@task("events.flush_outbox")
+def flush_outbox(progress_id: str, events: List[Dict[str, Any]]):
+    """Publish outbox events to the log, then drop them from the progress document"""
+    if not events:
+        return
+    # Events of a deleted child are dropped rather than logged after its purge
+    if child_is_live(events[0]["child_id"]):
+        _publish(events)
+    progress_collection.update_one(
+        {"id": progress_id},
+        {"$pull": {"outbox": {"event_id": {"$in": [e["event_id"] for e in events]}}}}
+    )
+
+
+def _publish(events: List[Dict[str, Any]]):
+    try:
+        progress_events_collection.insert_many([dict(e) for e in events], ordered=False)
+    except BulkWriteError as e:
+        # Already-published events are fine; anything else stays in the outbox for the relay
+        if any(err["code"] != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+            raise
+
+
+def relay_pending() -> int:
+    """Flush outboxes left behind by a crash between a write and its flush"""
+    pending = list(progress_collection.find(
+        {"outbox.event_id": {"$exists": True}}, {"id": 1, "outbox": 1}
+    ).limit(settings.event_batch_size))
+    for doc in pending:
+        flush_outbox(doc["id"], doc["outbox"])
+    return len(pending)
+
+
+class EventConsumer:
+    """Tails progress_events in _id order from a persisted checkpoint.
+
+    Events younger than event_settle_seconds are left for the next poll, so outbox
+    entries published slightly out of order are never skipped. Delivery is at least
+    once: a crash after `handler` but before the checkpoint write replays that batch, so
+    handlers must be idempotent.
+    """
+
+    def __init__(self, name: str, handler: Callable[[List[Dict[str, Any]]], None]):
+        self.name = name
+        self.handler = handler
+        self.loop = BackgroundLoop(f"consumer:{name}", self.poll_once, settings.event_poll_seconds)
+
+    def checkpoint(self) -> Optional[ObjectId]:
+        doc = event_checkpoints_collection.find_one({"_id": self.name})
+        return doc["position"] if doc else None
+
+    def poll_once(self) -> int:
+        settled = ObjectId.from_datetime(datetime.utcnow() - timedelta(seconds=settings.event_settle_seconds))
+        position = self.checkpoint()
+        id_range = {"$lt": settled}
+        if position is not None:
+            id_range["$gt"] = position
+        
+        events = list(progress_events_collection.find({"_id": id_range}).sort("_id", 1).limit(settings.event_batch_size))
+        if not events:
+            return 0
+        
+        self.handler(events)
+        event_checkpoints_collection.update_one(
+            {"_id": self.name},
+            {"$set": {"position": events[-1]["_id"], "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return len(events)
+
+
+outbox_relay = BackgroundLoop("outbox-relay", relay_pending, settings.event_poll_seconds)
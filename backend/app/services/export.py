@@ -0,0 +1,93 @@
+"""Streaming export of everything stored about a child, in constant memory"""
+
+import io
+import json
+import zipfile
+from typing import Any, Dict, Iterator, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+from app.database import inventory_collection, progress_collection, skill_mastery_collection
+from app.services import progress_store
+
+# Export sections after the profile, as (name, collection)
+EXPORT_SECTIONS = [
+    ("progress", progress_collection),
+    ("inventory", inventory_collection),
+    ("skill_mastery", skill_mastery_collection),
+]
+
+# Stored forms that are expanded back to their API shape before export
+SECTION_DECODERS = {"progress": progress_store.expand}
+
+# Internal bookkeeping that is not the child's data
+EXCLUDED_FIELDS = {"_id": 0, "outbox": 0}
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(jsonable_encoder(record), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _section(name: str, collection, child_id: str) -> Iterator[Dict[str, Any]]:
+    # Cursor batches bound memory regardless of how long the history is
+    cursor = collection.find({"child_id": child_id}, EXCLUDED_FIELDS).batch_size(settings.export_batch_size)
+    decode = SECTION_DECODERS.get(name)
+    return map(decode, cursor) if decode else cursor
+
+
+def _records(child: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    yield "profile", {k: v for k, v in child.items() if k != "_id"}
+    for name, collection in EXPORT_SECTIONS:
+        for doc in _section(name, collection, child["id"]):
+            yield name, doc
+
+
+def ndjson_stream(child: Dict[str, Any]) -> Iterator[bytes]:
+    """One {"type": ..., "data": ...} object per line"""
+    buffer = []
+    for record_type, doc in _records(child):
+        buffer.append(_line({"type": record_type, "data": doc}))
+        if len(buffer) >= settings.export_batch_size:
+            yield b"".join(buffer)
+            buffer = []
+    if buffer:
+        yield b"".join(buffer)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable file object that hands written bytes back to the response stream"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def zip_stream(child: Dict[str, Any]) -> Iterator[bytes]:
+    """profile.json plus one NDJSON file per section, zipped on the fly"""
+    sink = _ChunkSink()
+    # zipfile falls back to data descriptors on unseekable output, so nothing is buffered whole
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open("profile.json", mode="w") as entry:
+            entry.write(_line({k: v for k, v in child.items() if k != "_id"}))
+        yield sink.drain()
+        
+        for name, collection in EXPORT_SECTIONS:
+            with archive.open(f"{name}.ndjson", mode="w", force_zip64=True) as entry:
+                for count, doc in enumerate(_section(name, collection, child["id"]), start=1):
+                    entry.write(_line(doc))
+                    if count % settings.export_batch_size == 0:
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
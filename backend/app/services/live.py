@@ -0,0 +1,172 @@
+"""Live progress feed: an in-process pub/sub hub fed by local commits and a Mongo-polled bridge.
+
+Progress routes publish their outbox events to the hub as soon as the write commits, so
+subscribers on the same worker see them immediately. The bridge tails `progress_events`
+for the children someone on this worker is watching, which delivers events committed by
+other uvicorn workers; duplicates are dropped by event_id.
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+from app.database import progress_events_collection
+from app.services.background import BackgroundLoop
+
+logger = logging.getLogger(__name__)
+
+# Sent in place of the dropped backlog when a subscriber falls too far behind
+RESYNC = {"kind": "resync"}
+
+
+class Subscription:
+    """One connected client: a bounded queue of events for a fixed set of children"""
+
+    def __init__(self, child_ids: Iterable[str]):
+        self.child_ids = frozenset(child_ids)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.live_queue_size)
+        self.resyncs = 0
+
+    def offer(self, event: Dict[str, Any]):
+        if self.queue.full():
+            # Slow consumer: drop its backlog rather than buffer without bound or block publishers;
+            # the client re-reads current state when it sees the resync
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.resyncs += 1
+            return
+        self.queue.put_nowait(event)
+
+
+class LiveHub:
+    """Routes events to subscriptions by child_id; publish is safe to call from any thread"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+
+    def subscribe(self, child_ids: Iterable[str]) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(child_ids)
+        for child_id in subscription.child_ids:
+            self._subscribers.setdefault(child_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for child_id in subscription.child_ids:
+            subscribers = self._subscribers.get(child_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[child_id]
+
+    def watched_children(self) -> List[str]:
+        return list(self._subscribers)
+
+    def publish(self, events: List[Dict[str, Any]]):
+        if not events or not self._subscribers:
+            return
+        try:
+            running_here = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            running_here = False
+        if running_here:
+            self._deliver(events)
+        elif self._loop is not None:
+            self._loop.call_soon_threadsafe(self._deliver, events)
+
+    def _deliver(self, events: List[Dict[str, Any]]):
+        for event in events:
+            if event["event_id"] in self._recent:
+                continue
+            self._recent[event["event_id"]] = None
+            if len(self._recent) > settings.live_dedupe_size:
+                self._recent.popitem(last=False)
+            
+            event = {k: v for k, v in event.items() if k != "_id"}
+            for subscription in self._subscribers.get(event["child_id"], ()):
+                subscription.offer(event)
+            self.published += 1
+
+    def stats(self) -> Dict[str, int]:
+        subscriptions = set().union(*self._subscribers.values()) if self._subscribers else set()
+        return {
+            "subscribers": len(subscriptions),
+            "watched_children": len(self._subscribers),
+            "published": self.published,
+        }
+
+
+live_hub = LiveHub()
+
+
+class LiveBridge:
+    """Polls progress_events for watched children so events from other workers reach this hub.
+
+    Each poll re-reads a short lookback window, because events from different workers can
+    land slightly out of _id order; the hub's event_id dedupe makes the overlap harmless.
+    """
+
+    def __init__(self, hub: LiveHub):
+        self.hub = hub
+        self.position: Optional[ObjectId] = None
+        self.loop = BackgroundLoop("live-bridge", self.poll_once, settings.live_poll_seconds)
+
+    def poll_once(self) -> int:
+        child_ids = self.hub.watched_children()
+        if not child_ids:
+            self.position = None
+            return 0
+        if self.position is None:
+            self.position = ObjectId.from_datetime(datetime.utcnow())
+        
+        since = ObjectId.from_datetime(
+            self.position.generation_time - timedelta(seconds=settings.live_lookback_seconds)
+        )
+        events = list(progress_events_collection.find(
+            {"_id": {"$gt": since}, "child_id": {"$in": child_ids}}
+        ).sort("_id", 1))
+        if events:
+            self.position = max(self.position, events[-1]["_id"])
+            self.hub.publish(events)
+        # Always wait for the next interval; the lookback window would otherwise be re-read in a tight loop
+        return 0
+
+
+live_bridge = LiveBridge(live_hub)
+
+
+def _frame(event: Dict[str, Any]) -> str:
+    lines = []
+    if "event_id" in event:
+        lines.append(f"id: {event['event_id']}")
+    lines.append(f"event: {event['kind']}")
+    lines.append(f"data: {json.dumps(jsonable_encoder(event))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(child_ids: Iterable[str]) -> AsyncIterator[str]:
+    """Server-sent events for the given children, with a comment heartbeat while idle"""
+    subscription = live_hub.subscribe(child_ids)
+    try:
+        yield f"retry: {settings.live_retry_ms}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=settings.live_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing idle connections and surfaces dead clients
+                yield ": heartbeat\n\n"
+                continue
+            yield _frame(event)
+    finally:
+        live_hub.unsubscribe(subscription)
@@ -0,0 +1,96 @@
+"""Incremental skill mastery, maintained as progress events arrive"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.database import child_is_live, quest_steps_collection, skill_mastery_collection
+from app.services.tasks import task
+
+# Minimum total XP for mastery levels 2-5 (level 1 starts at 0 XP)
+MASTERY_XP_THRESHOLDS = [50, 150, 300, 600]
+
+# Config key that names the skill practiced by each step type
+SKILL_CONFIG_KEYS = {
+    "math_puzzle": "puzzle_type",
+    "code_puzzle": "puzzle_type",
+    "science_sim": "sim_type",
+}
+
+
+def skill_for_step(subject: str, step: Dict[str, Any]) -> Optional[str]:
+    """Return the skill a step practices, e.g. "math.counting" (None for story steps)"""
+    key = SKILL_CONFIG_KEYS.get(step.get("step_type"))
+    if not key:
+        return None
+    kind = (step.get("config") or {}).get(key)
+    return f"{subject}.{kind}" if kind else subject
+
+
+def skills_for_quest(quest: Dict[str, Any], steps: Iterable[Dict[str, Any]]) -> List[str]:
+    """Distinct skills practiced by a quest, falling back to its subject"""
+    skills = []
+    for step in steps:
+        skill = skill_for_step(quest["subject"], step)
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills or [quest["subject"]]
+
+
+def _mastery_update(subject: str, xp: int, quests: int, practiced_at: datetime) -> List[Dict[str, Any]]:
+    """Pipeline update that accumulates counters and derives mastery_level in one write"""
+    level_branches = [
+        {"case": {"$gte": ["$total_xp", threshold]}, "then": level}
+        for level, threshold in reversed(list(enumerate(MASTERY_XP_THRESHOLDS, start=2)))
+    ]
+    return [
+        {"$set": {
+            "subject": subject,
+            "total_xp": {"$add": [{"$ifNull": ["$total_xp", 0]}, xp]},
+            "quests_completed": {"$add": [{"$ifNull": ["$quests_completed", 0]}, quests]},
+            "last_practiced": practiced_at,
+        }},
+        {"$set": {"mastery_level": {"$switch": {"branches": level_branches, "default": 1}}}},
+    ]
+
+
+def _apply(child_id: str, subject: str, deltas: Dict[str, Tuple[int, int]]):
+    # A deleted child's rows may already be purged; writing now would recreate them
+    if not deltas or not child_is_live(child_id):
+        return
+    now = datetime.utcnow()
+    skill_mastery_collection.bulk_write([
+        UpdateOne(
+            {"child_id": child_id, "skill_name": skill_name},
+            _mastery_update(subject, xp, quests, now),
+            upsert=True,
+        )
+        for skill_name, (xp, quests) in deltas.items()
+    ], ordered=False)
+
+
+@task("mastery.record_step_activity")
+def record_step_activity(child_id: str, quest: Dict[str, Any], activity: Iterable[Tuple[Dict[str, Any], bool]]):
+    """Credit practiced skills for (step, completed) pairs; completed steps add their XP"""
+    deltas: Dict[str, Tuple[int, int]] = {}
+    for step, completed in activity:
+        skill = skill_for_step(quest["subject"], step)
+        if not skill:
+            continue
+        xp, quests = deltas.get(skill, (0, 0))
+        deltas[skill] = (xp + (step.get("xp_reward", 0) if completed else 0), quests)
+    _apply(child_id, quest["subject"], deltas)
+
+
+@task("mastery.record_quest_completion")
+def record_quest_completion(child_id: str, quest: Dict[str, Any]):
+    """Count a completed quest once for every skill it practices"""
+    steps = quest_steps_collection.find({"quest_id": quest["id"]}, {"step_type": 1, "config": 1})
+    deltas = {skill: (0, 1) for skill in skills_for_quest(quest, steps)}
+    _apply(child_id, quest["subject"], deltas)
+
+
+def get_mastery_grid(child_id: str) -> List[Dict[str, Any]]:
+    """A child's mastery rows, served by the (child_id, skill_name) index"""
+    return list(skill_mastery_collection.find({"child_id": child_id}).sort("skill_name", 1))
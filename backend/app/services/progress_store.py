@@ -0,0 +1,98 @@
+"""Storage form of progress documents: compact on write when enabled, always expanded on read.
+
+Compact documents name the step id list they were encoded against by version. Every list
+used for encoding is recorded in step_id_lists, so a document written before an admin
+replaced the quest's steps still decodes against the steps it was written for.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.database import quest_steps_collection, step_id_lists_collection
+from app.models.progress import (
+    COMPACT_STEPS_FIELD, compact_progress_document, encode_steps_progress, expand_progress_document,
+    step_ids_version
+)
+from app.services.catalog import quest_catalog
+
+logger = logging.getLogger(__name__)
+
+# Projection for readers that never look at per-step state, whichever form it is stored in
+WITHOUT_STEPS = {"steps_progress": 0, COMPACT_STEPS_FIELD: 0}
+
+# version -> step ids; lists never change once recorded
+_step_id_lists: Dict[str, List[str]] = {}
+
+
+def step_ids(quest_id: str) -> List[str]:
+    """Ordered step ids of a quest; inactive quests are not in the catalog and are read directly"""
+    quest = quest_catalog.snapshot().quests.get(quest_id)
+    if quest is not None:
+        return [step["id"] for step in quest["steps"]]
+    return [step["id"] for step in quest_steps_collection.find({"quest_id": quest_id}, {"id": 1}).sort("step_order", 1)]
+
+
+def record_step_ids(quest_id: str, ids: List[str]) -> None:
+    """Remember the step id list compact documents are about to be encoded against"""
+    version = step_ids_version(ids)
+    if version in _step_id_lists:
+        return
+    step_id_lists_collection.update_one(
+        {"_id": version},
+        {"$setOnInsert": {"quest_id": quest_id, "step_ids": ids, "created_at": datetime.utcnow()}},
+        upsert=True
+    )
+    _step_id_lists[version] = list(ids)
+
+
+def encoded_step_ids(doc: Dict[str, Any]) -> List[str]:
+    """Step ids a compact document was encoded against"""
+    current = step_ids(doc["quest_id"])
+    version = doc[COMPACT_STEPS_FIELD].get("v")
+    # Documents compacted before versions were stored predate step replacement tracking
+    if version is None or version == step_ids_version(current):
+        return current
+    if version not in _step_id_lists:
+        recorded = step_id_lists_collection.find_one({"_id": version})
+        if recorded is None:
+            logger.error("Progress %s was encoded against unknown step list %s", doc.get("id"), version)
+            return current
+        _step_id_lists[version] = recorded["step_ids"]
+    return _step_id_lists[version]
+
+
+def expand(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if doc is None or COMPACT_STEPS_FIELD not in doc:
+        return doc
+    return expand_progress_document(doc, encoded_step_ids(doc))
+
+
+def compact(doc: Dict[str, Any], ids: List[str]) -> Optional[Dict[str, Any]]:
+    """Compact form of a full progress document, or None if it cannot be compacted"""
+    result = compact_progress_document(doc, ids)
+    if result is not None:
+        record_step_ids(doc["quest_id"], ids)
+    return result
+
+
+def storage_form(doc: Dict[str, Any], ids: List[str]) -> Dict[str, Any]:
+    """Document to insert for a new progress record"""
+    if settings.compact_progress:
+        return compact(doc, ids) or doc
+    return doc
+
+
+def steps_update(quest_id: str, steps_progress: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """$set/$unset fields replacing a record's per-step state, converting it to the configured form.
+
+    Progress that references steps the quest no longer has stays in the full form.
+    """
+    if settings.compact_progress:
+        ids = step_ids(quest_id)
+        encoded = encode_steps_progress(steps_progress, ids)
+        if encoded is not None:
+            record_step_ids(quest_id, ids)
+            return {"$set": {COMPACT_STEPS_FIELD: encoded}, "$unset": {"steps_progress": ""}}
+    return {"$set": {"steps_progress": steps_progress}, "$unset": {COMPACT_STEPS_FIELD: ""}}
@@ -0,0 +1,132 @@
+"""Next-quest ranking over the cached catalog and a cached per-child activity summary"""
+
+import time
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.database import LIVE_CHILD, children_collection, progress_collection
+from app.services.catalog import QuestCatalogSnapshot
+
+RECENT_COMPLETIONS = 3
+
+# Score weights; each component is normalised to 0..1
+SUBJECT_BALANCE_WEIGHT = 1.0
+DIFFICULTY_FIT_WEIGHT = 1.0
+RECENT_SUBJECT_PENALTY = 0.5
+IN_PROGRESS_BONUS = 0.75
+
+
+class ChildActivity:
+    __slots__ = ("level", "age_band", "completed", "started", "subject_counts", "recent_subjects", "expires_at")
+
+    def __init__(self, level: int, age_band: Optional[str]):
+        self.level = level
+        self.age_band = age_band
+        self.completed = set()
+        self.started = set()
+        self.subject_counts: Counter = Counter()
+        self.recent_subjects: deque = deque(maxlen=RECENT_COMPLETIONS)
+        self.expires_at = time.monotonic() + settings.recommendation_cache_ttl_seconds
+
+
+class ChildActivityCache:
+    """Completion sets per child, loaded once and kept current by write-through from progress routes"""
+
+    def __init__(self):
+        self._entries: Dict[str, ChildActivity] = {}
+
+    def get(self, child_id: str, catalog: QuestCatalogSnapshot) -> Optional[ChildActivity]:
+        entry = self._entries.get(child_id)
+        if entry and entry.expires_at > time.monotonic():
+            return entry
+        
+        child = children_collection.find_one({"id": child_id, **LIVE_CHILD}, {"_id": 0, "level": 1, "age_band": 1})
+        if not child:
+            self._entries.pop(child_id, None)
+            return None
+        entry = ChildActivity(child.get("level", 1), child.get("age_band"))
+        history = progress_collection.find(
+            {"child_id": child_id}, {"_id": 0, "quest_id": 1, "completed_at": 1}
+        ).sort("completed_at", 1)
+        for progress in history:
+            if progress.get("completed_at"):
+                self._complete(entry, progress["quest_id"], catalog.quests.get(progress["quest_id"], {}).get("subject"))
+            else:
+                entry.started.add(progress["quest_id"])
+        
+        if len(self._entries) >= settings.recommendation_cache_size:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[child_id] = entry
+        return entry
+
+    @staticmethod
+    def _complete(entry: ChildActivity, quest_id: str, subject: Optional[str]):
+        entry.started.discard(quest_id)
+        if quest_id in entry.completed:
+            return
+        entry.completed.add(quest_id)
+        if subject:
+            entry.subject_counts[subject] += 1
+            entry.recent_subjects.append(subject)
+
+    def record_start(self, child_id: str, quest_id: str):
+        entry = self._entries.get(child_id)
+        if entry and quest_id not in entry.completed:
+            entry.started.add(quest_id)
+
+    def record_completion(self, child_id: str, quest_id: str, subject: str, level: int):
+        entry = self._entries.get(child_id)
+        if entry:
+            self._complete(entry, quest_id, subject)
+            entry.level = max(entry.level, level)
+
+    def invalidate(self, child_id: str):
+        self._entries.pop(child_id, None)
+
+
+child_activity_cache = ChildActivityCache()
+
+
+def target_difficulty(level: int) -> int:
+    """Difficulty rank a child of this level should mostly be playing"""
+    if level <= 2:
+        return 0
+    if level <= 5:
+        return 1
+    return 2
+
+
+def rank_quests(catalog: QuestCatalogSnapshot, activity: ChildActivity, limit: int) -> List[Dict[str, Any]]:
+    """Score unlocked, uncompleted quests in memory; no database access"""
+    target = target_difficulty(activity.level)
+    most_completed = max(activity.subject_counts.values(), default=0)
+    recent = Counter(activity.recent_subjects)
+    
+    ranked = []
+    for quest_id, features in catalog.features.items():
+        if quest_id in activity.completed or not features["prerequisites"] <= activity.completed:
+            continue
+        if activity.age_band and features["age_range"] and activity.age_band not in features["age_range"]:
+            continue
+        
+        reasons = []
+        balance = 1 - activity.subject_counts[features["subject"]] / (most_completed + 1)
+        fit = 1 - abs(features["difficulty_rank"] - target) / 2
+        score = SUBJECT_BALANCE_WEIGHT * balance + DIFFICULTY_FIT_WEIGHT * fit
+        if balance > 0.5:
+            reasons.append(f"Try more {features['subject']}")
+        if fit == 1:
+            reasons.append("Right difficulty for your level")
+        if recent[features["subject"]]:
+            score -= RECENT_SUBJECT_PENALTY * recent[features["subject"]] / RECENT_COMPLETIONS
+        if quest_id in activity.started:
+            score += IN_PROGRESS_BONUS
+            reasons.append("Pick up where you left off")
+        ranked.append((score, quest_id, reasons))
+    
+    ranked.sort(key=lambda r: (-r[0], r[1]))
+    return [
+        {"quest": catalog.quests[quest_id], "score": round(score, 4), "reasons": reasons}
+        for score, quest_id, reasons in ranked[:limit]
+    ]
@@ -0,0 +1,33 @@
+"""Reward side effects that can run after the ceremony response"""
+
+from datetime import datetime
+import uuid
+
+from app.database import LIVE_CHILD, child_is_live, children_collection, inventory_collection
+from app.services.tasks import task
+
+
+@task("rewards.grant_badge")
+def grant_badge(child_id: str, badge_id: str):
+    """Add a badge to the inventory once, even if several quests award it"""
+    if not child_is_live(child_id):
+        return
+    inventory_item = {
+        "id": str(uuid.uuid4()),
+        "child_id": child_id,
+        "item_type": "badge",
+        "item_id": badge_id,
+        "earned_at": datetime.utcnow(),
+        "is_equipped": False
+    }
+    inventory_collection.update_one(
+        {"child_id": child_id, "item_type": "badge", "item_id": badge_id},
+        {"$setOnInsert": inventory_item},
+        upsert=True
+    )
+
+
+@task("rewards.sync_level")
+def sync_level(child_id: str, level: int):
+    # $max keeps the level monotonic if completions race
+    children_collection.update_one({"id": child_id, **LIVE_CHILD}, {"$max": {"level": level}})
@@ -0,0 +1,188 @@
+"""Incremental per-quest and per-step rollups built from the progress event log"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.database import quest_stats_collection
+from app.services.events import DUPLICATE_KEY, EventConsumer
+
+GRANULARITIES = {
+    "hour": lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    "day": lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0),
+}
+
+def _counters(event: Dict[str, Any]) -> List[Tuple[Optional[str], Dict[str, int]]]:
+    """(step_id, counters) pairs an event bumps; step_id None is the quest-level row"""
+    kind = event["kind"]
+    step_id = event.get("step_id")
+    if kind == "quest_started":
+        return [(None, {"started": 1})]
+    if kind == "quest_completed":
+        attempts = event.get("attempts", 0)
+        return [(None, {
+            "completed": 1,
+            f"attempts_hist.{attempts}": 1,
+            "completed_with_hints": 1 if event.get("hints", 0) > 0 else 0,
+        })]
+    if kind == "step_attempted":
+        return [(step_id, {"attempts": 1})]
+    if kind == "step_completed":
+        return [(step_id, {"completed": 1})]
+    if kind == "hint_used":
+        count = event.get("count", 1)
+        return [(None, {"hints": count})] + ([(step_id, {"hints": count})] if step_id else [])
+    return []
+
+
+def _applied_through(keys: Iterable[tuple]) -> Dict[tuple, Any]:
+    """Last event _id already folded into each existing bucket row"""
+    keys = list(keys)
+    rows = quest_stats_collection.find(
+        {"quest_id": {"$in": list({k[0] for k in keys})}, "bucket": {"$in": list({k[3] for k in keys})}},
+        {"_id": 0, "quest_id": 1, "step_id": 1, "granularity": 1, "bucket": 1, "applied_through": 1}
+    )
+    return {
+        (row["quest_id"], row["step_id"], row["granularity"], row["bucket"]): row.get("applied_through")
+        for row in rows
+    }
+
+
+def apply_events(events: Iterable[Dict[str, Any]]):
+    """Fold a batch of events into hourly and daily quest_stats documents with one bulk write.
+
+    Each row records the last event _id folded into it (`applied_through`) in the same update
+    as its counters, so a batch replayed after a crash skips events a row already counted.
+    """
+    events = list(events)
+    contributions = []
+    step_orders: Dict[str, int] = {}
+    for event in events:
+        if event.get("step_id") and event.get("step_order") is not None:
+            step_orders[event["step_id"]] = event["step_order"]
+        for step_id, counters in _counters(event):
+            for granularity, truncate in GRANULARITIES.items():
+                key = (event["quest_id"], step_id, granularity, truncate(event["ts"]))
+                contributions.append((key, event["_id"], counters))
+    if not contributions:
+        return
+    
+    applied = _applied_through(key for key, _, _ in contributions)
+    increments: Dict[tuple, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    last_event: Dict[tuple, Any] = {}
+    for key, event_id, counters in contributions:
+        if applied.get(key) is not None and event_id <= applied[key]:
+            continue
+        last_event[key] = max(event_id, last_event.get(key, event_id))
+        for field, value in counters.items():
+            if value:
+                increments[key][field] += value
+    
+    if not last_event:
+        return
+    now = datetime.utcnow()
+    operations = []
+    for key, event_id in last_event.items():
+        quest_id, step_id, granularity, bucket = key
+        fields = {"updated_at": now, "applied_through": event_id}
+        if step_id in step_orders:
+            fields["step_order"] = step_orders[step_id]
+        update = {"$set": fields}
+        if increments[key]:
+            update["$inc"] = dict(increments[key])
+        operations.append(UpdateOne(
+            # Matches only if no other consumer has moved the row on since it was read
+            {"quest_id": quest_id, "step_id": step_id, "granularity": granularity, "bucket": bucket,
+             "applied_through": applied.get(key)},
+            update,
+            upsert=True
+        ))
+    try:
+        quest_stats_collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # A row another consumer moved on fails its upsert on the unique key; it folded the same batch
+        if any(err["code"] != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+            raise
+
+
+quest_stats_consumer = EventConsumer("quest_stats", apply_events)
+
+
+def _median(histogram: Dict[int, int]) -> Optional[float]:
+    total = sum(histogram.values())
+    if not total:
+        return None
+    ordered = sorted(histogram.items())
+    
+    def nth(n):
+        seen = 0
+        for value, count in ordered:
+            seen += count
+            if seen > n:
+                return value
+    
+    if total % 2:
+        return float(nth(total // 2))
+    return (nth(total // 2 - 1) + nth(total // 2)) / 2
+
+
+def _summarize(quest_id: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    totals: Dict[str, int] = defaultdict(int)
+    histogram: Dict[int, int] = defaultdict(int)
+    steps: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        if row["step_id"] is None:
+            for field in ("started", "completed", "hints", "completed_with_hints"):
+                totals[field] += row.get(field, 0)
+            for attempts, count in row.get("attempts_hist", {}).items():
+                histogram[int(attempts)] += count
+        else:
+            step = steps.setdefault(row["step_id"], {
+                "step_id": row["step_id"], "step_order": row.get("step_order"),
+                "attempts": 0, "completed": 0, "hints": 0, "dropped": 0,
+            })
+            for field in ("attempts", "completed", "hints"):
+                step[field] += row.get(field, 0)
+    
+    # Funnel: every step is reached by those who completed the previous one
+    ordered_steps = sorted(steps.values(), key=lambda s: (s["step_order"] is None, s["step_order"] or 0))
+    reached = totals["started"]
+    for step in ordered_steps:
+        step["dropped"] = max(0, reached - step["completed"])
+        reached = step["completed"]
+    drop_off = max(ordered_steps, key=lambda s: s["dropped"], default=None)
+    
+    return {
+        "quest_id": quest_id,
+        "started": totals["started"],
+        "completed": totals["completed"],
+        "completion_rate": totals["completed"] / totals["started"] if totals["started"] else 0.0,
+        "median_attempts": _median(histogram),
+        "hints": totals["hints"],
+        "hint_rate": totals["completed_with_hints"] / totals["completed"] if totals["completed"] else 0.0,
+        "drop_off_step": drop_off if drop_off and drop_off["dropped"] else None,
+        "steps": ordered_steps,
+    }
+
+
+def quest_summaries(granularity: str, since: datetime) -> List[Dict[str, Any]]:
+    rows_by_quest: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in quest_stats_collection.find({"granularity": granularity, "bucket": {"$gte": since}}):
+        rows_by_quest[row["quest_id"]].append(row)
+    return [_summarize(quest_id, rows) for quest_id, rows in rows_by_quest.items()]
+
+
+def quest_detail(quest_id: str, granularity: str, since: datetime) -> Dict[str, Any]:
+    rows = list(quest_stats_collection.find(
+        {"quest_id": quest_id, "granularity": granularity, "bucket": {"$gte": since}}
+    ).sort("bucket", 1))
+    detail = _summarize(quest_id, rows)
+    detail["series"] = [
+        {"bucket": row["bucket"], "started": row.get("started", 0),
+         "completed": row.get("completed", 0), "hints": row.get("hints", 0)}
+        for row in rows if row["step_id"] is None
+    ]
+    return detail
@@ -0,0 +1,202 @@
+"""Full-text quest search over an in-process inverted index of the quest catalog.
+
+One document per quest: its title, description and its steps' titles and dialogue-like
+config text, with per-field weights. Ranking is BM25 over the weighted term frequencies;
+every query token also matches vocabulary terms it is a prefix of, at a reduced weight.
+The index follows the QuestCatalog version and re-tokenizes only quests whose text changed.
+"""
+
+import hashlib
+import heapq
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+from app.services.catalog import QuestCatalogSnapshot, quest_catalog
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("a an and are can do does for help i in is it me my of on the to what you".split())
+
+FIELD_WEIGHTS = {"title": 3.0, "description": 1.0, "step_title": 2.0, "step_text": 1.0}
+
+# Free-text step config keys; answers and solutions are never indexed
+SEARCHABLE_CONFIG_KEYS = ("dialogue", "question", "message", "character", "item")
+
+K1 = 1.2
+B = 0.75
+PREFIX_WEIGHT = 0.5
+MAX_PREFIX_EXPANSIONS = 50
+# Terms are scored over their highest-impact postings only; exact for single-term queries
+MAX_POSTINGS_PER_TERM = 1000
+# Impacts are normalised by a frozen average document length, recomputed when it drifts this far
+AVERAGE_LENGTH_DRIFT = 0.1
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _step_text(step: Dict[str, Any]) -> str:
+    config = step.get("config") or {}
+    return " ".join(str(config[key]) for key in SEARCHABLE_CONFIG_KEYS if isinstance(config.get(key), str))
+
+
+def _signature(quest: Dict[str, Any]) -> str:
+    parts = [quest["title"], quest["description"]]
+    for step in quest.get("steps", []):
+        parts += [step["id"], step["title"], _step_text(step)]
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class QuestSearchIndex:
+    """Postings hold precomputed BM25 term impacts, so a query only sums idf-weighted impacts"""
+
+    def __init__(self):
+        self.version = None
+        self._signatures: Dict[str, str] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, float] = {}
+        self._step_terms: Dict[str, List[Tuple[str, FrozenSet[str]]]] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._ranked: Dict[str, List[Tuple[float, str]]] = {}
+        self._total_length = 0.0
+        self._average_length = 0.0
+        self._vocabulary: List[str] = []
+
+    def _impact(self, tf: float, length: float) -> float:
+        return tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / (self._average_length or length or 1.0)))
+
+    def _add(self, quest: Dict[str, Any]):
+        terms: Counter = Counter()
+        for token in tokenize(quest["title"]):
+            terms[token] += FIELD_WEIGHTS["title"]
+        for token in tokenize(quest["description"]):
+            terms[token] += FIELD_WEIGHTS["description"]
+        steps = []
+        for step in quest.get("steps", []):
+            title_tokens = tokenize(step["title"])
+            text_tokens = tokenize(_step_text(step))
+            for token in title_tokens:
+                terms[token] += FIELD_WEIGHTS["step_title"]
+            for token in text_tokens:
+                terms[token] += FIELD_WEIGHTS["step_text"]
+            steps.append((step["id"], frozenset(title_tokens + text_tokens)))
+        
+        quest_id = quest["id"]
+        length = sum(terms.values())
+        self._doc_terms[quest_id] = terms
+        self._step_terms[quest_id] = steps
+        self._lengths[quest_id] = length
+        self._total_length += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[quest_id] = self._impact(tf, length)
+            self._ranked.pop(term, None)
+
+    def _remove(self, quest_id: str):
+        terms = self._doc_terms.pop(quest_id)
+        self._step_terms.pop(quest_id)
+        self._total_length -= self._lengths.pop(quest_id)
+        for term in terms:
+            posting = self._postings[term]
+            del posting[quest_id]
+            self._ranked.pop(term, None)
+            if not posting:
+                del self._postings[term]
+
+    def _reweight(self):
+        """Recompute every impact against the current average document length"""
+        self._average_length = self._total_length / len(self._lengths)
+        for quest_id, terms in self._doc_terms.items():
+            length = self._lengths[quest_id]
+            for term, tf in terms.items():
+                self._postings[term][quest_id] = self._impact(tf, length)
+        self._ranked = {}
+
+    def sync(self, catalog: QuestCatalogSnapshot) -> int:
+        """Bring the index up to a catalog snapshot; returns how many quests were re-indexed"""
+        if catalog.version == self.version:
+            return 0
+        changed = 0
+        for quest_id in list(self._signatures):
+            if quest_id not in catalog.quests:
+                self._remove(quest_id)
+                del self._signatures[quest_id]
+                changed += 1
+        for quest_id, quest in catalog.quests.items():
+            signature = _signature(quest)
+            if self._signatures.get(quest_id) == signature:
+                continue
+            if quest_id in self._signatures:
+                self._remove(quest_id)
+            self._add(quest)
+            self._signatures[quest_id] = signature
+            changed += 1
+        
+        if changed:
+            self._vocabulary = sorted(self._postings)
+            if self._lengths:
+                average = self._total_length / len(self._lengths)
+                if not self._average_length or abs(average - self._average_length) > AVERAGE_LENGTH_DRIFT * self._average_length:
+                    self._reweight()
+        self.version = catalog.version
+        return changed
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """The token itself plus vocabulary terms it prefixes, with their weights"""
+        expansions = [(token, 1.0)] if token in self._postings else []
+        i = bisect_left(self._vocabulary, token)
+        while i < len(self._vocabulary) and len(expansions) < MAX_PREFIX_EXPANSIONS:
+            term = self._vocabulary[i]
+            if not term.startswith(token):
+                break
+            if term != token:
+                expansions.append((term, PREFIX_WEIGHT))
+            i += 1
+        return expansions
+
+    def _top_postings(self, term: str) -> List[Tuple[float, str]]:
+        ranked = self._ranked.get(term)
+        if ranked is None:
+            ranked = heapq.nlargest(
+                MAX_POSTINGS_PER_TERM, ((impact, quest_id) for quest_id, impact in self._postings[term].items())
+            )
+            self._ranked[term] = ranked
+        return ranked
+
+    def search(self, query: str, limit: int) -> List[Tuple[str, float, List[str]]]:
+        """(quest_id, score, matching step ids) for the best matches"""
+        count = len(self._doc_terms)
+        if not count:
+            return []
+        scores: Dict[str, float] = {}
+        matched: Dict[str, set] = {}
+        
+        for token in dict.fromkeys(tokenize(query)):
+            for term, weight in self._expand(token):
+                df = len(self._postings[term])
+                term_weight = weight * math.log(1 + (count - df + 0.5) / (df + 0.5))
+                for impact, quest_id in self._top_postings(term):
+                    scores[quest_id] = scores.get(quest_id, 0.0) + term_weight * impact
+                    matched.setdefault(quest_id, set()).add(term)
+        
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return [
+            (quest_id, score, [
+                step_id for step_id, terms in self._step_terms[quest_id] if terms & matched[quest_id]
+            ])
+            for quest_id, score in top
+        ]
+
+
+quest_search_index = QuestSearchIndex()
+
+
+def search_quests(query: str, limit: int) -> List[Dict[str, Any]]:
+    catalog = quest_catalog.snapshot()
+    quest_search_index.sync(catalog)
+    return [
+        {"quest": catalog.quests[quest_id], "score": score, "matched_step_ids": step_ids}
+        for quest_id, score, step_ids in quest_search_index.search(query, limit)
+    ]
@@ -0,0 +1,203 @@
+"""Declarative catalog seeding: sync documents by natural key and stored content.
+
+Seeded quests, steps, cosmetics and badges carry a stable `seed_key`. Their ids are taken
+from the document already stored under that key, so reseeding never changes the ids that
+progress, inventory and prerequisites reference. Documents that are new get an id derived
+from the key. Each collection is read once, and each declared document is compared with
+the fields actually stored for it. Only new, changed and removed documents are written, in
+one bulk_write per collection, so a reseed with no changes is a read pass and no writes.
+
+The declared catalog wins: admin edits to a seeded quest, step, cosmetic or badge are
+overwritten on the next reseed, and steps an admin added to a seeded quest are removed.
+Fields the declaration does not mention are left alone.
+
+Documents seeded before keys existed, or steps re-created by the admin API without keys,
+are adopted by a legacy match (quest title, step position, cosmetic name), which keeps
+their ids.
+"""
+
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pymongo import DeleteOne, UpdateOne
+
+from app.database import badges_collection, cosmetics_collection, quest_steps_collection, quests_collection
+from app.models.step_configs import normalize_step_config
+
+KEY_FIELD = "seed_key"
+
+# Ids of seeded documents are uuid5s of their key in this namespace
+SEED_NAMESPACE = uuid.UUID("5f0e8c4a-7d1b-4c36-9a52-2b8e6f3d1c07")
+
+
+def seed_id(kind: str, key: str) -> str:
+    return str(uuid.uuid5(SEED_NAMESPACE, f"{kind}:{key}"))
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def matches_stored(doc: Dict[str, Any], stored: Dict[str, Any]) -> bool:
+    """Whether every declared field (other than the id) is stored with the declared value"""
+    return all(
+        k in stored and _canonical(stored[k]) == _canonical(v)
+        for k, v in doc.items() if k != "id"
+    )
+
+
+class SyncResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.inserted = self.updated = self.deleted = self.unchanged = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+    def __str__(self) -> str:
+        return (f"{self.name}: {self.inserted} inserted, {self.updated} updated, "
+                f"{self.deleted} deleted, {self.unchanged} unchanged")
+
+
+def sync(
+    collection, name: str, docs: List[Dict[str, Any]], existing: Dict[str, Dict[str, Any]],
+    stale_ids: Iterable[str] = (), on_insert: Optional[Dict[str, Any]] = None
+) -> SyncResult:
+    """Write the declared docs that differ from `existing` (seed_key -> stored document)
+    and delete `stale_ids`, in one unordered bulk_write"""
+    result = SyncResult(name)
+    ops = []
+    for doc in docs:
+        stored = existing.get(doc[KEY_FIELD])
+        if stored is not None and matches_stored(doc, stored):
+            result.unchanged += 1
+            continue
+        fields = {k: v for k, v in doc.items() if k != "id"}
+        if stored is not None:
+            ops.append(UpdateOne({"id": stored["id"]}, {"$set": fields}))
+            result.updated += 1
+        else:
+            ops.append(UpdateOne(
+                {"id": doc["id"]}, {"$set": fields, "$setOnInsert": dict(on_insert or {})}, upsert=True
+            ))
+            result.inserted += 1
+    for stale_id in stale_ids:
+        ops.append(DeleteOne({"id": stale_id}))
+        result.deleted += 1
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+    return result
+
+
+def _existing_by_key(
+    stored: Iterable[Dict[str, Any]], legacy_key: Callable[[Dict[str, Any]], Optional[str]]
+) -> Dict[str, Dict[str, Any]]:
+    """seed_key -> stored document; keyed documents win over legacy matches for the same key"""
+    keyed: Dict[str, Dict[str, Any]] = {}
+    legacy: Dict[str, Dict[str, Any]] = {}
+    for doc in stored:
+        if doc.get(KEY_FIELD):
+            keyed[doc[KEY_FIELD]] = doc
+        else:
+            key = legacy_key(doc)
+            if key is not None:
+                legacy.setdefault(key, doc)
+    return {**legacy, **keyed}
+
+
+def _resolve_id(existing: Dict[str, Dict[str, Any]], kind: str, key: str) -> str:
+    stored = existing.get(key)
+    return stored["id"] if stored is not None else seed_id(kind, key)
+
+
+def seed_quests(quests: List[Dict[str, Any]], admin_id: str) -> List[SyncResult]:
+    """Sync declared quests and their steps; steps no longer declared are deleted"""
+    key_by_title = {quest["title"]: quest["key"] for quest in quests}
+    existing_quests = _existing_by_key(
+        quests_collection.find(
+            {"$or": [
+                {KEY_FIELD: {"$in": list(key_by_title.values())}},
+                {KEY_FIELD: {"$exists": False}, "title": {"$in": list(key_by_title)}},
+            ]},
+            {"_id": 0}
+        ),
+        lambda doc: key_by_title.get(doc["title"])
+    )
+    quest_ids = {quest["key"]: _resolve_id(existing_quests, "quest", quest["key"]) for quest in quests}
+
+    quest_docs, step_docs = [], []
+    step_key_by_position = {}
+    for quest in quests:
+        quest_id = quest_ids[quest["key"]]
+        quest_docs.append({
+            **{k: v for k, v in quest.items() if k not in ("key", "steps")},
+            "id": quest_id,
+            KEY_FIELD: quest["key"],
+            "prerequisites": [quest_ids[key] for key in quest.get("prerequisites", [])],
+            "is_active": True,
+        })
+        for order, step in enumerate(quest["steps"], start=1):
+            step_key = f"{quest['key']}/{step['key']}"
+            step_key_by_position[(quest_id, order)] = step_key
+            step_docs.append({
+                **{k: v for k, v in step.items() if k != "key"},
+                "id": seed_id("step", step_key),
+                KEY_FIELD: step_key,
+                "quest_id": quest_id,
+                "step_order": order,
+                "config": normalize_step_config(step["step_type"], step["config"]),
+            })
+
+    stored_steps = list(quest_steps_collection.find(
+        {"quest_id": {"$in": list(quest_ids.values())}},
+        {"_id": 0}
+    ))
+    existing_steps = _existing_by_key(
+        stored_steps, lambda doc: step_key_by_position.get((doc["quest_id"], doc.get("step_order")))
+    )
+    kept = {existing_steps[doc[KEY_FIELD]]["id"] for doc in step_docs if doc[KEY_FIELD] in existing_steps}
+    stale = [doc["id"] for doc in stored_steps if doc["id"] not in kept]
+
+    now = datetime.utcnow()
+    return [
+        sync(quests_collection, "quests", quest_docs, existing_quests,
+             on_insert={"created_at": now, "created_by": admin_id}),
+        sync(quest_steps_collection, "quest steps", step_docs, existing_steps, stale_ids=stale),
+    ]
+
+
+def seed_cosmetics(cosmetics: List[Dict[str, Any]]) -> SyncResult:
+    key_by_name = {cosmetic["name"]: cosmetic["key"] for cosmetic in cosmetics}
+    existing = _existing_by_key(
+        cosmetics_collection.find(
+            {"$or": [
+                {KEY_FIELD: {"$in": list(key_by_name.values())}},
+                {KEY_FIELD: {"$exists": False}, "name": {"$in": list(key_by_name)}},
+            ]},
+            {"_id": 0}
+        ),
+        lambda doc: key_by_name.get(doc["name"])
+    )
+    docs = [
+        {
+            **{k: v for k, v in cosmetic.items() if k != "key"},
+            "id": _resolve_id(existing, "cosmetic", cosmetic["key"]),
+            KEY_FIELD: cosmetic["key"],
+        }
+        for cosmetic in cosmetics
+    ]
+    return sync(cosmetics_collection, "cosmetics", docs, existing, on_insert={"created_at": datetime.utcnow()})
+
+
+def seed_badges(badges: List[Dict[str, Any]]) -> SyncResult:
+    """Badge ids are already fixed, because quests reference them; they double as seed keys"""
+    ids = [badge["id"] for badge in badges]
+    existing = _existing_by_key(
+        badges_collection.find({"id": {"$in": ids}}, {"_id": 0}),
+        lambda doc: doc["id"]
+    )
+    docs = [{**badge, KEY_FIELD: badge["id"]} for badge in badges]
+    return sync(badges_collection, "badges", docs, existing, on_insert={"created_at": datetime.utcnow()})
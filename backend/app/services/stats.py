@@ -0,0 +1,47 @@
+"""Child statistics computed from already-fetched progress and quest documents"""
+
+from typing import Any, Dict, List
+
+SUBJECTS = ["math", "coding", "science"]
+
+
+def child_stats(child: Dict[str, Any], progress_list: List[Dict[str, Any]], quests_by_id: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Stats payload shared by the per-child stats endpoint and the parent dashboard"""
+    completed_quests = [p for p in progress_list if p.get("completed_at")]
+    
+    # Calculate stats by subject
+    stats_by_subject = {subject: 0 for subject in SUBJECTS}
+    for progress in completed_quests:
+        quest = quests_by_id.get(progress["quest_id"])
+        if quest and quest["subject"] in stats_by_subject:
+            stats_by_subject[quest["subject"]] += 1
+    
+    return {
+        "child_id": child["id"],
+        "total_xp": child["total_xp"],
+        "level": child["level"],
+        "coins": child["coins"],
+        "quests_completed": len(completed_quests),
+        "quests_in_progress": len(progress_list) - len(completed_quests),
+        "stats_by_subject": stats_by_subject
+    }
+
+
+def recent_activity(progress_list: List[Dict[str, Any]], quests_by_id: Dict[str, Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """Most recently touched quests, newest first"""
+    def last_touched(progress):
+        return progress.get("completed_at") or progress["started_at"]
+    
+    activity = []
+    for progress in sorted(progress_list, key=last_touched, reverse=True)[:limit]:
+        quest = quests_by_id.get(progress["quest_id"], {})
+        activity.append({
+            "progress_id": progress["id"],
+            "quest_id": progress["quest_id"],
+            "quest_title": quest.get("title"),
+            "subject": quest.get("subject"),
+            "started_at": progress["started_at"],
+            "completed_at": progress.get("completed_at"),
+            "current_step_index": progress.get("current_step_index", 0),
+        })
+    return activity
@@ -0,0 +1,173 @@
+"""Bounded in-process queue for non-critical side effects, with retries and a dead-letter collection"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+import uuid
+
+from app.config import settings
+from app.database import dead_letter_tasks_collection
+
+logger = logging.getLogger(__name__)
+
+_HANDLERS: Dict[str, Callable[..., Any]] = {}
+
+
+def task(name: str):
+    """Register a blocking function as a named task; it stays directly callable"""
+    def register(fn):
+        _HANDLERS[name] = fn
+        fn.task_name = name
+        return fn
+    return register
+
+
+class TaskQueue:
+    """Workers run handlers in threads so the event loop is never blocked.
+
+    Tasks that find the queue full, or stopped while the loop is still up, run in a thread of
+    their own instead of being dropped. Without a running loop (scripts) they run inline.
+    """
+
+    def __init__(self, maxsize: int, workers: int, max_retries: int, retry_backoff: float):
+        self.maxsize = maxsize
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._overflow: Set[asyncio.Future] = set()
+        self._pending: "OrderedDict[str, float]" = OrderedDict()  # task id -> enqueue time
+        self.processed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.overflowed = 0
+
+    def start(self):
+        if not self._tasks:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Drain what is queued, then stop the workers"""
+        if self._queue is not None:
+            await self._queue.join()
+        await asyncio.gather(*self._overflow, return_exceptions=True)
+        for worker in self._tasks:
+            worker.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def enqueue(self, handler: Callable[..., Any], **payload):
+        """Queue a function registered with @task; payload is passed as keyword arguments"""
+        item = {"id": str(uuid.uuid4()), "name": handler.task_name, "payload": payload, "attempts": 0}
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        if self._queue is not None and loop is not None and loop is self._loop:
+            self._put_or_overflow(item)
+        elif self._queue is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._put_or_overflow, item)
+        elif loop is not None:
+            self._overflow_to_thread(item)
+        else:
+            self._run(item)
+
+    def _put(self, item: Dict[str, Any]):
+        self._queue.put_nowait(item)
+        self._pending[item["id"]] = time.monotonic()
+
+    def _put_or_overflow(self, item: Dict[str, Any]):
+        if self._queue is None or self._queue.full():
+            self._overflow_to_thread(item)
+        else:
+            self._put(item)
+
+    def _overflow_to_thread(self, item: Dict[str, Any]):
+        self.overflowed += 1
+        # Submitted to the executor right away, so the task runs even if the loop is closing
+        overflow = asyncio.get_running_loop().run_in_executor(None, self._run, item)
+        self._overflow.add(overflow)
+        overflow.add_done_callback(self._overflow.discard)
+
+    def _run(self, item: Dict[str, Any]):
+        try:
+            _HANDLERS[item["name"]](**item["payload"])
+            self.processed += 1
+        except Exception as e:
+            self._dead_letter(item, e)
+
+    async def _work(self):
+        while True:
+            item = await self._queue.get()
+            self._pending.pop(item["id"], None)
+            try:
+                await self._process(item)
+            except Exception:
+                # Never let one task take the worker down
+                logger.exception("Task %s could not be processed", item["name"])
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, item: Dict[str, Any]):
+        try:
+            await asyncio.to_thread(_HANDLERS[item["name"]], **item["payload"])
+            self.processed += 1
+            return
+        except Exception as e:
+            item["attempts"] += 1
+            error = e
+        if item["attempts"] > self.max_retries:
+            await asyncio.to_thread(self._dead_letter, item, error)
+            return
+        self.retried += 1
+        await asyncio.sleep(self.retry_backoff * 2 ** (item["attempts"] - 1))
+        # The queue may have filled up during the backoff; retry in a thread rather than drop the task
+        if self._queue.full():
+            self.overflowed += 1
+            await asyncio.to_thread(self._run, item)
+        else:
+            self._put(item)
+
+    def _dead_letter(self, item: Dict[str, Any], error: Exception):
+        self.dead_lettered += 1
+        logger.error("Task %s failed after %d attempts: %s", item["name"], item["attempts"], error)
+        try:
+            dead_letter_tasks_collection.insert_one({
+                "id": item["id"],
+                "name": item["name"],
+                "payload": item["payload"],
+                "attempts": item["attempts"],
+                "error": repr(error),
+                "failed_at": datetime.utcnow(),
+            })
+        except Exception:
+            logger.exception("Could not persist dead-lettered task %s", item["name"])
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = next(iter(self._pending.values()), None)
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "capacity": self.maxsize,
+            "lag_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+            "processed": self.processed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "overflowed": self.overflowed,
+        }
+
+
+task_queue = TaskQueue(
+    maxsize=settings.task_queue_size,
+    workers=settings.task_queue_workers,
+    max_retries=settings.task_max_retries,
+    retry_backoff=settings.task_retry_backoff_seconds,
+)
@@ -0,0 +1,209 @@
+"""Cosmetic unlock rules, compiled into an index keyed by the event that can trigger them.
+
+Children carry per-child counters (`unlock_counters` on the profile), incremented in the
+same update that grants quest XP:
+
+    {"quests": 7, "subject": {"math": 4, ...}, "world": {"math_jungle": 4, ...}}
+
+A completion raises each of its three counters by exactly one, so a quests_completed rule
+fires when its counter lands on the threshold, a level_reached rule when the level passes
+it and a badge_owned rule when the quest awards that badge. Evaluating a completion is a
+handful of dict lookups, independent of the number of cosmetics or the child's history.
+
+Rules only fire on the transition. A rule added after children have passed it is applied
+to them by `python -m app.services.unlocks --backfill`, which also seeds the counters of
+children created before counters existed.
+"""
+
+import argparse
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import (
+    LIVE_CHILD, catalog_versions_collection, children_collection, cosmetics_collection, inventory_collection,
+    progress_collection, quests_collection
+)
+
+COUNTERS_FIELD = "unlock_counters"
+
+
+def counter_increments(quest: Dict[str, Any]) -> Dict[str, int]:
+    """$inc for the counters one completion of quest moves"""
+    return {
+        f"{COUNTERS_FIELD}.quests": 1,
+        f"{COUNTERS_FIELD}.subject.{quest['subject']}": 1,
+        f"{COUNTERS_FIELD}.world.{quest['world']}": 1,
+    }
+
+
+class UnlockRuleIndex:
+    """Rules of one cosmetics catalog version, bucketed by trigger and threshold"""
+
+    def __init__(self, version: int, cosmetics: Iterable[Dict[str, Any]]):
+        self.version = version
+        # counter key ("quests", "subject.math", "world.code_city") -> count -> cosmetic ids
+        self.by_count: Dict[str, Dict[int, List[str]]] = {}
+        self.by_level: Dict[int, List[str]] = {}
+        self.by_badge: Dict[str, List[str]] = {}
+        for cosmetic in cosmetics:
+            rule = cosmetic.get("unlock_rule")
+            if not rule:
+                continue
+            if rule["type"] == "quests_completed":
+                if rule.get("subject"):
+                    key = f"subject.{rule['subject']}"
+                elif rule.get("world"):
+                    key = f"world.{rule['world']}"
+                else:
+                    key = "quests"
+                self.by_count.setdefault(key, {}).setdefault(rule["count"], []).append(cosmetic["id"])
+            elif rule["type"] == "level_reached":
+                self.by_level.setdefault(rule["level"], []).append(cosmetic["id"])
+            elif rule["type"] == "badge_owned":
+                self.by_badge.setdefault(rule["badge_id"], []).append(cosmetic["id"])
+
+    def on_quest_completed(
+        self, counters: Dict[str, Any], quest: Dict[str, Any], old_level: int, new_level: int
+    ) -> List[str]:
+        """Cosmetic ids whose rules this completion satisfies for the first time"""
+        unlocked: List[str] = []
+        for key in ("quests", f"subject.{quest['subject']}", f"world.{quest['world']}"):
+            by_threshold = self.by_count.get(key)
+            if by_threshold:
+                unlocked.extend(by_threshold.get(_counter(counters, key), ()))
+        for level in range(old_level + 1, new_level + 1):
+            unlocked.extend(self.by_level.get(level, ()))
+        if quest.get("badge_id"):
+            unlocked.extend(self.by_badge.get(quest["badge_id"], ()))
+        return list(dict.fromkeys(unlocked))
+
+    def satisfied(self, counters: Dict[str, Any], level: int, badge_ids: Set[str]) -> List[str]:
+        """Every cosmetic whose rule a child meets, for backfills"""
+        unlocked: List[str] = []
+        for key, by_threshold in self.by_count.items():
+            value = _counter(counters, key)
+            for count, ids in by_threshold.items():
+                if value >= count:
+                    unlocked.extend(ids)
+        for required, ids in self.by_level.items():
+            if level >= required:
+                unlocked.extend(ids)
+        for badge_id in badge_ids & self.by_badge.keys():
+            unlocked.extend(self.by_badge[badge_id])
+        return list(dict.fromkeys(unlocked))
+
+
+def _counter(counters: Dict[str, Any], key: str) -> int:
+    value: Any = counters
+    for part in key.split("."):
+        value = value.get(part, {}) if isinstance(value, dict) else {}
+    return value if isinstance(value, int) else 0
+
+
+class UnlockRules:
+    """Process-local compiled rule index, rebuilt when the "cosmetics" catalog version moves"""
+
+    name = "cosmetics"
+
+    def __init__(self):
+        self._index: Optional[UnlockRuleIndex] = None
+        self._checked_at = 0.0
+
+    def _current_version(self) -> int:
+        doc = catalog_versions_collection.find_one({"_id": self.name})
+        return doc["version"] if doc else 0
+
+    def index(self) -> UnlockRuleIndex:
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < settings.catalog_cache_ttl_seconds:
+            return self._index
+        self._checked_at = now
+        version = self._current_version()
+        if self._index is None or self._index.version != version:
+            cosmetics = cosmetics_collection.find(
+                {"unlock_rule": {"$ne": None}}, {"_id": 0, "id": 1, "unlock_rule": 1}
+            )
+            self._index = UnlockRuleIndex(version, cosmetics)
+        return self._index
+
+    def invalidate(self):
+        # cosmetics_cache.invalidate() bumps the shared version; this drops the local copy
+        self._index = None
+        self._checked_at = 0.0
+
+
+unlock_rules = UnlockRules()
+
+
+def grant_cosmetics(child_id: str, cosmetic_ids: List[str]) -> List[str]:
+    """Add cosmetics to the inventory in one bulk write; returns the ids the child did not own yet"""
+    if not cosmetic_ids:
+        return []
+    result = inventory_collection.bulk_write([
+        UpdateOne(
+            {"child_id": child_id, "item_type": "cosmetic", "item_id": cosmetic_id},
+            {"$setOnInsert": {
+                "id": str(uuid.uuid4()),
+                "child_id": child_id,
+                "item_type": "cosmetic",
+                "item_id": cosmetic_id,
+                "earned_at": datetime.utcnow(),
+                "is_equipped": False,
+            }},
+            upsert=True,
+        )
+        for cosmetic_id in cosmetic_ids
+    ], ordered=False)
+    return [cosmetic_ids[index] for index in result.upserted_ids]
+
+
+def backfill(batch_size: int = 500):
+    """Recompute every child's counters from completed progress and grant what their rules unlock"""
+    quests = {q["id"]: q for q in quests_collection.find({}, {"_id": 0, "id": 1, "subject": 1, "world": 1})}
+    index = unlock_rules.index()
+    children = children_collection.find(LIVE_CHILD, {"_id": 0, "id": 1, "level": 1}).batch_size(batch_size)
+    updated = granted = 0
+    for child in children:
+        counters: Dict[str, Any] = {"quests": 0, "subject": {}, "world": {}}
+        completed = progress_collection.find(
+            {"child_id": child["id"], "completed_at": {"$ne": None}}, {"_id": 0, "quest_id": 1}
+        )
+        for progress in completed:
+            quest = quests.get(progress["quest_id"])
+            if quest is None:
+                continue
+            counters["quests"] += 1
+            counters["subject"][quest["subject"]] = counters["subject"].get(quest["subject"], 0) + 1
+            counters["world"][quest["world"]] = counters["world"].get(quest["world"], 0) + 1
+        children_collection.update_one({"id": child["id"]}, {"$set": {COUNTERS_FIELD: counters}})
+
+        badge_ids = set(inventory_collection.distinct(
+            "item_id", {"child_id": child["id"], "item_type": "badge"}
+        ))
+        granted += len(grant_cosmetics(
+            child["id"], index.satisfied(counters, child.get("level", 1), badge_ids)
+        ))
+        updated += 1
+    print(f"Recomputed counters for {updated} children, granted {granted} cosmetics")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cosmetic unlock rules")
+    parser.add_argument("--backfill", action="store_true", help="recompute counters and grant unlocked cosmetics")
+    args = parser.parse_args()
+    if args.backfill:
+        backfill()
+    else:
+        index = unlock_rules.index()
+        rules = sum(len(ids) for bucket in index.by_count.values() for ids in bucket.values())
+        rules += sum(len(ids) for ids in index.by_level.values()) + sum(len(ids) for ids in index.by_badge.values())
+        print(f"{rules} unlock rules at cosmetics version {index.version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Server-side answer checking for quest steps.
+
+Validators are registered per step_type, optionally narrowed by the config's puzzle_type
+(or sim_type), and compiled once per step from its config when the quest catalog snapshot
+is built. Checking an answer is then a call on an in-memory object. The config fields they
+read are answers, so `public_step` strips them from everything sent to clients, along with
+the step's hints, which are revealed one at a time.
+"""
+
+import logging
+import re
+from fractions import Fraction
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models.step_configs import science_options
+
+logger = logging.getLogger(__name__)
+
+# Config fields that give the answer away; never sent to clients
+ANSWER_FIELDS = ("correct_answer", "solution", "explanation")
+
+# Step types with nothing to check; every other step type needs a validator to accept an answer
+ANSWERLESS_STEP_TYPES = frozenset({"dialogue", "collect"})
+
+
+class CompiledValidator:
+    def __init__(self, check: Callable[[Any], bool], explanation: Optional[str] = None):
+        self.check = check
+        self.explanation = explanation
+
+
+Compiler = Callable[[Dict[str, Any]], CompiledValidator]
+
+_COMPILERS: Dict[Tuple[str, Optional[str]], Compiler] = {}
+
+
+def validator(step_type: str, puzzle_type: Optional[str] = None):
+    """Register a compiler turning a step config into a CompiledValidator"""
+    def register(fn: Compiler) -> Compiler:
+        _COMPILERS[(step_type, puzzle_type)] = fn
+        return fn
+    return register
+
+
+def _variant(config: Dict[str, Any]) -> Optional[str]:
+    return config.get("puzzle_type") or config.get("sim_type")
+
+
+def compile_step(step: Dict[str, Any]) -> Optional[CompiledValidator]:
+    """Validator for a step, or None for steps without an answer (dialogue, collect) or a usable config"""
+    config = step.get("config") or {}
+    compiler = _COMPILERS.get((step["step_type"], _variant(config))) or _COMPILERS.get((step["step_type"], None))
+    if compiler is None:
+        return None
+    try:
+        return compiler(config)
+    except (KeyError, TypeError, ValueError):
+        logger.error("Step %s has no valid answer in its config; answers to it are refused", step.get("id"))
+        return None
+
+
+def public_step(step: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a step without answer fields in its config, and with a hint count in place of its hints"""
+    config = step.get("config") or {}
+    public = {k: v for k, v in config.items() if k not in ANSWER_FIELDS}
+    if step["step_type"] == "science_sim" and "options" not in config and "correct_answer" in config:
+        # Configs stored before step configs were normalized on write carry no options
+        public["options"] = science_options(config.get("question", ""), config["correct_answer"])
+    result = {k: v for k, v in step.items() if k != "hints"}
+    result["config"] = public
+    result["hint_count"] = len(step.get("hints") or [])
+    return result
+
+
+def _text(value: Any) -> str:
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+
+def _number(value: Any) -> Optional[Fraction]:
+    """Exact value of an int, decimal or fraction answer ("3", "0.5", "1/2")"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return Fraction(value).limit_denominator(10000)
+    try:
+        return Fraction(_text(value).replace(" ", ""))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+@validator("math_puzzle")
+def numeric_answer(config: Dict[str, Any]) -> CompiledValidator:
+    # Equivalent forms count: "2/4" answers a 1/2 question, "11.0" an 11 one
+    expected = _number(config["correct_answer"])
+    return CompiledValidator(lambda answer: expected is not None and _number(answer) == expected,
+                             config.get("explanation"))
+
+
+@validator("code_puzzle")
+def block_sequence(config: Dict[str, Any]) -> CompiledValidator:
+    solution: List[str] = list(config["solution"])
+    return CompiledValidator(lambda answer: isinstance(answer, list) and answer == solution,
+                             config.get("explanation"))
+
+
+@validator("science_sim")
+def choice_answer(config: Dict[str, Any]) -> CompiledValidator:
+    expected = _text(config["correct_answer"])
+    return CompiledValidator(lambda answer: _text(answer) == expected, config.get("explanation"))
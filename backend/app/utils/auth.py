@@ -1,10 +1,12 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.config import settings
+from app.database import LIVE_CHILD, children_collection
 from app.models.user import TokenData
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -32,12 +34,13 @@ def decode_token(token: str) -> TokenData:
         email: str = payload.get("sub")
         role: str = payload.get("role")
         user_id: str = payload.get("user_id")
+        child_id: Optional[str] = payload.get("child_id")
         if email is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials"
             )
-        return TokenData(email=email, role=role, user_id=user_id)
+        return TokenData(email=email, role=role, user_id=user_id, child_id=child_id)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -61,4 +64,67 @@ async def get_current_admin(current_user: TokenData = Depends(get_current_user))
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized. Admin access required."
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+class OwnershipCache:
+    """Small TTL cache of child_id -> parent_id, so parent requests skip most ownership lookups"""
+    
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: Dict[str, Tuple[str, float]] = {}
+    
+    def get_parent_id(self, child_id: str) -> Optional[str]:
+        entry = self._entries.get(child_id)
+        now = time.monotonic()
+        if entry and entry[1] > now:
+            return entry[0]
+        
+        child = children_collection.find_one({"id": child_id, **LIVE_CHILD}, {"_id": 0, "parent_id": 1})
+        if not child:
+            self._entries.pop(child_id, None)
+            return None
+        if len(self._entries) >= self.max_size:
+            # Drop the oldest insertion; dicts keep insertion order
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[child_id] = (child["parent_id"], now + self.ttl_seconds)
+        return child["parent_id"]
+    
+    def invalidate(self, child_id: str):
+        self._entries.pop(child_id, None)
+
+ownership_cache = OwnershipCache(settings.ownership_cache_ttl_seconds, settings.ownership_cache_size)
+
+def authorize_child_access(current_user: TokenData, child_id: str) -> TokenData:
+    """Allow admins and child sessions without a lookup; check parents via the cache.
+
+    A child session only reaches its own profile. Its token outlives a deletion, so routes that
+    create rows for a child check that the profile is still live.
+    """
+    if current_user.role == "admin":
+        return current_user
+    
+    if current_user.child_id:
+        if child_id != current_user.child_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this child's data"
+            )
+        return current_user
+    
+    parent_id = ownership_cache.get_parent_id(child_id)
+    if parent_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child profile not found"
+        )
+    if parent_id != current_user.user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this child's data"
+        )
+    return current_user
+
+async def get_child_access(child_id: str, current_user: TokenData = Depends(get_current_user)) -> TokenData:
+    """Dependency for routes with a {child_id} path parameter"""
+    return authorize_child_access(current_user, child_id)
\ No newline at end of file
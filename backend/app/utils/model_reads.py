@@ -0,0 +1,78 @@
+"""Fast construction and serialization of response models from documents we wrote ourselves"""
+
+import inspect
+from functools import lru_cache
+from typing import Any, Dict, List, Type, TypeVar, Union, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.config import settings
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def adapter(tp: Any) -> TypeAdapter:
+    """One TypeAdapter per type; building them is the expensive part"""
+    return TypeAdapter(tp)
+
+
+def _model_in(annotation: Any):
+    """The BaseModel a field holds directly, in a list, or as Optional, else None"""
+    if inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+        return annotation
+    if get_origin(annotation) in (list, List, Union):
+        for arg in get_args(annotation):
+            model = _model_in(arg)
+            if model is not None:
+                return model
+    return None
+
+
+@lru_cache(maxsize=None)
+def _nested_fields(model: Type[BaseModel]) -> Dict[str, Type[BaseModel]]:
+    nested = {}
+    for name, field in model.model_fields.items():
+        inner = _model_in(field.annotation)
+        if inner is not None:
+            nested[name] = inner
+    return nested
+
+
+def construct(model: Type[M], doc: Dict[str, Any]) -> M:
+    """model_construct that also builds nested models, skipping validation entirely"""
+    nested = _nested_fields(model)
+    values = {}
+    # Defaults are filled here rather than by model_construct so fields keep declaration order
+    for name, field in model.model_fields.items():
+        if name not in doc:
+            values[name] = field.get_default(call_default_factory=True)
+            continue
+        value = doc[name]
+        inner = nested.get(name)
+        if inner is not None and value is not None:
+            if isinstance(value, list):
+                value = [construct(inner, v) if isinstance(v, dict) else v for v in value]
+            elif isinstance(value, dict):
+                value = construct(inner, value)
+        values[name] = value
+    return model.model_construct(**values)
+
+
+def load(model: Type[M], doc: Dict[str, Any]) -> M:
+    if settings.trusted_reads:
+        return construct(model, doc)
+    return adapter(model).validate_python(doc)
+
+
+def load_many(model: Type[M], docs: List[Dict[str, Any]]) -> List[M]:
+    """Whole list in one validator call, or constructed without validation when reads are trusted"""
+    if settings.trusted_reads:
+        return [construct(model, doc) for doc in docs]
+    return adapter(List[model]).validate_python(docs)
+
+
+def model_response(tp: Any, value: Any) -> Response:
+    """Serialize already-built models directly, skipping FastAPI's response_model revalidation"""
+    return Response(adapter(tp).dump_json(value), media_type="application/json")
@@ -0,0 +1,119 @@
+"""Request-scoped MongoDB command accounting, for debug headers and query-budget tests.
+
+A CommandListener registered on the client adds every command to the QueryStats in the
+current context, if any. Work started from a tracked context (including threadpool and
+asyncio.to_thread calls, which copy the context) is counted; background task workers
+are not.
+
+As a pytest plugin (`pytest -p app.utils.query_budget`) it provides the `query_budget`
+fixture:
+
+    def test_quest_list(query_budget, seed_quests):
+        query_budget.scaling(lambda n: call_endpoint(seed_quests(n)), sizes=(1, 10, 50), budget=lambda n: 3)
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from pymongo import monitoring
+
+# Connection handshakes and session bookkeeping are not queries the code asked for
+IGNORED_COMMANDS = frozenset({
+    "hello", "ismaster", "isMaster", "saslStart", "saslContinue", "endSessions", "ping", "buildInfo",
+})
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+        self.commands: Counter = Counter()
+        self.started_at = time.perf_counter()
+
+    def summary(self) -> str:
+        return ", ".join(f"{name} x{n}" for name, n in self.commands.most_common())
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+class QueryCounter(monitoring.CommandListener):
+    def record(self, command_name: str, collection: Optional[str] = None):
+        """Count one command; also called directly by the in-memory storage backend"""
+        stats = _current.get()
+        if stats is not None and command_name not in IGNORED_COMMANDS:
+            stats.count += 1
+            stats.commands[f"{command_name} {collection}" if collection else command_name] += 1
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self.record(event.command_name, collection if isinstance(collection, str) else None)
+
+    def _finished(self, event):
+        stats = _current.get()
+        if stats is not None and event.command_name not in IGNORED_COMMANDS:
+            stats.duration_ms += event.duration_micros / 1000
+
+    succeeded = _finished
+    failed = _finished
+
+
+query_counter = QueryCounter()
+
+
+@contextmanager
+def track() -> Iterator[QueryStats]:
+    """Count the Mongo commands issued inside the block (and anything it starts)"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+async def query_headers_middleware(request, call_next):
+    """Debug-mode middleware adding X-DB-Queries and X-DB-Time (ms) to every response"""
+    with track() as stats:
+        response = await call_next(request)
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Time"] = f"{stats.duration_ms:.1f}"
+    return response
+
+
+class QueryBudget:
+    """Assertions over query counts, used through the `query_budget` pytest fixture"""
+
+    @contextmanager
+    def limit(self, max_queries: int, label: str = "") -> Iterator[QueryStats]:
+        with track() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"{label or 'block'} issued {stats.count} Mongo commands, budget is {max_queries}: {stats.summary()}"
+        )
+
+    def scaling(self, run: Callable[[int], Any], sizes: Iterable[int], budget: Callable[[int], int]) -> Dict[int, int]:
+        """Run `run(n)` for each data size and check its count against `budget(n)`.
+
+        A constant budget catches N+1 patterns; a linear one catches quadratic access.
+        """
+        counts = {}
+        for n in sizes:
+            with self.limit(budget(n), label=f"size {n}") as stats:
+                run(n)
+            counts[n] = stats.count
+        return counts
+
+
+try:
+    import pytest
+except ImportError:  # only needed when loaded as a pytest plugin
+    pytest = None
+
+if pytest is not None:
+    @pytest.fixture
+    def query_budget() -> QueryBudget:
+        return QueryBudget()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark the single-call parent dashboard against the 2N+1 request flow.
+
+Runs the route handlers in-process against a scratch database (dropped at the end):
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.dashboard_flow --children 5 --quests 40
+    STORAGE_BACKEND=memory python -m benchmarks.dashboard_flow  # no mongod needed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("MONGO_DB_NAME", "kidquest_bench")
+
+from app.config import settings
+from app.database import client, children_collection, progress_collection, quests_collection, ensure_indexes
+from app.routers import children, dashboard, progress
+from app.utils.auth import create_access_token, decode_token
+
+
+def seed(num_children: int, num_quests: int) -> str:
+    parent_id = str(uuid.uuid4())
+    quests = [{
+        "id": str(uuid.uuid4()),
+        "title": f"Bench Quest {i}",
+        "subject": ["math", "coding", "science"][i % 3],
+    } for i in range(num_quests)]
+    quests_collection.insert_many(quests)
+    
+    now = datetime.utcnow()
+    for c in range(num_children):
+        child_id = str(uuid.uuid4())
+        children_collection.insert_one({
+            "id": child_id, "parent_id": parent_id, "username": f"bench_{child_id[:8]}",
+            "age_band": "9-10", "created_at": now, "total_xp": 0, "level": 1, "coins": 0,
+            "hint_buddy_enabled": False,
+        })
+        progress_collection.insert_many([{
+            "id": str(uuid.uuid4()), "child_id": child_id, "quest_id": q["id"],
+            "started_at": now - timedelta(minutes=i), "completed_at": now if i % 2 else None,
+            "current_step_index": 2, "steps_progress": [], "total_attempts": 3, "hints_used": 1,
+        } for i, q in enumerate(quests)])
+    
+    return create_access_token({"sub": "bench@kidquest.com", "role": "parent", "user_id": parent_id})
+
+
+async def multi_request_flow(token: str):
+    # Every request re-verifies the JWT, as the real HTTP flow does
+    kids = json.loads((await children.get_children(decode_token(token))).body)
+    for kid in kids:
+        await progress.get_child_stats(kid["id"], decode_token(token))
+        await progress.get_child_progress(kid["id"], decode_token(token))
+
+
+async def dashboard_flow(token: str):
+    await dashboard.get_dashboard(decode_token(token))
+
+
+def measure(label: str, flow, token: str, repeat: int) -> float:
+    asyncio.run(flow(token))  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        asyncio.run(flow(token))
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+    print(f"{label:<24} {elapsed_ms:8.2f} ms/dashboard")
+    return elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--children", type=int, default=5)
+    parser.add_argument("--quests", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    
+    if settings.mongo_db_name == "kidquest":
+        raise SystemExit("Refusing to benchmark against the main database; set MONGO_DB_NAME")
+    
+    ensure_indexes()
+    token = seed(args.children, args.quests)
+    try:
+        print(f"{args.children} children x {args.quests} quests, {args.repeat} runs")
+        baseline = measure("multi-request (2N+1)", multi_request_flow, token, args.repeat)
+        batched = measure("GET /api/dashboard", dashboard_flow, token, args.repeat)
+        print(f"speedup: {baseline / batched:.1f}x")
+    finally:
+        client.drop_database(settings.mongo_db_name)
+
+
+if __name__ == "__main__":
+    main()
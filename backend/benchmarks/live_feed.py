@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Hold thousands of idle live-feed subscribers on one worker and measure fan-out.
+
+Drives app.services.live.event_stream directly (no HTTP server or database): idle
+subscribers must only cost memory and heartbeats, targeted publishes must reach only
+their subscribers, and a subscriber that never reads must be resynced, not buffered:
+
+    python -m benchmarks.live_feed --subscribers 5000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+import uuid
+
+os.environ.setdefault("LIVE_HEARTBEAT_SECONDS", "1")
+
+from app.config import settings
+from app.services.live import RESYNC, event_stream, live_hub
+
+
+def event(child_id: str, kind: str = "step_completed"):
+    return {"event_id": str(uuid.uuid4()), "child_id": child_id, "quest_id": "q", "step_id": None, "kind": kind}
+
+
+async def client(child_id: str, received: list, ready: asyncio.Event, stop: asyncio.Event):
+    stream = event_stream([child_id])
+    await stream.__anext__()  # retry directive; the subscription exists from here on
+    ready.set()
+    try:
+        while not stop.is_set():
+            frame = await stream.__anext__()
+            received.append(frame)
+    finally:
+        await stream.aclose()
+
+
+async def run(num_subscribers: int):
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    stop = asyncio.Event()
+    child_ids = [str(uuid.uuid4()) for _ in range(num_subscribers)]
+    received = [[] for _ in child_ids]
+    readies = [asyncio.Event() for _ in child_ids]
+    
+    start = time.perf_counter()
+    clients = [
+        asyncio.create_task(client(child_id, received[i], readies[i], stop))
+        for i, child_id in enumerate(child_ids)
+    ]
+    await asyncio.gather(*(r.wait() for r in readies))
+    connected = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0] - baseline
+    print(f"{num_subscribers} subscribers connected in {connected * 1000:.0f} ms, "
+          f"{memory / num_subscribers:.0f} bytes each, hub={live_hub.stats()}")
+    
+    # Idle: every subscriber gets heartbeats and nothing else
+    await asyncio.sleep(settings.live_heartbeat_seconds * 1.5)
+    assert all(frames and all(f.startswith(": heartbeat") for f in frames) for frames in received)
+    for frames in received:
+        frames.clear()
+    
+    # Targeted fan-out: one event per 100th child, duplicates dropped by event_id
+    targets = child_ids[::100]
+    events = [event(child_id) for child_id in targets]
+    start = time.perf_counter()
+    live_hub.publish(events)
+    live_hub.publish(events)
+    await asyncio.sleep(0)
+    while sum(1 for i in range(0, num_subscribers, 100) if any("step_completed" in f for f in received[i])) < len(targets):
+        await asyncio.sleep(0.001)
+    print(f"published {len(events)} events (twice) to their subscribers in {(time.perf_counter() - start) * 1000:.1f} ms")
+    delivered = [sum("step_completed" in f for f in frames) for frames in received]
+    assert sum(delivered) == len(targets) and max(delivered) == 1
+    
+    # Backpressure: a subscriber that never reads ends with a single resync, bounded queue
+    stalled = live_hub.subscribe(["stalled"])
+    live_hub.publish([event("stalled") for _ in range(settings.live_queue_size * 3 // 2)])
+    assert stalled.queue.qsize() <= settings.live_queue_size and stalled.resyncs == 1
+    print(f"stalled subscriber: queue={stalled.queue.qsize()} resyncs={stalled.resyncs}")
+    assert stalled.queue.get_nowait() is RESYNC
+    live_hub.unsubscribe(stalled)
+    
+    stop.set()
+    for task in clients:
+        task.cancel()
+    await asyncio.gather(*clients, return_exceptions=True)
+    assert live_hub.stats()["subscribers"] == 0, "subscriptions leaked on disconnect"
+    print("OK")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.subscribers))
+
+
+if __name__ == "__main__":
+    main()
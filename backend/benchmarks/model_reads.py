@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Microbenchmark response model construction from stored documents, per model.
+
+Compares the per-item path (Model(**doc), then FastAPI's response_model revalidation and
+JSON rendering) with a cached TypeAdapter over the whole list and with trusted
+model_construct, each followed by direct serialization. No database is needed:
+
+    python -m benchmarks.model_reads --docs 1000 --repeat 20
+"""
+
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from app.models.child import ChildProfile
+from app.models.progress import QuestProgress
+from app.models.quest import Quest, QuestStep
+from app.models.reward import InventoryItem
+from app.utils.model_reads import adapter, construct
+
+
+def step_doc(quest_id: str, order: int) -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()), "quest_id": quest_id, "step_order": order, "step_type": "math_puzzle",
+        "title": f"Step {order}", "description": "Solve the puzzle",
+        "config": {"puzzle_type": "counting", "question": "2 + 2?", "correct_answer": 4},
+        "hints": ["Count on your fingers"], "xp_reward": 10,
+    }
+
+
+def quest_doc() -> Dict[str, Any]:
+    quest_id = str(uuid.uuid4())
+    return {
+        "id": quest_id, "title": "Counting Quest", "description": "Learn to count", "world": "math_jungle",
+        "subject": "math", "difficulty": "easy", "age_range": ["7-8"], "estimated_minutes": 10,
+        "xp_reward": 100, "coin_reward": 50, "badge_id": None, "prerequisites": [],
+        "created_at": datetime.utcnow(), "created_by": str(uuid.uuid4()), "is_active": True,
+        "steps": [step_doc(quest_id, i) for i in range(5)],
+    }
+
+
+def progress_doc() -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()), "child_id": str(uuid.uuid4()), "quest_id": str(uuid.uuid4()),
+        "started_at": datetime.utcnow(), "completed_at": None, "current_step_index": 2,
+        "steps_progress": [
+            {"step_id": str(uuid.uuid4()), "completed": i < 2, "attempts": 1, "completed_at": None, "score": None}
+            for i in range(5)
+        ],
+        "total_attempts": 3, "hints_used": 1,
+    }
+
+
+def child_doc() -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()), "parent_id": str(uuid.uuid4()), "username": "hero", "age_band": "9-10",
+        "avatar": {"skin_tone": "light", "hair_style": "short", "hair_color": "brown", "outfit": "casual_blue"},
+        "created_at": datetime.utcnow(), "total_xp": 120, "level": 2, "coins": 40, "hint_buddy_enabled": False,
+    }
+
+
+def inventory_doc() -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()), "child_id": str(uuid.uuid4()), "item_type": "cosmetic",
+        "item_id": str(uuid.uuid4()), "earned_at": datetime.utcnow(), "is_equipped": False,
+        "item_details": {"name": "Hat", "category": "accessory", "coin_cost": 25},
+    }
+
+
+MODELS = [
+    (QuestStep, lambda: step_doc(str(uuid.uuid4()), 0)),
+    (Quest, quest_doc),
+    (QuestProgress, progress_doc),
+    (ChildProfile, child_doc),
+    (InventoryItem, inventory_doc),
+]
+
+
+def per_item(model, docs):
+    # What the routers did: validate each document, then FastAPI dumps, revalidates and renders
+    models = [model(**doc) for doc in docs]
+    list_adapter = adapter(List[model])
+    validated = list_adapter.validate_python([m.model_dump() for m in models])
+    return json.dumps(list_adapter.dump_python(validated, mode="json")).encode()
+
+
+def validated_list(model, docs):
+    list_adapter = adapter(List[model])
+    return list_adapter.dump_json(list_adapter.validate_python(docs))
+
+
+def trusted(model, docs):
+    return adapter(List[model]).dump_json([construct(model, doc) for doc in docs])
+
+
+def timed(fn: Callable, model, docs, repeat: int) -> float:
+    fn(model, docs)  # warm the adapter caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(model, docs)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    
+    print(f"{'model':16} {'per-item':>10} {'adapter':>10} {'trusted':>10}   (ms per {args.docs} docs)")
+    for model, make in MODELS:
+        docs = [make() for _ in range(args.docs)]
+        assert json.loads(per_item(model, docs)) == json.loads(validated_list(model, docs)) == json.loads(trusted(model, docs))
+        results = [timed(fn, model, docs, args.repeat) for fn in (per_item, validated_list, trusted)]
+        print(f"{model.__name__:16} " + " ".join(f"{ms:>10.2f}" for ms in results))
+
+
+if __name__ == "__main__":
+    main()
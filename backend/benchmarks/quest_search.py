@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Benchmark quest search latency over a synthetic catalog (default 100k steps).
+
+Builds the inverted index from an in-memory catalog snapshot (no database), times
+random one- to three-word and prefix queries, then an incremental re-sync after a
+handful of quests are edited:
+
+    python -m benchmarks.quest_search --quests 10000 --steps-per-quest 10 --queries 2000
+"""
+
+import argparse
+import copy
+import random
+import statistics
+import string
+import time
+
+from app.services.catalog import QuestCatalogSnapshot
+from app.services.search import QuestSearchIndex
+
+
+def make_vocabulary(size: int, rng: random.Random):
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(size)]
+
+
+def phrase(words, rng: random.Random, length: int) -> str:
+    # Zipf-like skew so some terms are common and most are rare, as in real text
+    return " ".join(words[min(int(rng.paretovariate(1.2)) - 1, len(words) - 1)] for _ in range(length))
+
+
+def make_catalog(num_quests: int, steps_per_quest: int, words, rng: random.Random):
+    quests, steps = [], []
+    for q in range(num_quests):
+        quest_id = f"quest-{q}"
+        quests.append({
+            "id": quest_id, "title": phrase(words, rng, 3), "description": phrase(words, rng, 12),
+            "subject": "math", "world": "math_jungle", "difficulty": "easy",
+        })
+        for s in range(steps_per_quest):
+            steps.append({
+                "id": f"{quest_id}-step-{s}", "quest_id": quest_id, "step_order": s,
+                "title": phrase(words, rng, 3), "config": {"dialogue": phrase(words, rng, 20)},
+            })
+    return quests, steps
+
+
+def percentile(values, p: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quests", type=int, default=10000)
+    parser.add_argument("--steps-per-quest", type=int, default=10)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    words = make_vocabulary(args.vocabulary, rng)
+    quests, steps = make_catalog(args.quests, args.steps_per_quest, words, rng)
+    print(f"catalog: {len(quests)} quests, {len(steps)} steps")
+    
+    index = QuestSearchIndex()
+    start = time.perf_counter()
+    index.sync(QuestCatalogSnapshot(1, copy.deepcopy(quests), steps))
+    print(f"full build: {time.perf_counter() - start:.2f} s")
+    
+    for label, make_query in [
+        ("1 word", lambda: phrase(words, rng, 1)),
+        ("3 words", lambda: phrase(words, rng, 3)),
+        ("prefix", lambda: phrase(words, rng, 1)[:3]),
+    ]:
+        latencies = []
+        for _ in range(args.queries):
+            query = make_query()
+            start = time.perf_counter()
+            index.search(query, 20)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"{label:8} p50={statistics.median(latencies):.3f} ms  p95={percentile(latencies, 0.95):.3f} ms  "
+              f"p99={percentile(latencies, 0.99):.3f} ms")
+    
+    for quest in rng.sample(quests, args.edits):
+        quest["title"] = phrase(words, rng, 3)
+    start = time.perf_counter()
+    changed = index.sync(QuestCatalogSnapshot(2, copy.deepcopy(quests), steps))
+    print(f"incremental sync after {args.edits} edits: {changed} re-indexed in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Hammer the cosmetic shop with concurrent purchases and check that no coins are overspent.
+
+Each purchase runs on its own thread against a scratch database (dropped at the end):
+
+    MONGO_DB_NAME=kidquest_bench python -m benchmarks.shop_concurrency --coins 500 --buyers 64
+"""
+
+import argparse
+import asyncio
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+os.environ.setdefault("MONGO_DB_NAME", "kidquest_bench")
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.database import client, children_collection, cosmetics_collection, inventory_collection, ensure_indexes
+from app.models.reward import CartPurchaseRequest, PurchaseRequest
+from app.models.user import TokenData
+from app.routers import shop
+
+COST = 100
+
+
+def seed(coins: int, num_cosmetics: int):
+    parent_id = str(uuid.uuid4())
+    child_id = str(uuid.uuid4())
+    children_collection.insert_one({
+        "id": child_id, "parent_id": parent_id, "username": f"bench_{child_id[:8]}",
+        "age_band": "9-10", "created_at": datetime.utcnow(), "total_xp": 0, "level": 1,
+        "coins": coins, "hint_buddy_enabled": False,
+    })
+    cosmetic_ids = [str(uuid.uuid4()) for _ in range(num_cosmetics)]
+    cosmetics_collection.insert_many([{
+        "id": cid, "name": f"Bench {i}", "category": "accessory", "value": f"bench_{i}",
+        "description": "", "unlock_requirement": "", "coin_cost": COST, "created_at": datetime.utcnow(),
+    } for i, cid in enumerate(cosmetic_ids)])
+    user = TokenData(email="bench@kidquest.com", role="parent", user_id=parent_id)
+    return child_id, cosmetic_ids, user
+
+
+def buy(child_id, user, cosmetic_ids, index):
+    # Every other buyer taps the same item twice, the rest check out a two-item cart
+    try:
+        if index % 2:
+            request = PurchaseRequest(cosmetic_id=cosmetic_ids[index % len(cosmetic_ids)])
+            result = asyncio.run(shop.purchase_cosmetic(child_id, request, user))
+        else:
+            request = CartPurchaseRequest(cosmetic_ids=[cosmetic_ids[index % len(cosmetic_ids)], cosmetic_ids[(index + 1) % len(cosmetic_ids)]])
+            result = asyncio.run(shop.purchase_cart(child_id, request, user))
+        return result.coins_spent
+    except HTTPException:
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coins", type=int, default=500)
+    parser.add_argument("--cosmetics", type=int, default=10)
+    parser.add_argument("--buyers", type=int, default=64)
+    args = parser.parse_args()
+    
+    if settings.mongo_db_name == "kidquest":
+        raise SystemExit("Refusing to run against the main database; set MONGO_DB_NAME")
+    
+    ensure_indexes()
+    child_id, cosmetic_ids, user = seed(args.coins, args.cosmetics)
+    try:
+        with ThreadPoolExecutor(max_workers=args.buyers) as pool:
+            spent = sum(pool.map(lambda i: buy(child_id, user, cosmetic_ids, i), range(args.buyers)))
+        
+        coins_left = children_collection.find_one({"id": child_id})["coins"]
+        owned = inventory_collection.count_documents({"child_id": child_id, "item_type": "cosmetic"})
+        print(f"spent={spent} coins_left={coins_left} items_owned={owned}")
+        
+        assert coins_left >= 0, "balance went negative"
+        assert spent + coins_left == args.coins, "coins were created or lost"
+        assert owned * COST == spent, "items granted do not match coins spent"
+        assert owned <= min(args.cosmetics, args.coins // COST)
+        print("OK: no overspending")
+    finally:
+        client.drop_database(settings.mongo_db_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Compare the Mongo and in-memory storage backends on the same in-process API flow.
+
+Each backend runs in its own interpreter (the backend is chosen at import time) against a
+scratch database that is dropped at the end. The difference between the two is the cost of
+the Mongo layer: driver, network and server.
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.storage_backends --children 20 --quests 30
+    python -m benchmarks.storage_backends --backend memory  # one backend only, no mongod needed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+
+os.environ.setdefault("MONGO_DB_NAME", "kidquest_bench")
+
+OPERATIONS = ("child quest list", "start quest", "update progress", "complete quest", "dashboard")
+
+
+def seed(num_children: int, num_quests: int, steps_per_quest: int):
+    from app.database import children_collection, quest_steps_collection, quests_collection
+    from app.utils.auth import create_access_token
+
+    parent_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    quests, steps = [], []
+    for i in range(num_quests):
+        quest_id = str(uuid.uuid4())
+        quests.append({
+            "id": quest_id, "title": f"Bench Quest {i}", "description": "Benchmark quest",
+            "world": "math_jungle", "subject": "math", "difficulty": "easy",
+            "age_range": ["7-8", "9-10", "11-12"], "estimated_minutes": 10, "xp_reward": 100,
+            "coin_reward": 50, "badge_id": None, "prerequisites": [], "created_at": now,
+            "created_by": parent_id, "is_active": True,
+        })
+        steps.extend({
+            "id": str(uuid.uuid4()), "quest_id": quest_id, "step_order": s, "step_type": "dialogue",
+            "title": f"Step {s}", "description": "Benchmark step", "config": {"dialogue": "Hello"},
+            "hints": [], "xp_reward": 10,
+        } for s in range(steps_per_quest))
+    quests_collection.insert_many(quests)
+    quest_steps_collection.insert_many(steps)
+
+    child_ids = [str(uuid.uuid4()) for _ in range(num_children)]
+    children_collection.insert_many([{
+        "id": child_id, "parent_id": parent_id, "username": f"bench_{child_id[:8]}",
+        "age_band": "9-10", "created_at": now, "total_xp": 0, "level": 1, "coins": 0,
+        "hint_buddy_enabled": False,
+    } for child_id in child_ids])
+    token = create_access_token({"sub": "bench@kidquest.com", "role": "parent", "user_id": parent_id})
+    return token, child_ids, [q["id"] for q in quests]
+
+
+async def flow(token: str, child_ids, quest_ids, timings):
+    from app.models.progress import QuestProgressCreate, QuestProgressUpdate, StepProgress
+    from app.routers import dashboard, progress, quests
+    from app.utils.auth import decode_token
+
+    def timed(name, started):
+        timings[name].append((time.perf_counter() - started) * 1000)
+
+    user = decode_token(token)
+    for child_id in child_ids:
+        for quest_id in quest_ids:
+            started = time.perf_counter()
+            await quests.get_quests_for_child(child_id, world=None, current_user=user)
+            timed("child quest list", started)
+
+            started = time.perf_counter()
+            started_progress = await progress.start_quest(QuestProgressCreate(child_id=child_id, quest_id=quest_id), user)
+            timed("start quest", started)
+
+            steps = [
+                StepProgress(step_id=step.step_id, completed=True, attempts=1)
+                for step in started_progress.steps_progress
+            ]
+            started = time.perf_counter()
+            await progress.update_quest_progress(
+                started_progress.id, QuestProgressUpdate(steps_progress=steps, current_step_index=len(steps)), user
+            )
+            timed("update progress", started)
+
+            started = time.perf_counter()
+            await progress.complete_quest(started_progress.id, user)
+            timed("complete quest", started)
+
+        started = time.perf_counter()
+        await dashboard.get_dashboard(user)
+        timed("dashboard", started)
+
+
+def run_backend(args) -> dict:
+    """Run the flow on the backend selected by STORAGE_BACKEND; returns mean ms per operation"""
+    from app.config import settings
+    from app.database import client, ensure_indexes
+
+    if settings.mongo_db_name == "kidquest":
+        raise SystemExit("Refusing to benchmark against the main database; set MONGO_DB_NAME")
+
+    ensure_indexes()
+    try:
+        token, child_ids, quest_ids = seed(args.children, args.quests, args.steps)
+        timings = {name: [] for name in OPERATIONS}
+        asyncio.run(flow(token, child_ids, quest_ids, timings))
+        return {name: sum(values) / len(values) for name, values in timings.items()}
+    finally:
+        client.drop_database(settings.mongo_db_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--children", type=int, default=10)
+    parser.add_argument("--quests", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--backend", choices=["mongo", "memory"], action="append")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_backend(args)))
+        return
+
+    results = {}
+    for backend in args.backend or ["mongo", "memory"]:
+        command = [
+            sys.executable, "-m", "benchmarks.storage_backends", "--worker",
+            "--children", str(args.children), "--quests", str(args.quests), "--steps", str(args.steps),
+        ]
+        proc = subprocess.run(
+            command, env={**os.environ, "STORAGE_BACKEND": backend}, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"{backend}: failed\n{proc.stderr.strip()}")
+            continue
+        results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+    if not results:
+        raise SystemExit(1)
+
+    print(f"{args.children} children x {args.quests} quests x {args.steps} steps, mean ms/operation")
+    print(f"{'operation':<20}" + "".join(f"{backend:>10}" for backend in results))
+    for name in OPERATIONS:
+        print(f"{name:<20}" + "".join(f"{results[backend][name]:10.3f}" for backend in results))
+    if "mongo" in results and "memory" in results:
+        mongo_total = sum(results["mongo"].values())
+        memory_total = sum(results["memory"].values())
+        print(f"Mongo layer share of request time: {(mongo_total - memory_total) / mongo_total:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Measure index sizes before and after converting ids to BSON Binary subtype 4.
+
+Generates children, progress, inventory and event documents with string ids in a scratch
+database (dropped at the end), then runs the app.migrate_uuids conversion and index rebuild:
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.uuid_index_size --children 2000 --quests 60
+
+Index key bytes (the BSON size of every secondary index key, before prefix compression) are
+reported on any backend; on-disk index sizes need mongod. With STORAGE_BACKEND=memory only
+the key bytes are measured.
+"""
+
+import argparse
+import os
+import random
+import uuid
+from datetime import datetime
+
+os.environ.setdefault("MONGO_DB_NAME", "kidquest_bench")
+
+import bson
+
+from app.config import settings
+from app.database import client, ensure_indexes
+from app.migrate_uuids import collection_names, index_sizes, migrate_collection, print_sizes, raw_db, rebuild_indexes
+
+
+def seed(num_children: int, num_quests: int):
+    now = datetime.utcnow()
+    quest_ids = [str(uuid.uuid4()) for _ in range(num_quests)]
+    parent_ids = [str(uuid.uuid4()) for _ in range(max(1, num_children // 2))]
+    
+    children, progress, inventory, events = [], [], [], []
+    for _ in range(num_children):
+        child_id = str(uuid.uuid4())
+        children.append({"id": child_id, "parent_id": random.choice(parent_ids), "username": child_id[:8], "created_at": now})
+        for quest_id in random.sample(quest_ids, k=min(len(quest_ids), 20)):
+            progress.append({"id": str(uuid.uuid4()), "child_id": child_id, "quest_id": quest_id, "started_at": now})
+            events.append({
+                "event_id": str(uuid.uuid4()), "child_id": child_id, "quest_id": quest_id,
+                "step_id": str(uuid.uuid4()), "kind": "step_completed", "ts": now,
+            })
+        for _ in range(5):
+            inventory.append({
+                "id": str(uuid.uuid4()), "child_id": child_id, "item_type": "cosmetic",
+                "item_id": str(uuid.uuid4()), "earned_at": now,
+            })
+    
+    raw_db.child_profiles.insert_many(children)
+    raw_db.progress.insert_many(progress)
+    raw_db.inventory.insert_many(inventory)
+    raw_db.progress_events.insert_many(events)
+
+
+def _key_value(doc, field):
+    for part in field.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def index_key_bytes():
+    """BSON size of the keys of every secondary index, summed per collection"""
+    sizes = {}
+    for name in collection_names():
+        indexes = [info["key"] for index_name, info in raw_db[name].index_information().items() if index_name != "_id_"]
+        total = 0
+        for doc in raw_db[name].find():
+            for key in indexes:
+                total += len(bson.encode({str(i): _key_value(doc, field) for i, (field, _) in enumerate(key)}))
+        sizes[name] = total
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--children", type=int, default=2000)
+    parser.add_argument("--quests", type=int, default=60)
+    args = parser.parse_args()
+    
+    if settings.mongo_db_name == "kidquest":
+        raise SystemExit("Refusing to run against the main database; set MONGO_DB_NAME")
+    
+    try:
+        seed(args.children, args.quests)
+        ensure_indexes()
+        on_disk = settings.storage_backend == "mongo"
+        before = index_sizes() if on_disk else {}
+        keys_before = index_key_bytes()
+        for name in collection_names():
+            migrate_collection(name, revert=False, batch_size=1000, delay_ms=0)
+        rebuild_indexes()
+        print("Index key bytes per collection (string ids -> binary ids):")
+        print_sizes(keys_before, index_key_bytes())
+        if on_disk:
+            print("Total index size per collection (string ids -> binary ids):")
+            print_sizes(before, index_sizes())
+    finally:
+        client.drop_database(settings.mongo_db_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Tests run against the in-memory storage backend; the environment must be set before app is imported"""
+
+import os
+import tempfile
+
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ.setdefault("MONGO_DB_NAME", "kidquest_test")
+os.environ.setdefault("BUNDLE_DIR", tempfile.mkdtemp(prefix="kidquest-bundles-"))
+
+import pytest
+
+pytest_plugins = ["app.utils.query_budget"]
+
+
+@pytest.fixture(autouse=True)
+def database():
+    from app.config import settings
+    from app.database import client, ensure_indexes
+    from app.services.catalog import badges_cache, cosmetics_cache, quest_catalog
+    ensure_indexes()
+    # Process-local caches would otherwise serve the previous test's catalog
+    for cache in (quest_catalog, cosmetics_cache, badges_cache):
+        cache.invalidate()
+    yield client.get_database(settings.mongo_db_name)
+    client.drop_database(settings.mongo_db_name)
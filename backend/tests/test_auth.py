@@ -0,0 +1,48 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import children_collection
+from app.models.progress import QuestProgressCreate
+from app.models.user import TokenData
+from app.routers import progress
+from app.services.deletion import schedule_child_deletion
+from app.utils.auth import authorize_child_access
+
+
+def add_child(parent_id):
+    child_id = str(uuid.uuid4())
+    child = {"id": child_id, "parent_id": parent_id, "username": f"test_{child_id[:8]}",
+             "created_at": datetime.utcnow(), "coins": 0}
+    children_collection.insert_one(dict(child))
+    return child
+
+
+def child_session(child):
+    return TokenData(email="parent@kidquest.com", role="child", user_id=child["parent_id"], child_id=child["id"])
+
+
+def test_child_session_reaches_only_its_own_profile():
+    parent_id = str(uuid.uuid4())
+    child, sibling = add_child(parent_id), add_child(parent_id)
+    session = child_session(child)
+    parent = TokenData(email="parent@kidquest.com", role="parent", user_id=parent_id)
+    
+    assert authorize_child_access(session, child["id"]) is session
+    with pytest.raises(HTTPException) as e:
+        authorize_child_access(session, sibling["id"])
+    assert e.value.status_code == 403
+    assert authorize_child_access(parent, sibling["id"]) is parent
+
+
+def test_child_session_cannot_start_quests_after_deletion():
+    child = add_child(str(uuid.uuid4()))
+    session = child_session(child)
+    
+    schedule_child_deletion(child)
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(progress.start_quest(QuestProgressCreate(child_id=child["id"], quest_id=str(uuid.uuid4())), session))
+    assert e.value.status_code == 404
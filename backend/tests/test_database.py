@@ -0,0 +1,23 @@
+import uuid
+
+from bson.binary import Binary
+from pymongo import DeleteOne, InsertOne, UpdateOne
+
+from app.database import BinaryUuidCollection, db
+
+
+def test_binary_uuid_bulk_write_leaves_requests_untouched():
+    raw = db["binary_uuid_test"]
+    collection = BinaryUuidCollection(raw)
+    child_id, other_id = str(uuid.uuid4()), str(uuid.uuid4())
+    insert = InsertOne({"id": child_id, "coins": 0})
+    update = UpdateOne({"id": child_id}, {"$inc": {"coins": 5}})
+    delete = DeleteOne({"id": other_id})
+    
+    collection.bulk_write([insert, update, delete])
+    
+    stored = raw.find_one({})
+    assert stored["id"] == Binary.from_uuid(uuid.UUID(child_id))
+    assert stored["coins"] == 5
+    assert update._filter == {"id": child_id}
+    assert insert._doc["id"] == child_id
@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime
+
+from app.database import (
+    children_collection, deletion_jobs_collection, inventory_collection, progress_collection,
+    progress_events_collection, skill_mastery_collection
+)
+from app.services import events, mastery, rewards
+from app.services.deletion import run_next_job, schedule_child_deletion
+
+
+def add_child():
+    child_id = str(uuid.uuid4())
+    child = {"id": child_id, "parent_id": str(uuid.uuid4()), "username": f"test_{child_id[:8]}",
+             "created_at": datetime.utcnow(), "coins": 0, "level": 1}
+    children_collection.insert_one(dict(child))
+    return child
+
+
+def test_deferred_writes_after_deletion_are_dropped():
+    child = add_child()
+    progress = {"id": str(uuid.uuid4()), "child_id": child["id"], "quest_id": str(uuid.uuid4())}
+    event = events.make_event("quest_started", progress)
+    progress_collection.insert_one({**progress, "outbox": [event]})
+    step = {"id": str(uuid.uuid4()), "step_type": "math_puzzle", "config": {"puzzle_type": "addition"}, "xp_reward": 10}
+    
+    schedule_child_deletion(child)
+    
+    # Side effects queued before the tombstone run after it
+    mastery.record_step_activity(child["id"], {"subject": "math"}, [(step, True)])
+    rewards.grant_badge(child["id"], "first-steps")
+    rewards.sync_level(child["id"], 3)
+    events.flush_outbox(progress["id"], [event])
+    
+    assert skill_mastery_collection.count_documents({"child_id": child["id"]}) == 0
+    assert inventory_collection.count_documents({"child_id": child["id"]}) == 0
+    assert progress_events_collection.count_documents({"child_id": child["id"]}) == 0
+    assert children_collection.find_one({"id": child["id"]})["level"] == 1
+    assert progress_collection.find_one({"id": progress["id"]})["outbox"] == []
+
+
+def test_deletion_job_purges_dependents_and_profile():
+    child = add_child()
+    progress_collection.insert_one({"id": str(uuid.uuid4()), "child_id": child["id"], "quest_id": str(uuid.uuid4())})
+    schedule_child_deletion(child)
+    
+    assert run_next_job()
+    assert not run_next_job()
+    assert progress_collection.count_documents({"child_id": child["id"]}) == 0
+    assert children_collection.find_one({"id": child["id"]}) is None
+    assert deletion_jobs_collection.find_one({"child_id": child["id"]})["status"] == "done"
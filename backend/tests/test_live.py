@@ -0,0 +1,69 @@
+import asyncio
+import tracemalloc
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.services.live import RESYNC, event_stream, live_hub
+
+
+def event(child_id: str, kind: str = "step_completed"):
+    return {"event_id": str(uuid.uuid4()), "child_id": child_id, "quest_id": "q", "step_id": None, "kind": kind}
+
+
+async def read_frames(stream, count: int):
+    return [await stream.__anext__() for _ in range(count)]
+
+
+@pytest.mark.parametrize("num_subscribers", [500, 2000])
+def test_idle_subscribers_cost_bounded_memory(num_subscribers):
+    async def scenario():
+        streams = [event_stream([str(uuid.uuid4())]) for _ in range(num_subscribers)]
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        for stream in streams:
+            await stream.__anext__()  # retry directive; subscribed from here on
+        per_subscriber = (tracemalloc.get_traced_memory()[0] - baseline) / len(streams)
+        tracemalloc.stop()
+        for stream in streams:
+            await stream.aclose()
+        return per_subscriber
+    
+    assert asyncio.run(scenario()) < 16 * 1024
+    assert live_hub.stats()["subscribers"] == 0
+
+
+def test_idle_subscriber_gets_heartbeats(monkeypatch):
+    monkeypatch.setattr(settings, "live_heartbeat_seconds", 0.02)
+    
+    async def scenario():
+        stream = event_stream(["idle"])
+        try:
+            return await read_frames(stream, 3)
+        finally:
+            await stream.aclose()
+    
+    retry, *idle = asyncio.run(scenario())
+    assert retry.startswith("retry:")
+    assert idle == [": heartbeat\n\n", ": heartbeat\n\n"]
+
+
+def test_slow_subscriber_is_resynced_not_buffered(monkeypatch):
+    monkeypatch.setattr(settings, "live_queue_size", 20)
+    
+    async def scenario():
+        stream = event_stream(["slow"])
+        try:
+            await stream.__anext__()
+            # The client reads nothing while three queues' worth of events are published
+            live_hub.publish([event("slow") for _ in range(settings.live_queue_size * 3)])
+            subscription = next(iter(live_hub._subscribers["slow"]))
+            assert subscription.queue.qsize() <= settings.live_queue_size
+            assert subscription.resyncs >= 1
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+    
+    frame = asyncio.run(scenario())
+    assert f"event: {RESYNC['kind']}" in frame
@@ -0,0 +1,167 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import (
+    children_collection, progress_collection, quest_steps_collection, quests_collection, skill_mastery_collection
+)
+from app.models.progress import AnswerSubmission, QuestProgressUpdate
+from app.models.user import TokenData
+from app.routers import progress
+from app.services.catalog import quest_catalog
+
+ADMIN = TokenData(email="admin@kidquest.com", role="admin", user_id=str(uuid.uuid4()))
+
+
+def seed_quest(steps):
+    quest_id = str(uuid.uuid4())
+    quests_collection.insert_one({
+        "id": quest_id, "title": "Answer Quest", "description": "", "world": "math_jungle", "subject": "math",
+        "created_at": datetime.utcnow(), "created_by": ADMIN.user_id, "is_active": True,
+        "xp_reward": 30, "coin_reward": 10,
+    })
+    step_ids = []
+    for order, (step_type, config) in enumerate(steps, start=1):
+        step_ids.append(str(uuid.uuid4()))
+        quest_steps_collection.insert_one({
+            "id": step_ids[-1], "quest_id": quest_id, "step_order": order, "step_type": step_type,
+            "title": f"Step {order}", "description": "", "config": config, "hints": [], "xp_reward": 10,
+        })
+    quest_catalog.invalidate()
+    child_id = str(uuid.uuid4())
+    children_collection.insert_one({
+        "id": child_id, "parent_id": ADMIN.user_id, "username": f"kid_{child_id[:8]}", "age_band": "7-8",
+        "created_at": datetime.utcnow(), "total_xp": 0, "level": 1, "coins": 0, "deleted_at": None,
+    })
+    progress_id = str(uuid.uuid4())
+    progress_collection.insert_one({
+        "id": progress_id, "child_id": child_id, "quest_id": quest_id,
+        "started_at": datetime.utcnow(), "steps_progress": [],
+    })
+    return progress_id, step_ids
+
+
+def submit(progress_id, step_id, answer):
+    return asyncio.run(progress.submit_answer(progress_id, step_id, AnswerSubmission(answer=answer), ADMIN))
+
+
+def test_answer_step_without_validator_fails_closed():
+    # Written before configs were validated: the answer is missing
+    progress_id, (step_id,) = seed_quest([("math_puzzle", {"puzzle_type": "addition", "question": "2 + 2?"})])
+    
+    with pytest.raises(HTTPException) as e:
+        submit(progress_id, step_id, 4)
+    assert e.value.status_code == 500
+    assert progress_collection.find_one({"id": progress_id})["steps_progress"] == []
+
+
+def test_answerless_steps_are_accepted():
+    progress_id, (step_id,) = seed_quest([("dialogue", {"character": "Guide", "dialogue": "Hello"})])
+    
+    assert submit(progress_id, step_id, "ok").correct
+
+
+def deactivate(progress_id):
+    quest_id = progress_collection.find_one({"id": progress_id})["quest_id"]
+    quests_collection.update_one({"id": quest_id}, {"$set": {"is_active": False}})
+    quest_catalog.invalidate()
+
+
+def test_answers_are_checked_on_deactivated_quests():
+    progress_id, (step_id,) = seed_quest([
+        ("math_puzzle", {"puzzle_type": "addition", "question": "2 + 2?", "correct_answer": 4}),
+    ])
+    deactivate(progress_id)
+    
+    assert not submit(progress_id, step_id, 5).correct
+    result = submit(progress_id, step_id, 4)
+    assert result.correct
+    assert result.progress.steps_progress[0].completed
+
+
+def test_patch_cannot_complete_answer_step_without_validator():
+    progress_id, (step_id, dialogue_id) = seed_quest([
+        ("math_puzzle", {"puzzle_type": "addition", "question": "2 + 2?"}),
+        ("dialogue", {"character": "Guide", "dialogue": "Hello"}),
+    ])
+    stored = progress_collection.find_one({"id": progress_id})
+    
+    kept = progress.keep_checked_results(stored, {"steps_progress": [
+        {"step_id": step_id, "completed": True, "attempts": 1},
+        {"step_id": dialogue_id, "completed": True, "attempts": 1},
+    ]})
+    assert [sp["completed"] for sp in kept["steps_progress"]] == [False, True]
+
+
+def test_patching_the_step_index_grants_nothing():
+    progress_id, (step_id, dialogue_id) = seed_quest([
+        ("math_puzzle", {"puzzle_type": "addition", "question": "2 + 2?", "correct_answer": 4}),
+        ("dialogue", {"character": "Guide", "dialogue": "Hello"}),
+    ])
+    child_id = progress_collection.find_one({"id": progress_id})["child_id"]
+    
+    assert not submit(progress_id, step_id, 5).correct
+    patched = asyncio.run(progress.update_quest_progress(
+        progress_id, QuestProgressUpdate(current_step_index=4), ADMIN
+    ))
+    assert patched.current_step_index == 0
+    assert patched.total_attempts == 1
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(progress.complete_quest(progress_id, ADMIN))
+    assert e.value.status_code == 400
+    
+    child = children_collection.find_one({"id": child_id})
+    assert (child["total_xp"], child["coins"]) == (0, 0)
+    assert [m["total_xp"] for m in skill_mastery_collection.find({"child_id": child_id})] == [0]
+    
+    # Answering correctly is what unlocks the next step and the rewards
+    assert submit(progress_id, step_id, 4).correct
+    assert asyncio.run(progress.complete_quest(progress_id, ADMIN)).xp_earned == 30
+
+
+def test_mastery_activity_comes_only_from_step_results():
+    steps = [{"id": "a", "step_type": "math_puzzle"}, {"id": "b", "step_type": "math_puzzle"}]
+    old = {"current_step_index": 0, "total_attempts": 0, "steps_progress": []}
+    
+    # Moving the index or the attempt total is not evidence that a step was practiced
+    assert progress.step_activity(old, {"current_step_index": 2, "total_attempts": 3, "steps_progress": []}, steps) == []
+    
+    new = {**old, "steps_progress": [{"step_id": "a", "completed": True, "attempts": 1}]}
+    assert progress.step_activity(old, new, steps) == [(steps[0], True)]
+
+
+def reveal(progress_id, step_id):
+    return asyncio.run(progress.reveal_hint(progress_id, step_id, ADMIN))
+
+
+def test_hints_are_revealed_one_at_a_time():
+    progress_id, (step_id, no_hints_id) = seed_quest([
+        ("dialogue", {"character": "Guide", "dialogue": "Hello"}),
+        ("dialogue", {"character": "Guide", "dialogue": "Bye"}),
+    ])
+    quest_steps_collection.update_one({"id": step_id}, {"$set": {"hints": ["First", "Second"]}})
+    quest_catalog.invalidate()
+    
+    assert [reveal(progress_id, step_id).hint for _ in range(2)] == ["First", "Second"]
+    with pytest.raises(HTTPException) as e:
+        reveal(progress_id, step_id)
+    assert e.value.status_code == 409
+    
+    # A step without hints is refused before anything is counted
+    with pytest.raises(HTTPException) as e:
+        reveal(progress_id, no_hints_id)
+    assert e.value.status_code == 404
+    stored = progress_collection.find_one({"id": progress_id})
+    assert stored["hints_used"] == 2
+    assert stored["hints_revealed"] == {step_id: 2}
+
+
+def test_hints_are_revealed_on_deactivated_quests():
+    progress_id, (step_id,) = seed_quest([("dialogue", {"character": "Guide", "dialogue": "Hello"})])
+    quest_steps_collection.update_one({"id": step_id}, {"$set": {"hints": ["Only"]}})
+    deactivate(progress_id)
+    
+    assert reveal(progress_id, step_id).hint == "Only"
@@ -0,0 +1,51 @@
+import uuid
+
+from app.config import settings
+from app.database import quest_steps_collection
+from app.models.progress import MAX_COMPACT_STEPS, COMPACT_STEPS_FIELD
+from app.services import progress_store
+
+
+def insert_steps(quest_id: str, count: int):
+    ids = [str(uuid.uuid4()) for _ in range(count)]
+    quest_steps_collection.insert_many([
+        {"id": step_id, "quest_id": quest_id, "step_order": order} for order, step_id in enumerate(ids, start=1)
+    ])
+    return ids
+
+
+def progress_doc(quest_id: str, ids):
+    return {
+        "id": str(uuid.uuid4()), "child_id": str(uuid.uuid4()), "quest_id": quest_id,
+        "steps_progress": [
+            {"step_id": step_id, "completed": i == 0, "attempts": 1 if i == 0 else 0}
+            for i, step_id in enumerate(ids)
+        ],
+    }
+
+
+def test_compact_progress_survives_replaced_steps(monkeypatch):
+    monkeypatch.setattr(settings, "compact_progress", True)
+    quest_id = str(uuid.uuid4())
+    old_ids = insert_steps(quest_id, 3)
+    stored = progress_store.storage_form(progress_doc(quest_id, old_ids), old_ids)
+    assert COMPACT_STEPS_FIELD in stored
+    
+    # An admin edit replaces every step with a new id
+    quest_steps_collection.delete_many({"quest_id": quest_id})
+    insert_steps(quest_id, 3)
+    progress_store._step_id_lists.clear()
+    
+    steps = progress_store.expand(stored)["steps_progress"]
+    assert [step["step_id"] for step in steps] == old_ids
+    assert [step["completed"] for step in steps] == [True, False, False]
+
+
+def test_long_quests_stay_in_full_form(monkeypatch):
+    monkeypatch.setattr(settings, "compact_progress", True)
+    quest_id = str(uuid.uuid4())
+    ids = insert_steps(quest_id, MAX_COMPACT_STEPS + 1)
+    doc = progress_doc(quest_id, ids)
+    
+    assert progress_store.storage_form(doc, ids) is doc
+    assert "steps_progress" in progress_store.steps_update(quest_id, doc["steps_progress"])["$set"]
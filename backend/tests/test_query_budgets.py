@@ -0,0 +1,90 @@
+"""Mongo command budgets for the quest endpoints, constant in the number of quests and steps"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.database import progress_collection, quest_steps_collection, quests_collection
+from app.models.quest import QuestCreate
+from app.models.user import TokenData
+from app.routers import admin, quests
+from app.services.catalog import quest_catalog
+
+SIZES = (1, 10, 50)
+ADMIN = TokenData(email="admin@kidquest.com", role="admin", user_id=str(uuid.uuid4()))
+
+
+def step_input(order: int):
+    return {
+        "step_order": order, "step_type": "dialogue", "title": f"Step {order}", "description": "",
+        "config": {"character": "Guide", "dialogue": "Hello"}, "hints": ["Read it again"],
+    }
+
+
+def quest_input(num_steps: int):
+    return {
+        "title": "Budget Quest", "description": "", "world": "math_jungle", "subject": "math",
+        "steps": [step_input(order) for order in range(1, num_steps + 1)],
+    }
+
+
+def seed_quests(num_quests: int, steps_per_quest: int = 3):
+    quest_ids = []
+    for _ in range(num_quests):
+        quest = {**quest_input(0), "id": str(uuid.uuid4()), "created_at": datetime.utcnow(),
+                 "created_by": ADMIN.user_id, "is_active": True}
+        del quest["steps"]
+        quests_collection.insert_one(quest)
+        quest_steps_collection.insert_many([
+            {**step_input(order), "id": str(uuid.uuid4()), "quest_id": quest["id"]}
+            for order in range(1, steps_per_quest + 1)
+        ])
+        quest_ids.append(quest["id"])
+    quest_catalog.invalidate()
+    return quest_ids
+
+
+@pytest.mark.parametrize("num_quests", SIZES)
+def test_quest_list(query_budget, num_quests):
+    seed_quests(num_quests)
+    # Catalog version check, then quests and steps for the rebuilt catalog
+    with query_budget.limit(3, label=f"{num_quests} quests"):
+        result = json.loads(asyncio.run(quests.get_quests(None, None, None, ADMIN)).body)
+    assert len(result) == num_quests
+
+
+@pytest.mark.parametrize("num_quests", SIZES)
+def test_child_quest_list(query_budget, num_quests):
+    child_id = str(uuid.uuid4())
+    for quest_id in seed_quests(num_quests):
+        progress_collection.insert_one({
+            "id": str(uuid.uuid4()), "child_id": child_id, "quest_id": quest_id,
+            "started_at": datetime.utcnow(), "steps_progress": [],
+        })
+    # The catalog rebuild plus one progress read
+    with query_budget.limit(4, label=f"{num_quests} quests"):
+        result = json.loads(asyncio.run(quests.get_quests_for_child(child_id, None, ADMIN)).body)
+    assert sum(1 for quest in result if quest["progress"] is not None) == num_quests
+
+
+@pytest.mark.parametrize("num_steps", SIZES)
+def test_admin_create_quest(query_budget, num_steps):
+    data = QuestCreate(**quest_input(num_steps))
+    # Quest and steps inserts, the catalog version bump, then the inline bundle publish (quests and steps)
+    with query_budget.limit(5, label=f"{num_steps} steps"):
+        quest = asyncio.run(admin.create_quest(data, ADMIN))
+    assert len(quest.steps) == num_steps
+
+
+@pytest.mark.parametrize("num_steps", SIZES)
+def test_admin_update_quest(query_budget, num_steps):
+    quest_id = seed_quests(1, steps_per_quest=num_steps)[0]
+    data = QuestCreate(**quest_input(num_steps))
+    # Quest read, update and re-read, steps replaced with two writes, version bump, bundle publish
+    with query_budget.limit(8, label=f"{num_steps} steps"):
+        quest = asyncio.run(admin.update_quest(quest_id, data, ADMIN))
+    assert len(quest.steps) == num_steps
+    assert quest_steps_collection.count_documents({"quest_id": quest_id}) == num_steps
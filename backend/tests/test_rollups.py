@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.database import quest_stats_collection
+from app.services.rollups import apply_events
+
+
+def make_events(quest_id: str, kinds):
+    return [
+        {"_id": ObjectId(), "event_id": str(uuid.uuid4()), "child_id": "c1", "quest_id": quest_id,
+         "step_id": None, "kind": kind, "ts": datetime(2026, 1, 5, 10, 30)}
+        for kind in kinds
+    ]
+
+
+def quest_row(quest_id: str):
+    return quest_stats_collection.find_one({"quest_id": quest_id, "step_id": None, "granularity": "hour"})
+
+
+def test_replayed_batch_is_counted_once():
+    quest_id = str(uuid.uuid4())
+    batch = make_events(quest_id, ["quest_started", "quest_started"])
+    
+    apply_events(batch)
+    apply_events(batch)
+    assert quest_row(quest_id)["started"] == 2
+    
+    # A replay that has grown past the crashed batch still counts the new events
+    apply_events(batch + make_events(quest_id, ["quest_started"]))
+    assert quest_row(quest_id)["started"] == 3
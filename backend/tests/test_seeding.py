@@ -0,0 +1,49 @@
+import asyncio
+import uuid
+
+from app.database import quest_steps_collection, quests_collection
+from app.models.quest import QuestCreate
+from app.models.user import TokenData
+from app.routers import admin
+from app.services import seeding
+
+ADMIN = TokenData(email="admin@kidquest.com", role="admin", user_id=str(uuid.uuid4()))
+
+
+def declared_quest():
+    return {
+        "key": "seed-test", "title": "Seeded Quest", "description": "Declared", "world": "math_jungle",
+        "subject": "math", "difficulty": "easy",
+        "steps": [
+            {"key": f"step-{n}", "step_type": "dialogue", "title": f"Step {n}", "description": "",
+             "config": {"character": "Guide", "dialogue": f"Line {n}"}, "hints": []}
+            for n in (1, 2)
+        ],
+    }
+
+
+def sync_counts():
+    results = seeding.seed_quests([declared_quest()], ADMIN.user_id)
+    return [(r.inserted, r.updated, r.deleted) for r in results]
+
+
+def test_reseed_overwrites_admin_edits_to_quests_and_steps():
+    assert sync_counts() == [(1, 0, 0), (2, 0, 0)]
+    assert sync_counts() == [(0, 0, 0), (0, 0, 0)]
+    quest_id = quests_collection.find_one({"seed_key": "seed-test"})["id"]
+    
+    # The admin API rewrites the quest and re-creates its steps with new ids and no seed keys
+    edited = declared_quest()
+    edited["title"] = "Edited Quest"
+    edited["steps"] = [{**step, "step_order": n, "title": "Edited"} for n, step in enumerate(edited["steps"], start=1)]
+    edited["steps"].append({**edited["steps"][0], "step_order": 3})
+    asyncio.run(admin.update_quest(quest_id, QuestCreate(**edited), ADMIN))
+    admin_step_ids = [s["id"] for s in quest_steps_collection.find({"quest_id": quest_id}).sort("step_order", 1)]
+    
+    # Both the quest and its steps go back to the declaration; the extra step is removed
+    assert sync_counts() == [(0, 1, 0), (0, 2, 1)]
+    assert quests_collection.find_one({"id": quest_id})["title"] == "Seeded Quest"
+    steps = list(quest_steps_collection.find({"quest_id": quest_id}).sort("step_order", 1))
+    assert [s["title"] for s in steps] == ["Step 1", "Step 2"]
+    assert [s["id"] for s in steps] == admin_step_ids[:2]
+    assert sync_counts() == [(0, 0, 0), (0, 0, 0)]
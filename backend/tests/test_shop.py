@@ -0,0 +1,81 @@
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+
+from app.database import children_collection, cosmetics_collection, ensure_indexes, inventory_collection
+from app.models.reward import CartPurchaseRequest, PurchaseRequest
+from app.models.user import TokenData
+from app.routers import shop
+
+COST = 100
+
+
+def seed_child(coins: int, num_cosmetics: int):
+    parent_id = str(uuid.uuid4())
+    child_id = str(uuid.uuid4())
+    children_collection.insert_one({
+        "id": child_id, "parent_id": parent_id, "username": f"test_{child_id[:8]}",
+        "age_band": "9-10", "created_at": datetime.utcnow(), "total_xp": 0, "level": 1,
+        "coins": coins, "hint_buddy_enabled": False,
+    })
+    cosmetic_ids = [str(uuid.uuid4()) for _ in range(num_cosmetics)]
+    cosmetics_collection.insert_many([{
+        "id": cid, "name": f"Test {i}", "category": "accessory", "value": f"test_{i}",
+        "description": "", "unlock_requirement": "", "coin_cost": COST, "created_at": datetime.utcnow(),
+    } for i, cid in enumerate(cosmetic_ids)])
+    user = TokenData(email="parent@kidquest.com", role="parent", user_id=parent_id)
+    return child_id, cosmetic_ids, user
+
+
+def buy(child_id, user, cosmetic_ids, index):
+    # Every other buyer taps the same item twice, the rest check out a two-item cart
+    try:
+        if index % 2:
+            request = PurchaseRequest(cosmetic_id=cosmetic_ids[index % len(cosmetic_ids)])
+            result = asyncio.run(shop.purchase_cosmetic(child_id, request, user))
+        else:
+            request = CartPurchaseRequest(cosmetic_ids=[
+                cosmetic_ids[index % len(cosmetic_ids)], cosmetic_ids[(index + 1) % len(cosmetic_ids)]
+            ])
+            result = asyncio.run(shop.purchase_cart(child_id, request, user))
+        return result.coins_spent
+    except HTTPException:
+        return 0
+
+
+def test_concurrent_purchases_never_overspend():
+    coins, num_cosmetics, buyers = 500, 10, 64
+    child_id, cosmetic_ids, user = seed_child(coins, num_cosmetics)
+    
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        spent = sum(pool.map(lambda i: buy(child_id, user, cosmetic_ids, i), range(buyers)))
+    
+    coins_left = children_collection.find_one({"id": child_id})["coins"]
+    owned = inventory_collection.count_documents({"child_id": child_id, "item_type": "cosmetic"})
+    assert coins_left >= 0
+    assert spent + coins_left == coins
+    assert owned * COST == spent
+    assert owned == min(num_cosmetics, coins // COST)
+
+
+def test_ensure_indexes_dedupes_inventory():
+    inventory_collection.drop_indexes()
+    child_id = str(uuid.uuid4())
+    earned = datetime.utcnow()
+    inventory_collection.insert_many([
+        {"id": "late", "child_id": child_id, "item_type": "badge", "item_id": "b1",
+         "earned_at": earned + timedelta(minutes=5), "is_equipped": True},
+        {"id": "early", "child_id": child_id, "item_type": "badge", "item_id": "b1",
+         "earned_at": earned, "is_equipped": False},
+        {"id": "other", "child_id": child_id, "item_type": "badge", "item_id": "b2",
+         "earned_at": earned + timedelta(minutes=1), "is_equipped": False},
+    ])
+    
+    ensure_indexes()
+    
+    items = {item["id"]: item for item in inventory_collection.find({"child_id": child_id})}
+    assert set(items) == {"early", "other"}
+    assert items["early"]["is_equipped"]
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+from app.services.tasks import TaskQueue, task
+
+calls = []
+threads = []
+
+
+@task("tests.flaky")
+def flaky(key: str):
+    calls.append(key)
+    threads.append(threading.get_ident())
+    if key == "fail":
+        raise RuntimeError("boom")
+
+
+def test_retry_into_a_full_queue_keeps_the_worker_alive():
+    async def scenario():
+        queue = TaskQueue(maxsize=1, workers=1, max_retries=1, retry_backoff=0.05)
+        queue.start()
+        queue.enqueue(flaky, key="fail")
+        await asyncio.sleep(0.02)  # the worker is backing off before its retry
+        queue.enqueue(flaky, key="ok")  # fills the queue
+        await asyncio.sleep(0.1)
+        queue.enqueue(flaky, key="after")
+        await queue.stop()
+        return queue
+    
+    calls.clear()
+    queue = asyncio.run(scenario())
+    
+    assert calls.count("fail") == 2  # the retry ran in a thread and was dead-lettered
+    assert calls[-1] == "after"
+    stats = queue.stats()
+    assert stats["dead_lettered"] == 1
+    assert stats["overflowed"] == 1
+    assert queue._pending == {}
+
+
+def test_full_queue_never_runs_tasks_on_the_event_loop():
+    async def scenario():
+        queue = TaskQueue(maxsize=1, workers=1, max_retries=0, retry_backoff=0.05)
+        queue.start()
+        for key in ("a", "b", "c"):
+            queue.enqueue(flaky, key=key)
+        await queue.stop()
+        return queue, threading.get_ident()
+    
+    calls.clear()
+    threads.clear()
+    queue, loop_thread = asyncio.run(scenario())
+    
+    assert sorted(calls) == ["a", "b", "c"]
+    assert loop_thread not in threads
+    assert queue.stats()["overflowed"] == 2
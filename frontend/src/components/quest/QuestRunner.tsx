@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { questsAPI, progressAPI } from '../../services/api';
-import { Quest, QuestStep, QuestProgress, ChildProfile, RewardCeremony } from '../../types';
+import { Quest, QuestStep, QuestProgress, ChildProfile, RewardCeremony, AnswerResult, StepAnswer } from '../../types';
 import { MathPuzzle } from './puzzles/MathPuzzle';
 import { CodePuzzle } from './puzzles/CodePuzzle';
 import { ScienceSimulation } from './puzzles/ScienceSimulation';
@@ -36,7 +36,7 @@ export const QuestRunner: React.FC<QuestRunnerProps> = ({
   const [error, setError] = useState('');
   
   // Step state
-  const [hintsUsed, setHintsUsed] = useState(0);
+  const [hint, setHint] = useState<string | null>(null);
   const [attempts, setAttempts] = useState(0);
 
   // Load quest and start/resume progress
@@ -56,7 +56,6 @@ export const QuestRunner: React.FC<QuestRunnerProps> = ({
       const progressData = await progressAPI.startQuest(childProfile.id, questId);
       setProgress(progressData);
       setCurrentStepIndex(progressData.current_step_index);
-      setHintsUsed(progressData.hints_used);
       
       setRunnerState('RUNNING');
     } catch (err) {
@@ -75,10 +74,9 @@ export const QuestRunner: React.FC<QuestRunnerProps> = ({
       try {
         const newStepIndex = currentStepIndex + 1;
         
+        // Attempts and hints are counted by the server as they happen
         await progressAPI.updateProgress(progress.id, {
           current_step_index: newStepIndex,
-          total_attempts: progress.total_attempts + attempts + 1,
-          hints_used: hintsUsed,
         });
 
         // Check if quest is complete
@@ -88,7 +86,7 @@ export const QuestRunner: React.FC<QuestRunnerProps> = ({
           // Move to next step
           setCurrentStepIndex(newStepIndex);
           setAttempts(0);
-          setHintsUsed(0);
+          setHint(null);
         }
       } catch (err) {
         console.error('Failed to update progress:', err);
@@ -97,7 +95,17 @@ export const QuestRunner: React.FC<QuestRunnerProps> = ({
       // Incorrect answer - increment attempts
       setAttempts(prev => prev + 1);
     }
-  }, [quest, progress, currentStepIndex, attempts, hintsUsed]);
+  }, [quest, progress, currentStepIndex]);
+
+  // Answers are checked by the server, which also records the attempt
+  const handleSubmitAnswer = useCallback(async (answer: StepAnswer): Promise<AnswerResult> => {
+    if (!quest || !progress) {
+      throw new Error('Quest is not loaded');
+    }
+    const result = await progressAPI.submitAnswer(progress.id, quest.steps[currentStepIndex].id, answer);
+    setProgress(result.progress);
+    return result;
+  }, [quest, progress, currentStepIndex]);
 
   // Complete quest and get rewards
   const completeQuest = async () => {
@@ -115,10 +123,23 @@ export const QuestRunner: React.FC<QuestRunnerProps> = ({
     }
   };
 
-  // Handle hint usage
-  const handleUseHint = useCallback(() => {
-    setHintsUsed(prev => prev + 1);
-  }, []);
+  // Hints are revealed one at a time by the server, which counts them
+  const handleUseHint = useCallback(async () => {
+    if (!quest || !progress) return;
+
+    const stepId = quest.steps[currentStepIndex].id;
+    try {
+      const result = await progressAPI.revealHint(progress.id, stepId);
+      setHint(result.hint);
+      setProgress({
+        ...progress,
+        hints_used: result.hints_used,
+        hints_revealed: { ...progress.hints_revealed, [stepId]: result.hint_number },
+      });
+    } catch (err) {
+      console.error('Failed to get hint:', err);
+    }
+  }, [quest, progress, currentStepIndex]);
 
   // Handle reward ceremony completion
   const handleRewardContinue = useCallback(() => {
@@ -162,6 +183,7 @@ export const QuestRunner: React.FC<QuestRunnerProps> = ({
       <RewardCeremonyComponent
         quest={quest}
         childProfile={childProfile}
+        cosmetics={reward.cosmetics}
         onContinue={handleRewardContinue}
       />
     );
@@ -169,6 +191,7 @@ export const QuestRunner: React.FC<QuestRunnerProps> = ({
 
   // RUNNING state - show current step
   const currentStep = quest.steps[currentStepIndex];
+  const hintsUsed = progress?.hints_revealed?.[currentStep.id] ?? 0;
   const progressPercentage = ((currentStepIndex) / quest.steps.length) * 100;
 
   return (
@@ -206,7 +229,9 @@ export const QuestRunner: React.FC<QuestRunnerProps> = ({
           step={currentStep}
           onComplete={handleStepComplete}
           onUseHint={handleUseHint}
+          onSubmitAnswer={handleSubmitAnswer}
           hintsUsed={hintsUsed}
+          hint={hint}
           attempts={attempts}
         />
       </div>
@@ -229,7 +254,9 @@ interface StepRendererProps {
   step: QuestStep;
   onComplete: (correct: boolean) => void;
   onUseHint: () => void;
+  onSubmitAnswer: (answer: StepAnswer) => Promise<AnswerResult>;
   hintsUsed: number;
+  hint: string | null;
   attempts: number;
 }
 
@@ -1,17 +1,19 @@
 import React, { useEffect, useState } from 'react';
-import { Quest, ChildProfile } from '../../types';
+import { Quest, ChildProfile, Cosmetic } from '../../types';
 import { GameButton } from '../ui/GameButton';
 import { GameCard } from '../ui/GameCard';
 
 interface RewardCeremonyProps {
   quest: Quest;
   childProfile: ChildProfile;
+  cosmetics?: Cosmetic[];
   onContinue: () => void;
 }
 
 export const RewardCeremony: React.FC<RewardCeremonyProps> = ({
   quest,
   childProfile,
+  cosmetics = [],
   onContinue,
 }) => {
   const [stage, setStage] = useState(0);
@@ -119,6 +121,23 @@ export const RewardCeremony: React.FC<RewardCeremonyProps> = ({
           </div>
         )}
 
+        {/* Stage 3: Cosmetics unlocked by this quest */}
+        {stage >= 3 && cosmetics.length > 0 && (
+          <div className="mb-8 animate-pop">
+            <div className="bg-gradient-to-r from-pink-500 to-rose-600 rounded-2xl p-8 border-4 border-pink-700">
+              <div className="text-6xl mb-2">👕</div>
+              <div className="text-2xl font-display font-bold text-white mb-2">
+                New Look Unlocked!
+              </div>
+              {cosmetics.map((cosmetic) => (
+                <div key={cosmetic.id} className="text-xl text-white/90">
+                  {cosmetic.name}
+                </div>
+              ))}
+            </div>
+          </div>
+        )}
+
         {/* Achievement Summary */}
         {stage >= 3 && (
           <div className="bg-white rounded-xl p-6 border-4 border-gray-200 mb-8">
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { QuestStep } from '../../../types';
+import { QuestStep, AnswerResult, StepAnswer } from '../../../types';
 import { GameButton } from '../../ui/GameButton';
 import { GameCard } from '../../ui/GameCard';
 
@@ -7,7 +7,9 @@ interface CodePuzzleProps {
   step: QuestStep;
   onComplete: (correct: boolean) => void;
   onUseHint: () => void;
+  onSubmitAnswer: (answer: StepAnswer) => Promise<AnswerResult>;
   hintsUsed: number;
+  hint: string | null;
 }
 
 type BlockType = 'move_forward' | 'turn_left' | 'turn_right';
@@ -21,7 +23,9 @@ export const CodePuzzle: React.FC<CodePuzzleProps> = ({
   step,
   onComplete,
   onUseHint,
+  onSubmitAnswer,
   hintsUsed,
+  hint,
 }) => {
   const config = step.config;
   const [blocks, setBlocks] = useState<Block[]>([]);
@@ -55,12 +59,16 @@ export const CodePuzzle: React.FC<CodePuzzleProps> = ({
     setFeedback('');
   };
 
-  const runCode = () => {
-    const solution = config.solution as string[];
+  const runCode = async () => {
     const userSolution = blocks.map(b => b.type);
     
     // Check if solution matches
-    const correct = JSON.stringify(userSolution) === JSON.stringify(solution);
+    let correct = false;
+    try {
+      correct = (await onSubmitAnswer(userSolution)).correct;
+    } catch (err) {
+      console.error('Failed to check solution:', err);
+    }
     
     if (correct) {
       setFeedback('🎉 Perfect! Your code works!');
@@ -72,7 +80,7 @@ export const CodePuzzle: React.FC<CodePuzzleProps> = ({
   };
 
   const handleHint = () => {
-    if (hintsUsed < step.hints.length) {
+    if (hintsUsed < step.hint_count) {
       setShowHint(true);
       onUseHint();
     }
@@ -178,10 +186,10 @@ export const CodePuzzle: React.FC<CodePuzzleProps> = ({
       )}
 
       {/* Hint */}
-      {showHint && hintsUsed <= step.hints.length && (
+      {showHint && hint && (
         <div className="bg-yellow-50 border-4 border-yellow-400 rounded-xl p-4 mb-4">
           <p className="text-lg font-semibold text-yellow-900">
-            💡 Hint: {step.hints[hintsUsed - 1]}
+            💡 Hint: {hint}
           </p>
         </div>
       )}
@@ -191,7 +199,7 @@ export const CodePuzzle: React.FC<CodePuzzleProps> = ({
         <GameButton
           variant="warning"
           onClick={handleHint}
-          disabled={hintsUsed >= step.hints.length}
+          disabled={hintsUsed >= step.hint_count}
         >
           💡 Hint
         </GameButton>
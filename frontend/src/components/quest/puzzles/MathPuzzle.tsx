@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { QuestStep } from '../../../types';
+import { QuestStep, AnswerResult, StepAnswer } from '../../../types';
 import { GameButton } from '../../ui/GameButton';
 import { GameCard } from '../../ui/GameCard';
 
@@ -7,7 +7,9 @@ interface MathPuzzleProps {
   step: QuestStep;
   onComplete: (correct: boolean) => void;
   onUseHint: () => void;
+  onSubmitAnswer: (answer: StepAnswer) => Promise<AnswerResult>;
   hintsUsed: number;
+  hint: string | null;
   attempts: number;
 }
 
@@ -15,7 +17,9 @@ export const MathPuzzle: React.FC<MathPuzzleProps> = ({
   step,
   onComplete,
   onUseHint,
+  onSubmitAnswer,
   hintsUsed,
+  hint,
   attempts,
 }) => {
   const [answer, setAnswer] = useState('');
@@ -23,9 +27,14 @@ export const MathPuzzle: React.FC<MathPuzzleProps> = ({
   const [feedback, setFeedback] = useState('');
   const config = step.config;
 
-  const handleSubmit = () => {
-    const userAnswer = parseInt(answer);
-    const correct = userAnswer === config.correct_answer;
+  const handleSubmit = async () => {
+    let correct = false;
+    try {
+      // Sent as typed: fraction answers such as "1/2" are checked by the server too
+      correct = (await onSubmitAnswer(answer.trim())).correct;
+    } catch (err) {
+      console.error('Failed to check answer:', err);
+    }
 
     if (correct) {
       setFeedback('🎉 Correct! Great job!');
@@ -37,7 +46,7 @@ export const MathPuzzle: React.FC<MathPuzzleProps> = ({
   };
 
   const handleHint = () => {
-    if (hintsUsed < step.hints.length) {
+    if (hintsUsed < step.hint_count) {
       setShowHint(true);
       onUseHint();
     }
@@ -156,10 +165,10 @@ export const MathPuzzle: React.FC<MathPuzzleProps> = ({
       )}
 
       {/* Hint */}
-      {showHint && hintsUsed <= step.hints.length && (
+      {showHint && hint && (
         <div className="bg-yellow-50 border-4 border-yellow-400 rounded-xl p-4 mb-4">
           <p className="text-lg font-semibold text-yellow-900">
-            💡 Hint: {step.hints[hintsUsed - 1]}
+            💡 Hint: {hint}
           </p>
         </div>
       )}
@@ -169,10 +178,10 @@ export const MathPuzzle: React.FC<MathPuzzleProps> = ({
         <GameButton
           variant="warning"
           onClick={handleHint}
-          disabled={hintsUsed >= step.hints.length}
+          disabled={hintsUsed >= step.hint_count}
           className="flex-1"
         >
-          💡 Hint ({step.hints.length - hintsUsed} left)
+          💡 Hint ({step.hint_count - hintsUsed} left)
         </GameButton>
         <GameButton
           onClick={handleSubmit}
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { QuestStep } from '../../../types';
+import { QuestStep, AnswerResult, StepAnswer } from '../../../types';
 import { GameButton } from '../../ui/GameButton';
 import { GameCard } from '../../ui/GameCard';
 
@@ -7,17 +7,22 @@ interface ScienceSimulationProps {
   step: QuestStep;
   onComplete: (correct: boolean) => void;
   onUseHint: () => void;
+  onSubmitAnswer: (answer: StepAnswer) => Promise<AnswerResult>;
   hintsUsed: number;
+  hint: string | null;
 }
 
 export const ScienceSimulation: React.FC<ScienceSimulationProps> = ({
   step,
   onComplete,
   onUseHint,
+  onSubmitAnswer,
   hintsUsed,
+  hint,
 }) => {
   const config = step.config;
   const [selectedAnswer, setSelectedAnswer] = useState<string>('');
+  const [result, setResult] = useState<AnswerResult | null>(null);
   const [showResult, setShowResult] = useState(false);
   const [showHint, setShowHint] = useState(false);
   const [isSimulating, setIsSimulating] = useState(false);
@@ -30,17 +35,22 @@ export const ScienceSimulation: React.FC<ScienceSimulationProps> = ({
     }, 2000);
   };
 
-  const handleAnswer = (answer: string) => {
+  const handleAnswer = async (answer: string) => {
     setSelectedAnswer(answer);
-    const correct = answer === config.correct_answer;
-    
-    if (correct) {
-      setTimeout(() => onComplete(true), 1500);
+    try {
+      const answerResult = await onSubmitAnswer(answer);
+      setResult(answerResult);
+      if (answerResult.correct) {
+        setTimeout(() => onComplete(true), 1500);
+      }
+    } catch (err) {
+      console.error('Failed to check answer:', err);
+      setSelectedAnswer('');
     }
   };
 
   const handleHint = () => {
-    if (hintsUsed < step.hints.length) {
+    if (hintsUsed < step.hint_count) {
       setShowHint(true);
       onUseHint();
     }
@@ -111,15 +121,12 @@ export const ScienceSimulation: React.FC<ScienceSimulationProps> = ({
           </p>
           
           <div className="grid gap-3">
-            {['rock', 'feather', 'yes', 'no'].filter(opt => 
-              config.question.toLowerCase().includes(opt) || 
-              config.correct_answer === opt
-            ).map((answer) => (
+            {(config.options as string[]).map((answer) => (
               <GameButton
                 key={answer}
                 onClick={() => handleAnswer(answer)}
-                variant={selectedAnswer === answer ? 
-                  (selectedAnswer === config.correct_answer ? 'success' : 'danger') : 
+                variant={selectedAnswer === answer && result ? 
+                  (result.correct ? 'success' : 'danger') : 
                   'primary'
                 }
                 disabled={selectedAnswer !== ''}
@@ -133,19 +140,19 @@ export const ScienceSimulation: React.FC<ScienceSimulationProps> = ({
       )}
 
       {/* Explanation */}
-      {selectedAnswer === config.correct_answer && (
+      {result?.correct && (
         <div className="bg-green-50 border-4 border-green-400 rounded-xl p-4 mb-4">
           <p className="text-lg font-semibold text-green-900">
-            ✅ Correct! {config.explanation}
+            ✅ Correct! {result.explanation}
           </p>
         </div>
       )}
 
       {/* Hint */}
-      {showHint && hintsUsed <= step.hints.length && (
+      {showHint && hint && (
         <div className="bg-yellow-50 border-4 border-yellow-400 rounded-xl p-4 mb-4">
           <p className="text-lg font-semibold text-yellow-900">
-            💡 Hint: {step.hints[hintsUsed - 1]}
+            💡 Hint: {hint}
           </p>
         </div>
       )}
@@ -156,7 +163,7 @@ export const ScienceSimulation: React.FC<ScienceSimulationProps> = ({
           <GameButton
             variant="warning"
             onClick={handleHint}
-            disabled={hintsUsed >= step.hints.length}
+            disabled={hintsUsed >= step.hint_count}
           >
             💡 Need a Hint?
           </GameButton>
@@ -8,6 +8,9 @@ import type {
   QuestWithProgress,
   QuestProgress,
   RewardCeremony,
+  AnswerResult,
+  HintResult,
+  StepAnswer,
   ChildStats
 } from '../types';
 
@@ -199,6 +202,19 @@ export const progressAPI = {
     return response.data;
   },
 
+  submitAnswer: async (progressId: string, stepId: string, answer: StepAnswer): Promise<AnswerResult> => {
+    const response = await api.post<AnswerResult>(
+      `/api/progress/${progressId}/steps/${stepId}/answer`,
+      { answer }
+    );
+    return response.data;
+  },
+
+  revealHint: async (progressId: string, stepId: string): Promise<HintResult> => {
+    const response = await api.post<HintResult>(`/api/progress/${progressId}/steps/${stepId}/hint`);
+    return response.data;
+  },
+
   completeQuest: async (progressId: string): Promise<RewardCeremony> => {
     const response = await api.post<RewardCeremony>(`/api/progress/complete-quest/${progressId}`);
     return response.data;
@@ -51,7 +51,7 @@ export interface QuestStep {
   title: string;
   description: string;
   config: Record<string, any>;
-  hints: string[];
+  hint_count: number;
   xp_reward: number;
 }
 
@@ -98,6 +98,23 @@ export interface QuestProgress {
   steps_progress: StepProgress[];
   total_attempts: number;
   hints_used: number;
+  hints_revealed: Record<string, number>;
+}
+
+export type StepAnswer = number | string | string[];
+
+export interface AnswerResult {
+  correct: boolean;
+  explanation?: string | null;
+  attempts: number;
+  progress: QuestProgress;
+}
+
+export interface HintResult {
+  hint: string;
+  hint_number: number;
+  hints_remaining: number;
+  hints_used: number;
 }
 
 export interface Badge {
@@ -110,6 +127,15 @@ export interface Badge {
   created_at: string;
 }
 
+export interface UnlockRule {
+  type: 'quests_completed' | 'level_reached' | 'badge_owned';
+  count: number;
+  subject?: 'math' | 'coding' | 'science' | null;
+  world?: 'math_jungle' | 'code_city' | 'science_spaceport' | null;
+  level?: number | null;
+  badge_id?: string | null;
+}
+
 export interface Cosmetic {
   id: string;
   name: string;
@@ -117,6 +143,7 @@ export interface Cosmetic {
   value: string;
   description: string;
   unlock_requirement: string;
+  unlock_rule?: UnlockRule | null;
   coin_cost: number;
   image_url?: string;
   created_at: string;